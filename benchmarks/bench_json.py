@@ -0,0 +1,74 @@
+"""Compares `to_dict` and `transcode_json` against building an element tree and
+converting it to dicts.
+
+python -m benchmarks.bench_json --users 1000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from io import BytesIO, StringIO
+from xml.etree.ElementTree import Element
+
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.transcode import to_dict, transcode_json
+
+from .corpus import enumeration_page
+
+FORCE_LIST = ["addata:user"]
+
+
+def element_to_dict(element: Element) -> dict:
+    """xmltodict conventions over an element tree, as `DictBuilder` does."""
+    items = {"@" + name: value for name, value in element.attrib.items()}
+    for child in element:
+        value = element_to_dict(child)[child.tag]
+        if child.tag in items:
+            if not isinstance(items[child.tag], list):
+                items[child.tag] = [items[child.tag]]
+            items[child.tag].append(value)
+        else:
+            items[child.tag] = [value] if child.tag in FORCE_LIST else value
+    if not items:
+        return {element.tag: element.text}
+    if element.text:
+        items["#text"] = element.text
+    return {element.tag: items}
+
+
+def measure(fn) -> tuple[float, int]:
+    """Returns the time taken and the peak memory allocated by `fn`."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    page = enumeration_page(args.users)
+    conversions = {
+        "tree + convert": lambda: json.dumps(
+            element_to_dict(build_tree(iter_events(BytesIO(page))))
+        ),
+        "to_dict": lambda: json.dumps(to_dict(BytesIO(page), force_list=FORCE_LIST)),
+        "transcode_json": lambda: transcode_json(
+            BytesIO(page), StringIO(), force_list=FORCE_LIST
+        ),
+    }
+
+    print(f"page: {args.users} users, {len(page) / 1e6:.2f} MB")
+    for name, fn in conversions.items():
+        elapsed, peak = measure(fn)
+        print(f"{name:15} {elapsed:8.3f} s  peak {peak / 1e6:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
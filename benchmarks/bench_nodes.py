@@ -0,0 +1,61 @@
+"""Compares the memory held by `Node` trees against `Element` trees.
+
+python -m benchmarks.bench_nodes --users 10000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from io import BytesIO
+
+from pynbfx.nodes import node_factory
+from pynbfx.records import record_parser
+
+from .corpus import enumeration_page
+
+
+def measure(parse) -> tuple[object, int, float]:
+    """Returns the parsed tree, the bytes it holds and the time taken."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = parse()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tree, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10000)
+    args = parser.parse_args()
+
+    # element_parser stops at text split over several records
+    page = enumeration_page(args.users, split_sid=False)
+
+    elements, element_size, element_time = measure(
+        lambda: record_parser()(BytesIO(page)).unwrap()
+    )
+    count = sum(1 for _ in elements.iter())
+    del elements
+    nodes, node_size, node_time = measure(
+        lambda: record_parser(node_factory())(BytesIO(page)).unwrap()
+    )
+    assert count == sum(1 for _ in nodes.iter())
+
+    print(f"page: {args.users} users, {count} elements")
+    for name, size, elapsed in [
+        ("Element", element_size, element_time),
+        ("Node", node_size, node_time),
+    ]:
+        print(
+            f"{name:8} {size / 1e6:8.2f} MB  {size / count:7.1f} B/element"
+            f"  {elapsed:7.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Compares `projection_parser` against a full decode of an enumeration page by
+`element_parser`.
+
+python -m benchmarks.bench_projection --users 1000
+"""
+
+import argparse
+from io import BytesIO
+
+from pynbfx.projection import projection_parser
+from pynbfx.records import element_parser
+
+from .corpus import best_of, enumeration_page
+
+PATHS = ["addata:sAMAccountName/ad:value", "addata:objectSid/ad:value"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # element_parser stops at text split over several records
+    page = enumeration_page(args.users, split_sid=False)
+    decode = element_parser()
+    project = projection_parser(*PATHS)
+
+    full = best_of(lambda: decode(BytesIO(page)), args.repeat)
+    projected = best_of(lambda: project(BytesIO(page)), args.repeat)
+
+    size = len(page) / 1e6
+    print(f"page: {args.users} users, {size:.2f} MB")
+    print(f"full decode: {full:8.3f} s  {size / full:6.2f} MB/s")
+    print(f"projection:  {projected:8.3f} s  {size / projected:6.2f} MB/s")
+    print(f"speedup:     {full / projected:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
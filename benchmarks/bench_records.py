@@ -0,0 +1,171 @@
+"""Times the decoder of each text record type and each attribute and element
+record family in isolation, over a stream repeating one record.
+
+Reports nanoseconds per record, and the memory blocks and bytes per record
+still allocated after decoding, which holds the decoded values.  Record types
+whose decoder is not implemented are listed without measurements.
+
+python -m benchmarks.bench_records --count 10000 --output records.json
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from io import BytesIO
+
+from pynbfx.parser import Parser
+from pynbfx.records import attribute_parser, record_event_parser, text_parser
+
+from .corpus import chars8
+
+# payloads of text records, by their even record type, with the lengths read
+# the way the decoders read them
+TEXT_PAYLOADS = {
+    0x80: b"",  # ZeroText
+    0x82: b"",  # OneText
+    0x84: b"",  # FalseText
+    0x86: b"",  # TrueText
+    0x88: b"\x2a",  # Int8Text
+    0x8A: b"\x01\x2a",  # Int16Text
+    0x8C: b"\x00\x01\x00\x2a",  # Int32Text
+    0x8E: b"\x00\x00\x00\x01\x00\x00\x00\x2a",  # Int64Text
+    0x90: b"\x00\x00\x28\x42",  # FloatText
+    0x92: b"\x00\x00\x00\x00\x00\x00\x45\x40",  # DoubleText
+    0x94: bytes(12) + b"\x2a\x00\x00\x00",  # DecimalText
+    0x96: (637134336000000000 << 2 | 1).to_bytes(8),  # DateTimeText
+    0x98: chars8("value"),  # Chars8Text
+    0x9A: chars8("value"),  # Chars16Text
+    0x9C: chars8("value"),  # Chars32Text
+    0x9E: b"\x10" + bytes(range(16)),  # Bytes8Text
+    0xA0: b"\x10" + bytes(range(16)),  # Bytes16Text
+    0xA2: b"\x10" + bytes(range(16)),  # Bytes32Text
+    0xA4: b"",  # StartListText
+    0xA6: b"",  # EndListText
+    0xA8: b"",  # EmptyText
+    0xAA: b"\x0e",  # DictionaryText
+    0xAC: bytes(range(16)),  # UniqueIdText
+    0xAE: (10**7).to_bytes(8, "little"),  # TimeSpanText
+    0xB0: bytes(range(16)),  # UuidText
+    0xB2: (42).to_bytes(8, "little"),  # UInt64Text
+    0xB4: b"\x01",  # BoolText
+    0xB6: b"\x0a" + "value".encode("utf-16-le"),  # UnicodeChars8Text
+    0xB8: b"\x00\x0a" + "value".encode("utf-16-le"),  # UnicodeChars16Text
+    0xBA: b"\x0a" + "value".encode("utf-16-le"),  # UnicodeChars32Text
+    0xBC: b"\x00\x0e",  # QNameDictionaryText
+}
+
+VALUE = b"\x98" + chars8("value")
+
+# attribute record families, with a Chars8Text value
+ATTRIBUTES = {
+    "ShortAttribute": b"\x04\x04name" + VALUE,
+    "Attribute": b"\x05\x02ad\x04name" + VALUE,
+    "ShortDictionaryAttribute": b"\x06\x0e" + VALUE,
+    "DictionaryAttribute": b"\x07\x02ad\x0e" + VALUE,
+    "ShortXmlnsAttribute": b"\x08\x05urn:x",
+    "XmlnsAttribute": b"\x09\x02ad\x05urn:x",
+    "ShortDictionaryXmlnsAttribute": b"\x0a\x04",
+    "DictionaryXmlnsAttribute": b"\x0b\x01s\x04",
+    "PrefixDictionaryAttribute": b"\x0c\x0e" + VALUE,
+    "PrefixAttribute": b"\x26\x04name" + VALUE,
+}
+
+# element record families, without attributes
+ELEMENTS = {
+    "ShortElement": b"\x40\x04user",
+    "Element": b"\x41\x02ad\x04user",
+    "ShortDictionaryElement": b"\x42\x0e",
+    "DictionaryElement": b"\x43\x02ad\x0e",
+    "PrefixDictionaryElement": b"\x44\x0e",
+    "PrefixElement": b"\x5e\x04user",
+}
+
+
+def cases() -> dict[str, tuple[Parser, bytes]]:
+    """Returns the parser and record of each case, by its name."""
+    text = text_parser()
+    named = {
+        f"0x{record_type:02X}": (text, bytes((record_type,)) + TEXT_PAYLOADS[even])
+        for record_type in range(0x80, 0xBE)
+        if (even := record_type & ~1) in TEXT_PAYLOADS
+    }
+    attribute = attribute_parser()
+    named.update((name, (attribute, record)) for name, record in ATTRIBUTES.items())
+    element = record_event_parser()
+    named.update((name, (element, record)) for name, record in ELEMENTS.items())
+    return named
+
+
+def decode_all(parser: Parser, stream: BytesIO, count: int) -> list:
+    values = []
+    for _ in range(count):
+        if not (result := parser(stream)):
+            raise ValueError(result.error_msg)
+        values.append(result.value)
+    return values
+
+
+def measure(parser: Parser, record: bytes, count: int, repeat: int) -> dict | None:
+    """Returns the measurements of decoding `count` records, None if the record
+    can not be decoded."""
+    data = record * count
+    try:
+        decode_all(parser, BytesIO(record), 1)
+    except (ValueError, NotImplementedError):
+        return None
+
+    timings = []
+    for _ in range(repeat):
+        stream = BytesIO(data)
+        start = time.perf_counter_ns()
+        decode_all(parser, stream, count)
+        timings.append(time.perf_counter_ns() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    values = decode_all(parser, BytesIO(data), count)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del values
+    stats = after.compare_to(before, "filename")
+    return {
+        "size": len(record),
+        "ns": min(timings) / count,
+        "blocks": sum(stat.count_diff for stat in stats) / count,
+        "bytes": sum(stat.size_diff for stat in stats) / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = {}
+    for name, (record_parser, record) in cases().items():
+        results[name] = measure(record_parser, record, args.count, args.repeat)
+
+    print(
+        f"{'record':<32} {'bytes':>6} {'ns/record':>10} {'blocks':>7} {'B/record':>9}"
+    )
+    for name, result in results.items():
+        if result is None:
+            print(f"{name:<32} {'not implemented':>34}")
+            continue
+        print(
+            f"{name:<32} {result['size']:6} {result['ns']:10.0f} "
+            f"{result['blocks']:7.2f} {result['bytes']:9.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compares rendering a compiled Pull template against building and encoding the
+tree of each request.
+
+python -m benchmarks.bench_template --requests 10000
+"""
+
+import argparse
+import time
+import uuid
+from xml.etree import ElementTree as ET
+
+from pynbfx.encoder import encode
+from pynbfx.template import compile_template
+
+
+def pull_envelope(message_id: str, context: str, max_elements: str) -> ET.Element:
+    envelope = ET.Element(
+        "s:Envelope",
+        {
+            "xmlns:s": "http://www.w3.org/2003/05/soap-envelope",
+            "xmlns:a": "http://www.w3.org/2005/08/addressing",
+            "xmlns:wsen": "http://schemas.xmlsoap.org/ws/2004/09/enumeration",
+        },
+    )
+    header = ET.SubElement(envelope, "s:Header")
+    action = ET.SubElement(header, "a:Action", {"s:mustUnderstand": "1"})
+    action.text = "http://schemas.xmlsoap.org/ws/2004/09/enumeration/Pull"
+    ET.SubElement(header, "a:MessageID").text = message_id
+    ET.SubElement(
+        header, "a:To", {"s:mustUnderstand": "1"}
+    ).text = (
+        "net.tcp://dc.example.com:9389/ActiveDirectoryWebServices/Windows/Enumeration"
+    )
+    body = ET.SubElement(envelope, "s:Body")
+    pull = ET.SubElement(body, "wsen:Pull")
+    ET.SubElement(pull, "wsen:EnumerationContext").text = context
+    ET.SubElement(pull, "wsen:MaxElements", {"count": max_elements})
+    return envelope
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args()
+
+    ids = [f"urn:uuid:{uuid.uuid4()}" for _ in range(args.requests)]
+    context = str(uuid.uuid4())
+
+    start = time.perf_counter()
+    for message_id in ids:
+        encode(pull_envelope(message_id, context, "256"))
+    tree = time.perf_counter() - start
+
+    template = compile_template(
+        pull_envelope("{MessageID}", "{EnumerationContext}", "{MaxElements}")
+    )
+    start = time.perf_counter()
+    for message_id in ids:
+        template.render(
+            MessageID=message_id, EnumerationContext=context, MaxElements=256
+        )
+    rendered = time.perf_counter() - start
+
+    print(f"requests: {args.requests}")
+    print(f"tree + encode: {tree:8.3f} s  {args.requests / tree:10.0f} requests/s")
+    print(
+        f"template:      {rendered:8.3f} s  {args.requests / rendered:10.0f} requests/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Measures the throughput of `transcode` against building a tree and
+serializing it with `ET.tostring`.
+
+python -m benchmarks.bench_transcode --users 1000
+"""
+
+import argparse
+from io import BytesIO
+from xml.etree import ElementTree as ET
+
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.transcode import transcode
+
+from .corpus import best_of, enumeration_page
+
+
+def tostring(page: bytes) -> bytes:
+    tree = build_tree(iter_events(BytesIO(page)))
+    return ET.tostring(tree, short_empty_elements=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--indent", default=None)
+    args = parser.parse_args()
+
+    page = enumeration_page(args.users)
+
+    tree = best_of(lambda: tostring(page), args.repeat)
+    streamed = best_of(
+        lambda: transcode(BytesIO(page), BytesIO(), args.indent), args.repeat
+    )
+
+    size = len(page) / 1e6
+    print(f"page: {args.users} users, {size:.2f} MB")
+    print(f"tree + tostring: {tree:8.3f} s  {size / tree:6.2f} MB/s")
+    print(f"transcode:       {streamed:8.3f} s  {size / streamed:6.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Deterministic corpora of NBFX documents for the benchmarks.
+
+`enumeration_page` builds an ADWS PullResponse holding a page of users, as
+returned by Active Directory Web Services.  `generate` builds documents of a
+configurable size, depth, fan-out, mix of text records and ratio of strings
+found in the dictionary:
+
+    >>> pages = [enumeration_page(10000)]
+    >>> documents = generate(CorpusConfig(documents=10, size=1 << 20))
+
+The same configuration always generates the same documents.
+
+python -m benchmarks.corpus --size 65536 --depth 3 --fan-out 4 out.bin
+"""
+
+import argparse
+import datetime
+import random
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pynbfx.encoder import DICTIONARY_IDS, Encoder, int31
+
+# PullResponse envelope up to and including the start of wsen:Items
+PAGE_HEAD = (
+    b"V\x02\x0b\x01s\x04\x0b\x01a\x06V\x08D\n\x1e\x00\x82\x99>"
+    b"http://schemas.xmlsoap.org/ws/2004/09/enumeration/PullResponse"
+    b"D\x12\xad \xcf\x9a\xba\x9b)\xc0D\xbb\x9c\xc8\x8d\xdcp\xf6\xbb"
+    b"@\nActivityId\x04\rCorrelationId\x98$988d6de0-ca59-4bc4-ae38-52848acac5ff"
+    b"\x08=http://schemas.microsoft.com/2004/09/ServiceModel/Diagnostics\xb1\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+    b"D\x0c\x1e\x00\x82\xab\x14\x01V\x0eA\x04wsen\x0cPullResponse\t\x04wsen1http://schemas.xmlsoap.org/ws/2004/09/enumeration"
+    b"\t\x03xsd http://www.w3.org/2001/XMLSchema\t\x03xsi)http://www.w3.org/2001/XMLSchema-instance"
+    b"\t\x06addata8http://schemas.microsoft.com/2008/1/ActiveDirectory/Data\t\x02ad3http://schemas.microsoft.com/2008/1/ActiveDirectory"
+    b"A\x04wsen\x05Items"
+)
+PAGE_TAIL = b"\x01A\x04wsen\rEndOfSequence\x01\x01\x01\x01"
+
+
+def chars8(s: str) -> bytes:
+    data = s.encode()
+    return bytes([len(data)]) + data
+
+
+def bytes8(data: bytes, split: bool) -> bytes:
+    """Bytes8Text, split over two records as WCF does for SIDs if `split`."""
+    if split:
+        return b"\x9e" + bytes([len(data) - 1]) + data[:-1] + b"\x9f\x01" + data[-1:]
+    return b"\x9f" + bytes([len(data)]) + data
+
+
+def value(xsi_type: str, text: bytes) -> bytes:
+    return b"A\x02ad\x05value\x05\x03xsi\x04type\x98" + chars8(xsi_type) + text
+
+
+def attribute(name: str, syntax: str, text: bytes) -> bytes:
+    return (
+        b"A\x06addata"
+        + chars8(name)
+        + b"\x04\nLdapSyntax\x98"
+        + chars8(syntax)
+        + value("xsd:string" if syntax != "SidString" else "xsd:base64Binary", text)
+        + b"\x01"
+    )
+
+
+def user_item(i: int, split_sid: bool = True) -> bytes:
+    name = f"user{i:05d}"
+    sid = bytes.fromhex("010500000000000515000000") + struct.pack("<IIII", 1, 2, 3, i)
+    return (
+        b"A\x06addata\x04user"
+        + b"A\x02ad\x17objectReferenceProperty"
+        + value("xsd:string", b"\x99" + chars8(f"7ace7909-563a-4565-b902-{i:012d}"))
+        + b"\x01"
+        + attribute(
+            "distinguishedName",
+            "DSDNString",
+            b"\x99" + chars8(f"CN={name},CN=Users,DC=fmradio,DC=local"),
+        )
+        + attribute("objectSid", "SidString", bytes8(sid, split_sid))
+        + attribute("sAMAccountName", "UnicodeString", b"\x99" + chars8(name))
+        + b"\x01"
+    )
+
+
+def enumeration_page(users: int, split_sid: bool = True) -> bytes:
+    items = b"".join(user_item(i, split_sid) for i in range(users))
+    return PAGE_HEAD + items + PAGE_TAIL
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# text records of the generated documents, by their even record type
+TEXT_RECORDS = {
+    "chars": 0x98,
+    "int8": 0x88,
+    "int32": 0x8C,
+    "bool": 0x86,
+    "bytes": 0x9E,
+    "uuid": 0xAC,
+    "datetime": 0x96,
+    "dictionary": 0xAA,
+}
+
+DEFAULT_MIX = {
+    "chars": 0.5,
+    "int8": 0.1,
+    "int32": 0.1,
+    "bool": 0.05,
+    "bytes": 0.1,
+    "uuid": 0.1,
+    "datetime": 0.05,
+}
+
+PREFIXES = ("", "a", "b", "ad")
+
+# strings of the static dictionary which are valid names
+DICTIONARY_NAMES = sorted(name for name in DICTIONARY_IDS if name.isidentifier())
+
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliett kilo lima "
+    "mike november oscar papa quebec romeo sierra tango uniform victor whiskey"
+).split()
+
+# 100 nanosecond ticks of 2020-01-01, as in DateTimeText records
+TICKS_2020 = (datetime.date(2020, 1, 1) - datetime.date(1, 1, 1)).days * 864 * 10**9
+
+
+@dataclass(frozen=True)
+class CorpusConfig:
+    """Shape of generated documents.
+
+    Each document is a root element holding items until it reaches `size` bytes.
+    An item is a tree `depth` levels deep where each element has `fan_out`
+    children, the leaves hold one text record drawn from `mix`, which maps
+    the keys of `TEXT_RECORDS` to weights.  `dictionary_ratio` of the names and
+    of the Chars text are strings of the static dictionary.
+    """
+
+    documents: int = 10
+    size: int = 1 << 16
+    depth: int = 3
+    fan_out: int = 4
+    mix: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    dictionary_ratio: float = 0.5
+    attributes: int = 1
+    seed: int = 0
+
+
+class Generator:
+    """Writes the documents of a configuration, see `generate`."""
+
+    def __init__(self, config: CorpusConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.encoder = Encoder(None)
+        self.kinds = list(config.mix)
+        self.weights = [config.mix[kind] for kind in self.kinds]
+        # inline names, which are not in the dictionary
+        self.names = [
+            name
+            for name in (f"{word}{i}" for word in WORDS for i in range(4))
+            if name not in DICTIONARY_IDS
+        ]
+
+    def document(self) -> bytes:
+        out = bytearray(self.encoder.element_record("s:Envelope"))
+        out += self.encoder.attribute_record(
+            "xmlns:s", "http://www.w3.org/2003/05/soap-envelope"
+        )
+        while len(out) < self.config.size:
+            self.element(out, self.config.depth)
+        out.append(0x01)
+        return bytes(out)
+
+    def element(self, out: bytearray, depth: int) -> None:
+        rng = self.random
+        out += self.encoder.element_record(self.tag())
+        for _ in range(self.config.attributes):
+            out += self.encoder.attribute_name(self.tag())
+            out += self.text(0x98)
+        if depth <= 0:
+            kind = rng.choices(self.kinds, self.weights)[0]
+            record = self.text(TEXT_RECORDS[kind])
+            # the last text record ends the element
+            out += bytes((record[0] | 1,)) + record[1:]
+            return
+        for _ in range(self.config.fan_out):
+            self.element(out, depth - 1)
+        out.append(0x01)
+
+    def tag(self) -> str:
+        rng = self.random
+        prefix = rng.choice(PREFIXES)
+        if rng.random() < self.config.dictionary_ratio:
+            name = rng.choice(DICTIONARY_NAMES)
+        else:
+            name = rng.choice(self.names)
+        return f"{prefix}:{name}" if prefix else name
+
+    def text(self, record_type: int) -> bytes:
+        rng = self.random
+        if record_type == 0x98:
+            if rng.random() < self.config.dictionary_ratio:
+                record_type = 0xAA
+            else:
+                text = " ".join(rng.choices(WORDS, k=rng.randint(1, 8)))
+                return bytes((record_type,)) + chars8(text)
+
+        if record_type == 0xAA:
+            key = DICTIONARY_IDS[rng.choice(DICTIONARY_NAMES)]
+            return bytes((record_type,)) + int31(key)
+        if record_type == 0x88:
+            return bytes((record_type, rng.randrange(256)))
+        if record_type == 0x8C:
+            return bytes((record_type,)) + rng.randbytes(4)
+        if record_type == 0x86:
+            return bytes((rng.choice((0x84, 0x86)),))
+        if record_type == 0x9E:
+            data = rng.randbytes(rng.randint(16, 64))
+            return bytes((record_type, len(data))) + data
+        if record_type == 0xAC:
+            return bytes((record_type,)) + rng.randbytes(16)
+        if record_type == 0x96:
+            ticks = TICKS_2020 + rng.randrange(10**15)
+            return bytes((record_type,)) + (ticks << 2 | 1).to_bytes(8)
+        raise ValueError(f"Unknown text record: 0x{record_type:02X}")
+
+
+def generate(config: CorpusConfig) -> list[bytes]:
+    """Generates the documents of a configuration."""
+    generator = Generator(config)
+    return [generator.document() for _ in range(config.documents)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--size", type=int, default=1 << 16)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--dictionary-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = CorpusConfig(
+        documents=args.documents,
+        size=args.size,
+        depth=args.depth,
+        fan_out=args.fan_out,
+        dictionary_ratio=args.dictionary_ratio,
+        seed=args.seed,
+    )
+    args.output.write_bytes(b"".join(generate(config)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Measures decoding of the benchmark corpora and writes the results as JSON.
+
+For each corpus: the throughput of a full decode in MB/s and elements/s, the
+peak memory allocated while decoding, and the time spent on each record type.
+Results of two commits are compared with `--compare`:
+
+python -m benchmarks.run --users 1000 10000 100000 --output head.json
+python -m benchmarks.run --output change.json --compare head.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from io import BytesIO
+
+from pynbfx.analyze import CorpusReport, analyze_message
+from pynbfx.reader import build_tree, iter_events
+
+from .corpus import CorpusConfig, best_of, enumeration_page, generate
+
+
+def decode_all(documents: list[bytes]) -> int:
+    """Decodes every document into an element tree, returning the number of
+    elements."""
+    return sum(
+        sum(1 for _ in build_tree(iter_events(BytesIO(document))).iter())
+        for document in documents
+    )
+
+
+def peak_memory(documents: list[bytes]) -> int:
+    """Returns the peak memory allocated while decoding the largest document."""
+    document = max(documents, key=len)
+    tracemalloc.start()
+    build_tree(iter_events(BytesIO(document)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def record_costs(documents: list[bytes]) -> dict[str, dict[str, float]]:
+    """Returns the count of each record type and the nanoseconds spent decoding
+    one, attribute records are decoded with their element record."""
+    report = CorpusReport()
+    for document in documents:
+        analyze_message(BytesIO(document), report)
+    return {
+        f"0x{record_type:02X}": {
+            "count": count,
+            "ns": (
+                report.record_ns[record_type] / count
+                if record_type in report.record_ns
+                else None
+            ),
+        }
+        for record_type, count in sorted(report.record_counts.items())
+    }
+
+
+def measure(documents: list[bytes], repeat: int) -> dict:
+    size = sum(map(len, documents))
+    elements = decode_all(documents)
+    elapsed = best_of(lambda: decode_all(documents), repeat)
+    return {
+        "documents": len(documents),
+        "bytes": size,
+        "elements": elements,
+        "seconds": elapsed,
+        "mb_per_s": size / 1e6 / elapsed,
+        "elements_per_s": elements / elapsed,
+        "peak_memory": peak_memory(documents),
+        "records": record_costs(documents),
+    }
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def corpora(args) -> dict[str, list[bytes]]:
+    named = {f"pull-{users}": [enumeration_page(users)] for users in args.users}
+    config = CorpusConfig(
+        documents=args.documents,
+        size=args.size,
+        depth=args.depth,
+        fan_out=args.fan_out,
+        dictionary_ratio=args.dictionary_ratio,
+        seed=args.seed,
+    )
+    named[
+        f"synthetic-{args.size}-d{args.depth}-f{args.fan_out}"
+        f"-r{args.dictionary_ratio:g}"
+    ] = generate(config)
+    return named
+
+
+def compare(results: dict, previous: dict) -> str:
+    """Formats the change of each measurement against previous results."""
+    lines = [f"{'corpus':<32} {'MB/s':>10} {'change':>8} {'peak MB':>10} {'change':>8}"]
+    for name, result in results["corpora"].items():
+        old = previous["corpora"].get(name)
+        speed = f"{result['mb_per_s'] / old['mb_per_s'] - 1:+8.1%}" if old else ""
+        memory = (
+            f"{result['peak_memory'] / old['peak_memory'] - 1:+8.1%}" if old else ""
+        )
+        lines.append(
+            f"{name:<32} {result['mb_per_s']:10.2f} {speed:>8} "
+            f"{result['peak_memory'] / 1e6:10.2f} {memory:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--size", type=int, default=1 << 16)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--dictionary-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    results = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "corpora": {},
+    }
+    for name, documents in corpora(args).items():
+        result = measure(documents, args.repeat)
+        results["corpora"][name] = result
+        print(
+            f"{name:<32} {result['bytes'] / 1e6:8.2f} MB "
+            f"{result['mb_per_s']:8.2f} MB/s {result['elements_per_s']:10.0f} el/s "
+            f"{result['peak_memory'] / 1e6:8.2f} MB peak"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(results, json.load(f)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .encoder import encode, encode_into, encoded_size
+
+__all__ = ["encode", "encode_into", "encoded_size"]
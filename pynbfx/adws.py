@@ -0,0 +1,340 @@
+import base64
+import sys
+from array import array
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Callable, Iterable, Iterator
+
+from .reader import iter_events
+from .utils import local_name
+
+"""
+Active Directory Web Services (ADWS) enumeration results.
+
+A `wsen:PullResponse` holds the directory objects of a page in `wsen:Items`, each
+object an element such as `addata:user` holding one element per LDAP attribute,
+with the values of the attribute as `ad:value` children typed by `xsi:type`:
+
+    <addata:user>
+        <addata:sAMAccountName LdapSyntax="UnicodeString">
+            <ad:value xsi:type="xsd:string">Administrator</ad:value>
+        </addata:sAMAccountName>
+    </addata:user>
+"""
+
+ITEMS_TAG = "wsen:Items"
+VALUE_TAG = "ad:value"
+XSI_TYPE = "xsi:type"
+
+# kinds of the values yielded by iter_item_values
+ITEM_START = 0
+ITEM_VALUE = 1
+ITEM_END = 2
+ITEM_ATTRIBUTE = 3
+
+
+def xsd_boolean(text: str) -> bool:
+    return text.lower() in ("true", "1")
+
+
+# converters of the text of values by their xsi:type, other types are kept as text
+XSD_TYPES: dict[str, Callable[[str], Any]] = {
+    "xsd:string": str,
+    "xsd:base64Binary": base64.b64decode,
+    "xsd:int": int,
+    "xsd:long": int,
+    "xsd:boolean": xsd_boolean,
+}
+
+
+@dataclass
+class DirectoryItem:
+    """A directory object from the items of a PullResponse.
+
+    `attributes` maps the names of the LDAP attributes, without their prefix, to
+    the list of their values.
+    """
+
+    object_class: str
+    attributes: dict[str, list[Any]] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> list[Any]:
+        return self.attributes[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Returns the first value of the attribute."""
+        values = self.attributes.get(name)
+        return values[0] if values else default
+
+
+def typed_value(xsi_type: str | None, text: str) -> Any:
+    """Converts the text of an `ad:value` by its xsi:type."""
+    if (convert := XSD_TYPES.get(xsi_type)) is None:
+        return text
+    return convert(text)
+
+
+def iter_item_values(events: Iterable[tuple[str, Any]]) -> Iterator[tuple[int, Any]]:
+    """Flattens the directory objects in the events of a PullResponse.
+
+    Yields `(ITEM_START, object_class)` for each object, `(ITEM_ATTRIBUTE,
+    attribute)` for each of its attributes, including those without values,
+    `(ITEM_VALUE, (attribute, value))` for each of their values and
+    `(ITEM_END, object_class)` once its end event is reached.
+
+    Args:
+        events (Iterable[tuple[str, Any]]): events as yielded by `iter_events`
+
+    Raises:
+        ValueError: If a value can not be converted to its xsi:type.
+    """
+    depth = 0
+    # depth of the items of the current wsen:Items element
+    items_depth = None
+    object_class = None
+    attribute = None
+    xsi_type = None
+    text: list[str] = []
+
+    for kind, value in events:
+        if kind == "start":
+            tag, attrib = value
+            depth += 1
+            if tag == ITEMS_TAG and items_depth is None:
+                items_depth = depth + 1
+            elif depth == items_depth:
+                object_class = local_name(tag)
+                yield ITEM_START, object_class
+            elif object_class is not None and depth == items_depth + 1:
+                attribute = local_name(tag)
+                yield ITEM_ATTRIBUTE, attribute
+            elif attribute is not None and depth == items_depth + 2:
+                xsi_type = attrib.get(XSI_TYPE) if tag == VALUE_TAG else None
+                text = []
+
+        elif kind == "data":
+            if attribute is not None and depth == items_depth + 2:
+                text.append(value)
+
+        else:
+            if items_depth is not None:
+                if object_class is not None and depth == items_depth + 2:
+                    try:
+                        typed = typed_value(xsi_type, "".join(text))
+                    except ValueError as e:
+                        raise ValueError(f"Invalid {xsi_type} value: {e}") from e
+                    yield ITEM_VALUE, (attribute, typed)
+                elif depth == items_depth + 1:
+                    attribute = None
+                elif depth == items_depth:
+                    yield ITEM_END, object_class
+                    object_class = None
+                elif depth == items_depth - 1:
+                    items_depth = None
+            depth -= 1
+
+
+def iter_items_from_events(
+    events: Iterable[tuple[str, Any]],
+) -> Iterator[DirectoryItem]:
+    """Yields each directory object in the events of a PullResponse when its end
+    event is reached.
+
+    Args:
+        events (Iterable[tuple[str, Any]]): events as yielded by `iter_events`
+
+    Raises:
+        ValueError: If a value can not be converted to its xsi:type.
+    """
+    item = None
+    for kind, value in iter_item_values(events):
+        if kind == ITEM_START:
+            item = DirectoryItem(value)
+        elif kind == ITEM_ATTRIBUTE:
+            item.attributes.setdefault(value, [])
+        elif kind == ITEM_VALUE:
+            attribute, typed = value
+            item.attributes.setdefault(attribute, []).append(typed)
+        else:
+            yield item
+
+
+def iter_items(stream: BytesIO) -> Iterator[DirectoryItem]:
+    """Yields each directory object of the PullResponse envelope at the current
+    position of the stream, as soon as its records are decoded.
+
+    Example:
+        >>> for user in iter_items(stream):
+        ...     print(user.get("sAMAccountName"), user["objectSid"])
+
+    Raises:
+        ValueError: If a record is malformed or a value can not be converted.
+    """
+    return iter_items_from_events(iter_events(stream))
+
+
+class Column:
+    """Values of one attribute for every row of a `ColumnarItems`.
+
+    The values of all rows are stored flat, the values of row `i` are
+    `values[offsets[i] : offsets[i + 1]]`.  Integers are stored in an
+    `array("q")` as long as they fit, other values in a list with strings
+    interned.  Bit `i` of `present` is set if row `i` has the attribute, which
+    it can have without values.
+    """
+
+    __slots__ = ("name", "values", "offsets", "present", "marked")
+
+    def __init__(self, name: str, rows: int = 0):
+        self.name = name
+        self.values: array | list = array("q")
+        self.offsets = array("Q", bytes(8 * (rows + 1)))
+        self.present = bytearray((rows + 7) // 8)
+        self.marked = False
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def append(self, value: Any) -> None:
+        """Adds a value to the row being built."""
+        if isinstance(self.values, array):
+            if type(value) is int:
+                try:
+                    self.values.append(value)
+                    return
+                except OverflowError:
+                    pass
+            self.values = self.values.tolist()
+        self.values.append(sys.intern(value) if type(value) is str else value)
+
+    def mark(self) -> None:
+        """Marks the row being built present, even if it gets no values."""
+        self.marked = True
+
+    def end_row(self) -> None:
+        """Ends the row being built, marking it present if it has values or was
+        marked."""
+        row = len(self)
+        if row % 8 == 0:
+            self.present.append(0)
+        if self.marked or len(self.values) > self.offsets[-1]:
+            self.present[row // 8] |= 1 << (row % 8)
+        self.offsets.append(len(self.values))
+        self.marked = False
+
+    def is_null(self, row: int) -> bool:
+        return not self.present[row // 8] & (1 << (row % 8))
+
+    def get(self, row: int) -> list[Any] | None:
+        """Returns the values of the row, None if the row has no such attribute."""
+        if self.is_null(row):
+            return None
+        return list(self.values[self.offsets[row] : self.offsets[row + 1]])
+
+    def to_numpy(self):
+        """Converts the column to a NumPy masked array, with one element per row.
+
+        Integer columns are int64 arrays, other columns object arrays.  Rows of a
+        multi-valued attribute hold a tuple of their values, rows with the
+        attribute but no values an empty tuple.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        import numpy
+
+        mask = numpy.unpackbits(
+            numpy.frombuffer(bytes(self.present), dtype=numpy.uint8),
+            count=len(self),
+            bitorder="little",
+        ).astype(bool)
+        offsets = numpy.frombuffer(self.offsets, dtype=numpy.uint64).astype(numpy.int64)
+        counts = numpy.diff(offsets)
+
+        if isinstance(self.values, array) and numpy.array_equal(counts, mask):
+            data = numpy.zeros(len(self), dtype=numpy.int64)
+            data[counts == 1] = numpy.frombuffer(self.values, dtype=numpy.int64)
+        else:
+            data = numpy.empty(len(self), dtype=object)
+            for row in range(len(self)):
+                start, end = offsets[row], offsets[row + 1]
+                data[row] = (
+                    self.values[start]
+                    if end - start == 1
+                    else tuple(self.values[start:end])
+                )
+        return numpy.ma.MaskedArray(data, mask=~mask)
+
+
+class ColumnarItems:
+    """Directory objects stored by column, one `Column` per attribute.
+
+    Rows are added straight from the values of `iter_item_values`, without
+    building a dict per object.
+
+    Example:
+        >>> table = ColumnarItems()
+        >>> for stream in pages:
+        ...     table.add_events(iter_events(stream))
+        >>> names = table.columns["sAMAccountName"]
+    """
+
+    def __init__(self):
+        self.object_classes: list[str] = []
+        self.columns: dict[str, Column] = {}
+
+    def __len__(self) -> int:
+        return len(self.object_classes)
+
+    def add_events(self, events: Iterable[tuple[str, Any]]) -> None:
+        """Adds a row for each directory object in the events of a PullResponse.
+
+        Raises:
+            ValueError: If a value can not be converted to its xsi:type.
+        """
+        columns = self.columns
+        for kind, value in iter_item_values(events):
+            if kind == ITEM_VALUE:
+                attribute, typed = value
+                if (column := columns.get(attribute)) is None:
+                    column = columns[attribute] = Column(attribute, len(self))
+                column.append(typed)
+            elif kind == ITEM_ATTRIBUTE:
+                if (column := columns.get(value)) is None:
+                    column = columns[value] = Column(value, len(self))
+                column.mark()
+            elif kind == ITEM_END:
+                self.object_classes.append(sys.intern(value))
+                for column in columns.values():
+                    column.end_row()
+
+    def row(self, i: int) -> DirectoryItem:
+        """Returns row `i` as a `DirectoryItem`."""
+        item = DirectoryItem(self.object_classes[i])
+        for name, column in self.columns.items():
+            if (values := column.get(i)) is not None:
+                item.attributes[name] = values
+        return item
+
+    def to_numpy(self) -> dict:
+        """Converts every column with `Column.to_numpy`.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        return {name: column.to_numpy() for name, column in self.columns.items()}
+
+
+def export_columns(streams: Iterable[BytesIO]) -> ColumnarItems:
+    """Decodes the directory objects of PullResponse envelopes into columns.
+
+    Args:
+        streams (Iterable[BytesIO]): streams, each positioned at a PullResponse
+
+    Raises:
+        ValueError: If a record is malformed or a value can not be converted.
+    """
+    table = ColumnarItems()
+    for stream in streams:
+        table.add_events(iter_events(stream))
+    return table
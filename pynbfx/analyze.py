@@ -0,0 +1,367 @@
+import argparse
+import mmap
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Iterator
+
+from .combinators import read_int31
+from .encoder import string
+from .framing import (
+    BINARY_SESSION_ENCODING,
+    VERSION_RECORD,
+    iter_envelopes,
+    string_table_parser,
+)
+from .records import (
+    ATTRIBUTE_TYPES,
+    DICTIONARY_NAME_TYPES,
+    DICTIONARY_TEXT,
+    DICTIONARY_XMLNS_ATTRIBUTE,
+    ELEMENT_TYPES,
+    END_TAG,
+    INLINE_PREFIX_TYPES,
+    SHORT_DICTIONARY_XMLNS_ATTRIBUTE,
+    SHORT_XMLNS_ATTRIBUTE,
+    TEXT_TYPES,
+    XMLNS_ATTRIBUTE,
+    record_event_parser,
+    skip_string,
+    skip_text,
+    text_payload_size,
+)
+
+"""
+Analysis of a corpus of captured NBFX messages.
+
+Counts the records of each type and the time the decoder spends on them, and
+where the strings of the messages come from: written inline, from the static
+dictionary, or from the session dictionary of [MC-NBFSE], which decode as the
+`[[VALUE_0x..]]` placeholders of `DICTIONARY`.  The inline strings which would
+save the most bytes as session strings are recommended:
+
+    python -m pynbfx.analyze captures/ --top 20
+
+Files hold either NBFX documents one after the other, or a [MC-NMF] session as
+received from the connection.  Files are mapped and scanned one at a time, and
+at most `capacity` strings are counted, so memory does not grow with the corpus.
+"""
+
+# bytes of a reference to a session string, ids of a full session take 2 bytes
+ID_SIZE = 2
+
+CHARS_TEXT_TYPES = {0x98, 0x9A, 0x9C}
+
+# kinds of strings
+NAME = "name"
+NAMESPACE = "namespace"
+TEXT = "text"
+
+# sources of strings
+INLINE = "inline"
+STATIC = "dictionary"
+SESSION = "session"
+
+
+def savings(value: str, uses: int, inline_bytes: int) -> int:
+    """Estimates the bytes saved by sending a string once in a StringTable and
+    referring to it by id, instead of writing it inline `uses` times."""
+    return inline_bytes - uses * ID_SIZE - len(string(value))
+
+
+class StringCounts:
+    """Uses of inline strings and the bytes they take.
+
+    Once more than twice `capacity` strings are counted, only the `capacity`
+    strings with the largest savings are kept, so the counts of rare strings
+    are approximate.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        # uses and inline bytes of each string
+        self.counts: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, value: str, size: int) -> None:
+        if (entry := self.counts.get(value)) is not None:
+            entry[0] += 1
+            entry[1] += size
+            return
+        if len(self.counts) >= 2 * self.capacity:
+            self.prune()
+        self.counts[value] = [1, size]
+
+    def prune(self) -> None:
+        """Keeps the `capacity` strings with the largest savings."""
+        kept = sorted(
+            self.counts.items(),
+            key=lambda item: savings(item[0], *item[1]),
+            reverse=True,
+        )[: self.capacity]
+        self.counts = dict(kept)
+
+    def top(self, count: int) -> list[tuple[str, int, int]]:
+        """Returns the strings with the largest positive savings, as tuples of
+        the string, its uses and the bytes saved."""
+        ranked = sorted(
+            (
+                (value, uses, savings(value, uses, size))
+                for value, (uses, size) in self.counts.items()
+            ),
+            key=lambda item: item[2],
+            reverse=True,
+        )
+        return [item for item in ranked[:count] if item[2] > 0]
+
+
+@dataclass
+class CorpusReport:
+    """Counts gathered over the messages of a corpus."""
+
+    messages: int = 0
+    bytes: int = 0
+    failures: int = 0
+    # records, and nanoseconds spent decoding them, by record type; attribute
+    # records are decoded with their element record
+    record_counts: Counter = field(default_factory=Counter)
+    record_ns: Counter = field(default_factory=Counter)
+    # strings by their kind and source
+    sources: Counter = field(default_factory=Counter)
+    strings: StringCounts = field(default_factory=StringCounts)
+
+    def add_string(self, kind: str, value: str, size: int) -> None:
+        self.sources[kind, INLINE] += 1
+        self.strings.add(value, size)
+
+    def add_key(self, kind: str, key: int | None) -> None:
+        if key is not None:
+            self.sources[kind, SESSION if key % 2 else STATIC] += 1
+
+    def recommendations(self, count: int = 20) -> list[tuple[str, int, int]]:
+        """Returns the inline strings which would save the most bytes as session
+        strings, as tuples of the string, its uses and the bytes saved."""
+        return self.strings.top(count)
+
+    def format(self, count: int = 20) -> str:
+        """Formats the report as text tables."""
+        lines = [
+            f"messages: {self.messages}  bytes: {self.bytes}  "
+            f"failures: {self.failures}",
+            "",
+            f"{'record':>8} {'count':>12} {'ns/record':>12}",
+        ]
+        for record_type, records in sorted(self.record_counts.items()):
+            ns = self.record_ns.get(record_type)
+            per_record = f"{ns / records:12.0f}" if ns is not None else f"{'':>12}"
+            lines.append(f"    0x{record_type:02X} {records:12} {per_record}")
+
+        lines += ["", f"{'string':<10} {INLINE:>12} {STATIC:>12} {SESSION:>12}"]
+        for kind in (NAME, NAMESPACE, TEXT):
+            counts = [
+                self.sources[kind, source] for source in (INLINE, STATIC, SESSION)
+            ]
+            lines.append(f"{kind:<10} " + " ".join(f"{c:12}" for c in counts))
+
+        lines += ["", f"{'saved':>10} {'uses':>10}  string"]
+        for value, uses, saved in self.recommendations(count):
+            lines.append(f"{saved:10} {uses:10}  {value!r}")
+        return "\n".join(lines)
+
+
+def read_inline(stream: BytesIO) -> tuple[str, int] | None:
+    """Reads an int31 length prefixed string, returning it with its size."""
+    start = stream.tell()
+    length = read_int31(stream)
+    if length is None or len(data := stream.read(length)) != length:
+        return None
+    return data.decode("utf-8", "replace"), stream.tell() - start
+
+
+def scan_text(stream: BytesIO, record_type: int, report: CorpusReport) -> bool:
+    """Counts the string of a text record, advancing over it."""
+    if record_type & ~1 == DICTIONARY_TEXT:
+        report.add_key(TEXT, key := read_int31(stream))
+        return key is not None
+
+    if record_type & ~1 not in CHARS_TEXT_TYPES:
+        return skip_text(stream, record_type)
+
+    start = stream.tell()
+    size = text_payload_size(stream, record_type)
+    if size is None or len(data := stream.read(size)) != size:
+        return False
+    report.add_string(TEXT, data.decode("utf-8", "replace"), stream.tell() - start)
+    return True
+
+
+def scan_name(stream: BytesIO, record_type: int, report: CorpusReport) -> bool:
+    """Counts the name of an element or attribute record, advancing over it."""
+    if record_type in INLINE_PREFIX_TYPES and not skip_string(stream):
+        return False
+    if record_type in DICTIONARY_NAME_TYPES:
+        report.add_key(NAME, key := read_int31(stream))
+        return key is not None
+    if (name := read_inline(stream)) is None:
+        return False
+    report.add_string(NAME, *name)
+    return True
+
+
+def scan_attributes(stream: BytesIO, report: CorpusReport) -> bool:
+    """Counts the attribute records at the current position, advancing over them."""
+    while (peek := stream.read(1)) and peek[0] in ATTRIBUTE_TYPES:
+        record_type = peek[0]
+        report.record_counts[record_type] += 1
+
+        if record_type in (XMLNS_ATTRIBUTE, DICTIONARY_XMLNS_ATTRIBUTE):
+            if not skip_string(stream):
+                return False
+        if record_type in (SHORT_XMLNS_ATTRIBUTE, XMLNS_ATTRIBUTE):
+            if (uri := read_inline(stream)) is None:
+                return False
+            report.add_string(NAMESPACE, *uri)
+        elif record_type in (
+            SHORT_DICTIONARY_XMLNS_ATTRIBUTE,
+            DICTIONARY_XMLNS_ATTRIBUTE,
+        ):
+            report.add_key(NAMESPACE, key := read_int31(stream))
+            if key is None:
+                return False
+        else:
+            if not scan_name(stream, record_type, report):
+                return False
+            text = stream.read(1)
+            if not text or not scan_text(stream, text[0], report):
+                return False
+
+    if peek:
+        stream.seek(-1, 1)
+    return True
+
+
+def analyze_message(stream: BytesIO, report: CorpusReport, parser=None) -> bool:
+    """Decodes the element at the current position record by record, timing the
+    decoder and counting the strings of each record.
+
+    Returns:
+        bool: False if a record is malformed or of a type the decoder does not
+        implement, the stream is then left at it.
+    """
+    parser = parser or record_event_parser()
+    depth = 0
+    start = stream.tell()
+    report.messages += 1
+
+    while True:
+        position = stream.tell()
+        if not (record := stream.read(1)):
+            break
+        record_type = record[0]
+        stream.seek(position)
+
+        begin = time.perf_counter_ns()
+        try:
+            result = parser(stream)
+        except (ValueError, NotImplementedError):
+            result = None
+        elapsed = time.perf_counter_ns() - begin
+        if not result:
+            report.failures += 1
+            stream.seek(position)
+            return False
+        end = stream.tell()
+        report.record_counts[record_type] += 1
+        report.record_ns[record_type] += elapsed
+
+        stream.seek(position + 1)
+        if record_type in ELEMENT_TYPES:
+            scan_name(stream, record_type, report)
+            scan_attributes(stream, report)
+            depth += 1
+        elif record_type in TEXT_TYPES:
+            scan_text(stream, record_type, report)
+        stream.seek(end)
+
+        if record_type == END_TAG or (
+            record_type in TEXT_TYPES and record_type % 2 == 1
+        ):
+            depth -= 1
+        if depth <= 0:
+            break
+
+    report.bytes += stream.tell() - start
+    return True
+
+
+def analyze_stream(stream: BytesIO, report: CorpusReport) -> None:
+    """Analyzes the messages of a stream, either NBFX documents one after the
+    other or an [MC-NMF] session."""
+    parser = record_event_parser()
+    if stream.read(1) != bytes((VERSION_RECORD,)):
+        stream.seek(0)
+        while stream.read(1):
+            stream.seek(-1, 1)
+            if not analyze_message(stream, report, parser):
+                return
+        return
+
+    stream.seek(0)
+    try:
+        for envelope in iter_envelopes(stream):
+            resume = stream.tell()
+            stream.seek(envelope.offset if envelope.offset is not None else resume)
+            payload = (
+                stream if envelope.offset is not None else BytesIO(envelope.payload)
+            )
+            if (
+                envelope.encoding == BINARY_SESSION_ENCODING
+                and string_table_parser()(payload).is_err()
+            ):
+                report.failures += 1
+            else:
+                analyze_message(payload, report, parser)
+            stream.seek(resume)
+    except ValueError:
+        report.failures += 1
+
+
+def iter_capture_files(path: Path) -> Iterator[Path]:
+    """Yields the non-empty files of a directory tree, or the file itself."""
+    if path.is_file():
+        yield path
+        return
+    for file in sorted(path.rglob("*")):
+        if file.is_file() and file.stat().st_size:
+            yield file
+
+
+def analyze(paths: list[Path], capacity: int = 10000) -> CorpusReport:
+    """Analyzes every capture file in the paths, see `analyze_stream`."""
+    report = CorpusReport(strings=StringCounts(capacity))
+    for path in paths:
+        for file in iter_capture_files(Path(path)):
+            with open(file, "rb") as f:
+                # closed once the views of its envelopes are released
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            analyze_stream(data, report)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyzes captured NBFX messages.")
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=10000)
+    args = parser.parse_args()
+
+    report = analyze(args.paths, args.capacity)
+    print(report.format(args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import hashlib
+from io import BytesIO
+from typing import Any, Callable, Iterable
+
+from .reader import feed_events, iter_events
+
+"""
+Exclusive XML Canonicalization 1.0, without comments, of decoded NBFX documents.
+
+    https://www.w3.org/TR/xml-exc-c14n/
+
+The canonicalizer is a target for the decoder's events and writes canonical
+bytes as the events arrive, so a digest of a signed part is computed in the same
+pass that decodes it:
+
+    >>> digests = digest_ids(stream, ids=["_0", "_1"])
+"""
+
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# local names of the attributes identifying signed parts, such as wsu:Id
+ID_ATTRIBUTES = {"Id"}
+
+TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", "\r": "&#xD;"})
+ATTRIBUTE_ESCAPES = str.maketrans(
+    {
+        "&": "&amp;",
+        "<": "&lt;",
+        '"': "&quot;",
+        "\t": "&#x9;",
+        "\n": "&#xA;",
+        "\r": "&#xD;",
+    }
+)
+
+
+def split_name(name: str) -> tuple[str, str]:
+    """Splits a qualified name into its prefix, empty if none, and local name."""
+    prefix, _, local = name.rpartition(":")
+    return prefix, local
+
+
+def namespace_declarations(attrib: dict[str, Any]) -> dict[str, str]:
+    """Returns the namespaces declared by the attributes, by prefix."""
+    declarations = {}
+    for name, value in attrib.items():
+        if name == "xmlns":
+            declarations[""] = value
+        elif name.startswith("xmlns:"):
+            declarations[name[6:]] = value
+    return declarations
+
+
+class ExclusiveCanonicalizer:
+    """Target writing the exclusive canonical form of an element as UTF-8 bytes.
+
+    Args:
+        write (Callable[[bytes], Any]): called with each piece of canonical bytes,
+            such as the `update` method of a `hashlib` object
+        namespaces (dict[str, str] | None): namespaces in scope at the element,
+            declared by its ancestors, by prefix
+        inclusive_prefixes (Iterable[str]): the InclusiveNamespaces PrefixList,
+            "#default" for the default namespace
+
+    Raises:
+        ValueError: from `start` if a prefix is not declared.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[bytes], Any],
+        namespaces: dict[str, str] | None = None,
+        inclusive_prefixes: Iterable[str] = (),
+    ):
+        self._write = write
+        self._inclusive = {
+            "" if prefix == "#default" else prefix for prefix in inclusive_prefixes
+        }
+        # namespaces in scope, and namespaces rendered in the output, of each level
+        self._scopes = [dict(namespaces or {})]
+        self._rendered: list[dict[str, str]] = [{}]
+
+    def start(self, tag: str, attrib: dict[str, Any]) -> None:
+        scope = self._scopes[-1]
+        if declarations := namespace_declarations(attrib):
+            scope = scope | declarations
+        self._scopes.append(scope)
+
+        attributes = [
+            (name, value)
+            for name, value in attrib.items()
+            if name != "xmlns" and not name.startswith("xmlns:")
+        ]
+
+        # prefixes visibly utilized by the element and its attributes
+        used = {split_name(tag)[0]}
+        used.update(split_name(name)[0] for name, _ in attributes if ":" in name)
+        used.update(prefix for prefix in self._inclusive if prefix in scope)
+        used.discard("xml")
+
+        rendered = self._rendered[-1]
+        output = []
+        for prefix in sorted(used):
+            uri = scope.get(prefix, "")
+            if prefix and not uri:
+                raise ValueError(f"Undeclared namespace prefix: {prefix}")
+            if rendered.get(prefix, "") != uri:
+                if rendered is self._rendered[-1]:
+                    rendered = dict(rendered)
+                rendered[prefix] = uri
+                output.append((f"xmlns:{prefix}" if prefix else "xmlns", uri))
+        self._rendered.append(rendered)
+
+        def attribute_key(attribute: tuple[str, Any]) -> tuple[str, str]:
+            prefix, local = split_name(attribute[0])
+            if prefix == "xml":
+                return XML_NAMESPACE, local
+            return scope.get(prefix, "") if prefix else "", local
+
+        output += sorted(attributes, key=attribute_key)
+
+        parts = ["<", tag]
+        for name, value in output:
+            parts += [" ", name, '="', str(value).translate(ATTRIBUTE_ESCAPES), '"']
+        parts.append(">")
+        self._write("".join(parts).encode("utf-8"))
+
+    def data(self, text: str) -> None:
+        self._write(text.translate(TEXT_ESCAPES).encode("utf-8"))
+
+    def end(self, tag: str) -> None:
+        self._scopes.pop()
+        self._rendered.pop()
+        self._write(f"</{tag}>".encode("utf-8"))
+
+    def close(self) -> None:
+        return None
+
+
+def canonicalize(stream: BytesIO, inclusive_prefixes: Iterable[str] = ()) -> bytes:
+    """Returns the exclusive canonical form of the element at the current position
+    of the stream.
+
+    Raises:
+        ValueError: If a record is malformed or a prefix is not declared.
+    """
+    out = BytesIO()
+    feed_events(
+        iter_events(stream), ExclusiveCanonicalizer(out.write, None, inclusive_prefixes)
+    )
+    return out.getvalue()
+
+
+def element_id(attrib: dict[str, Any]) -> str | None:
+    """Returns the value of the Id or wsu:Id attribute of an element."""
+    for name, value in attrib.items():
+        if split_name(name)[1] in ID_ATTRIBUTES:
+            return str(value)
+    return None
+
+
+def digest_ids(
+    stream: BytesIO,
+    ids: Iterable[str] | None = None,
+    algorithm: str = "sha256",
+    inclusive_prefixes: Iterable[str] = (),
+) -> dict[str, bytes]:
+    """Computes the digests of the exclusive canonical form of the elements with
+    an Id, such as the parts referenced by a WS-Security signature.
+
+    Only the canonicalizers of the elements being digested and the namespaces in
+    scope are held, the document is decoded and digested in a single pass.
+
+    Args:
+        stream (BytesIO): stream positioned at the root element
+        ids (Iterable[str] | None): Ids of the elements to digest, None for all
+        algorithm (str): name of a `hashlib` algorithm
+        inclusive_prefixes (Iterable[str]): the InclusiveNamespaces PrefixList
+
+    Returns:
+        dict[str, bytes]: the digest of each element found, by Id.
+
+    Raises:
+        ValueError: If a record is malformed or a prefix is not declared.
+    """
+    wanted = None if ids is None else set(ids)
+    inclusive_prefixes = list(inclusive_prefixes)
+    digests = {}
+
+    scopes: list[dict[str, str]] = [{}]
+    # element depth, Id, hash and canonicalizer of each element being digested
+    active: list[tuple[int, str, Any, ExclusiveCanonicalizer]] = []
+
+    for kind, value in iter_events(stream):
+        if kind == "start":
+            tag, attrib = value
+            scope = scopes[-1]
+            if (id_ := element_id(attrib)) is not None and (
+                wanted is None or id_ in wanted
+            ):
+                digest = hashlib.new(algorithm)
+                canonicalizer = ExclusiveCanonicalizer(
+                    digest.update, scope, inclusive_prefixes
+                )
+                active.append((len(scopes), id_, digest, canonicalizer))
+            for *_, canonicalizer in active:
+                canonicalizer.start(tag, attrib)
+            if declarations := namespace_declarations(attrib):
+                scope = scope | declarations
+            scopes.append(scope)
+
+        elif kind == "data":
+            for *_, canonicalizer in active:
+                canonicalizer.data(value)
+
+        else:
+            for *_, canonicalizer in active:
+                canonicalizer.end(value)
+            scopes.pop()
+            if active and active[-1][0] == len(scopes):
+                _, id_, digest, _ = active.pop()
+                digests[id_] = digest.digest()
+
+    return digests
@@ -0,0 +1,86 @@
+import argparse
+import json
+from pathlib import Path
+
+from .analyze import iter_capture_files
+from .profiling import profile
+from .replay import replay, replay_file
+
+"""
+The `pynbfx` command.
+
+    pynbfx bench captures/ --workers 4
+
+replays captured messages through the decoder and reports its throughput, see
+`pynbfx.replay`.
+
+    pynbfx profile captures/ --collapsed parsers.folded
+
+replays them in a single process while profiling the parsers, see
+`pynbfx.profiling`.
+"""
+
+
+def bench(args: argparse.Namespace) -> None:
+    stats, seconds = replay(args.paths, args.workers)
+    print(stats.format(seconds))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "files": stats.files,
+                    "messages": stats.messages,
+                    "bytes": stats.bytes,
+                    "seconds": seconds,
+                    "messages_per_s": stats.messages / seconds,
+                    "mb_per_s": stats.bytes / 1e6 / seconds,
+                    "latency_us": stats.percentiles(),
+                    "failures": dict(stats.failures),
+                },
+                f,
+                indent=2,
+            )
+
+
+def profile_parsers(args: argparse.Namespace) -> None:
+    with profile() as profiler:
+        for path in args.paths:
+            for file in iter_capture_files(path):
+                replay_file(file)
+    print(profiler.table(sort=args.sort, limit=args.top))
+    if args.collapsed:
+        with open(args.collapsed, "w") as f:
+            f.write(profiler.collapsed())
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="pynbfx")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bench_parser = commands.add_parser(
+        "bench", help="replay captured messages through the decoder"
+    )
+    bench_parser.add_argument("paths", nargs="+", type=Path)
+    bench_parser.add_argument("--workers", type=int, default=1)
+    bench_parser.add_argument("--output", default=None, help="write the stats as JSON")
+    bench_parser.set_defaults(command=bench)
+
+    profile_parser = commands.add_parser(
+        "profile", help="profile the parsers decoding captured messages"
+    )
+    profile_parser.add_argument("paths", nargs="+", type=Path)
+    profile_parser.add_argument("--top", type=int, default=30)
+    profile_parser.add_argument(
+        "--sort", choices=["self_ns", "cumulative_ns", "calls"], default="self_ns"
+    )
+    profile_parser.add_argument(
+        "--collapsed", default=None, help="write collapsed stacks for flamegraphs"
+    )
+    profile_parser.set_defaults(command=profile_parsers)
+
+    args = parser.parse_args(argv)
+    args.command(args)
+
+
+if __name__ == "__main__":
+    main()
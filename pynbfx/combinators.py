@@ -3,7 +3,7 @@ from io import BytesIO
 from typing import Callable, Any
 
 
-from .parser import Parser
+from .parser import Parser, trace_record
 from .result import Result
 
 
@@ -191,6 +191,7 @@ def type_selector(type_parsers: dict[int, Parser]) -> Parser:
             return prefix
 
         type_value = prefix.unwrap()
+        trace_record(init_pos, type_value, "type_selector")
 
         sub_parser = type_parsers.get(type_value)
         if not sub_parser:
@@ -277,6 +278,28 @@ def byte_parser(x: int = 1) -> Parser:
     return Parser(byte_parser_fn)
 
 
+def bytes_parser(length: int) -> Parser:
+    """Creates a parser that reads exactly `length` bytes from the stream.
+
+    Unlike `byte_parser`, the value is always `bytes`, including for lengths
+    of zero and one.
+
+    Args:
+        length (int): The number of bytes to read.
+
+    Returns:
+        Parser: A parser that reads `length` bytes from the stream.
+    """
+
+    def bytes_parser_fn(stream: BytesIO) -> Result:
+        result = stream.read(length)
+        if len(result) != length:
+            return Result.err(stream, "End of stream")
+        return Result.ok(stream, result)
+
+    return Parser(bytes_parser_fn)
+
+
 def int31_parser() -> Parser:
     """Creates a parser for a 31-bit unsigned integer using variable-length encoding.
 
@@ -311,6 +334,41 @@ def int31_parser() -> Parser:
     return Parser(int31_fn)
 
 
+def read_int31(stream: BytesIO) -> int | None:
+    """Reads a variable-length 31-bit unsigned integer, as `int31_parser` does,
+    without the overhead of a parser.  For use in hot loops.
+
+    Returns:
+        int | None: the integer, or None if the stream ended or the value is too long.
+    """
+    value = 0
+    for i in range(5):
+        byte = stream.read(1)
+        if not byte:
+            return None
+        value |= (byte[0] & 0x7F) << 7 * i
+        if byte[0] & 0x80 == 0:
+            return value
+    return None
+
+
+def seek_forward(stream: BytesIO, length: int) -> bool:
+    """Advances the stream by `length` bytes without reading them.
+
+    Returns:
+        bool: False if the stream ends before `length` bytes, the position is
+        then left unchanged.
+    """
+    position = stream.tell()
+    # mmap.seek returns None, read the end with tell
+    stream.seek(0, 2)
+    if stream.tell() < position + length:
+        stream.seek(position)
+        return False
+    stream.seek(position + length)
+    return True
+
+
 def signed_int_x_parser(x: int) -> Parser:
     """Creates a parser for a signed integer of a specified byte length.
 
@@ -337,7 +395,7 @@ def signed_int_x_parser(x: int) -> Parser:
 
     def signed_int_x_fn(stream: BytesIO) -> Result:
         data_bytes = stream.read(x)
-        if not data_bytes:
+        if len(data_bytes) != x:
             return Result.err(stream, "End of stream")
 
         int_val = int.from_bytes(data_bytes, signed=True)
@@ -381,9 +439,10 @@ def string_parser() -> Parser:
 def dict_parser(dictionary: dict[int, str]) -> Parser:
     """Creates a parser that looks up values in a provided dictionary.
 
-    This parser reads a single byte from the stream and uses its value to
-    look up a corresponding string in the provided dictionary. If the
-    value is not found in the dictionary, an error is returned.
+    This parser reads a variable-length 31-bit key from the stream, as
+    `int31_parser` does, and uses its value to look up a corresponding string
+    in the provided dictionary. If the value is not found in the dictionary,
+    an error is returned.
 
     Args:
         dictionary (dict[int, str]): A dictionary mapping integer keys to
@@ -402,7 +461,7 @@ def dict_parser(dictionary: dict[int, str]) -> Parser:
     """
 
     def dict_parser_fn(stream: BytesIO) -> Result:
-        result = byte_parser()(stream)
+        result = int31_parser()(stream)
         if result.is_err():
             return result.aggregate(
                 Result.err(stream, f"{dict_parser(dictionary).desc()}")
@@ -0,0 +1,93 @@
+import zlib
+from io import BytesIO
+from typing import Iterable, Iterator
+from xml.etree.ElementTree import Element
+
+from .reader import PullParser
+
+"""
+WCF's compressed binary message encoding wraps the NBFX document in gzip or
+deflate.  The stage here inflates in bounded chunks and feeds the incremental
+decoder, so the inflated document is never held as a whole.
+"""
+
+GZIP = 16 + zlib.MAX_WBITS
+DEFLATE = -zlib.MAX_WBITS
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def read_chunks(
+    stream: BytesIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Reads a file object in chunks of at most `chunk_size` bytes."""
+    while chunk := stream.read(chunk_size):
+        yield chunk
+
+
+def inflate_chunks(
+    chunks: Iterable[bytes],
+    wbits: int = GZIP,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Inflates compressed chunks, yielding at most `chunk_size` bytes at a time.
+
+    Args:
+        chunks (Iterable[bytes]): compressed data
+        wbits (int): `GZIP` or `DEFLATE`, see `zlib.decompressobj`
+        chunk_size (int): maximum size of each inflated chunk
+
+    Raises:
+        zlib.error: If the data is not valid for the format.
+    """
+    decompressor = zlib.decompressobj(wbits)
+
+    for data in chunks:
+        while data:
+            if inflated := decompressor.decompress(data, chunk_size):
+                yield inflated
+            data = decompressor.unconsumed_tail
+
+    if tail := decompressor.flush():
+        yield tail
+
+
+def iterparse_compressed(
+    stream: BytesIO,
+    events: tuple[str, ...] = ("end",),
+    wbits: int = GZIP,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[tuple[str, Element]]:
+    """Decodes a compressed NBFX document, yielding events as they are decoded.
+
+    Like `xml.etree.ElementTree.iterparse`, elements which are no longer needed
+    can be cleared from the "end" events to keep the tree from growing.
+
+    Args:
+        stream (BytesIO): compressed data
+        events (tuple[str, ...]): events to report, "start" and/or "end"
+        wbits (int): `GZIP` or `DEFLATE`
+        chunk_size (int): size of the compressed reads and inflated chunks
+
+    Raises:
+        ValueError: If the inflated data is not a complete NBFX document.
+    """
+    parser = PullParser(events)
+    for inflated in inflate_chunks(read_chunks(stream, chunk_size), wbits, chunk_size):
+        parser.feed(inflated)
+        yield from parser.read_events()
+
+    parser.close()
+    yield from parser.read_events()
+
+
+def parse_compressed(
+    stream: BytesIO,
+    wbits: int = GZIP,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Element:
+    """Decodes a compressed NBFX document, returning the root element."""
+    parser = PullParser(events=())
+    for inflated in inflate_chunks(read_chunks(stream, chunk_size), wbits, chunk_size):
+        parser.feed(inflated)
+    return parser.close()
@@ -492,7 +492,10 @@ DICTIONARY = {
 # mapping even integers to set of characters (defined at application-level)
 
 START_INDEX = 0x01
-END_INDEX = 0xFFF
+# each string of a session takes at least the byte of its length, so the 2048
+# bytes of the default MaxSessionSize of WCF hold at most 2048 strings, with the
+# ids 0x01 to 0xFFF
+END_INDEX = 0x1000
 STEP_SIZE = 2
 
 # Populate the dictionary with placeholders for even integers
@@ -0,0 +1,494 @@
+import base64
+from typing import Any, Callable
+from xml.etree.ElementTree import Element
+
+from .dictonary import DICTIONARY
+from .records import (
+    ATTRIBUTE,
+    DICTIONARY_ATTRIBUTE,
+    DICTIONARY_ELEMENT,
+    DICTIONARY_XMLNS_ATTRIBUTE,
+    ELEMENT,
+    END_TAG,
+    PREFIX_ATTRIBUTES,
+    PREFIX_DICTIONARY_ATTRIBUTES,
+    PREFIX_DICTIONARY_ELEMENTS,
+    PREFIX_ELEMENTS,
+    SHORT_ATTRIBUTE,
+    SHORT_DICTIONARY_ATTRIBUTE,
+    SHORT_DICTIONARY_ELEMENT,
+    SHORT_DICTIONARY_XMLNS_ATTRIBUTE,
+    SHORT_ELEMENT,
+    SHORT_XMLNS_ATTRIBUTE,
+    XMLNS_ATTRIBUTE,
+)
+
+"""
+Encoding of element trees as NBFX records.
+
+`Encoder` is a target with the same `start`, `data` and `end` methods as the
+decoder's targets, so decoded events can be encoded again, and `Encoder.element`
+writes a whole element tree:
+
+    >>> data = encode(root)
+
+`encoded_size` computes the length of the document from the same choices of
+records without encoding it, so `encode_into` can write it into a preallocated
+buffer, such as the frame of an [MC-NMF] SizedEnvelope record:
+
+    >>> size = encoded_size(root)
+    >>> written = encode_into(root, frame, offset)
+
+Each record is written in the shortest form the decoders of this package read:
+
+- names and values found in `DICTIONARY` are written as dictionary strings
+- the prefixes `a` to `y` use the records with the prefix in their type
+- "0", "1", "false", "true" and small integers use their fixed size text records
+- the last text of an element uses the text record which also ends the element
+
+Text longer than 255 bytes is written as a UnicodeChars32Text record, as the
+decoders read the lengths of Chars16Text to Bytes32Text as a single byte and the
+length of UnicodeChars32Text as an int31.  Bytes longer than 255 bytes are
+written as their base64 text, which is what the Bytes text records decode to.
+Integers outside of an Int8Text are written as text, as the decoders read
+Int16Text to Int64Text big-endian.
+"""
+
+ZERO_TEXT = 0x80
+ONE_TEXT = 0x82
+FALSE_TEXT = 0x84
+TRUE_TEXT = 0x86
+INT8_TEXT = 0x88
+CHARS8_TEXT = 0x98
+BYTES8_TEXT = 0x9E
+DICTIONARY_TEXT = 0xAA
+UNICODE_CHARS32_TEXT = 0xBA
+
+# texts with a text record of their own
+FIXED_TEXTS = {"0": ZERO_TEXT, "1": ONE_TEXT, "false": FALSE_TEXT, "true": TRUE_TEXT}
+
+# longest payload of a Chars8Text or Bytes8Text record
+CHARS8_MAX = 0xFF
+
+# ids of the strings of the static dictionary, without the session placeholders
+DICTIONARY_IDS: dict[str, int] = {
+    value: key
+    for key, value in sorted(DICTIONARY.items(), reverse=True)
+    if not value.startswith("[[VALUE_")
+}
+
+
+def int31(value: int) -> bytes:
+    """Encodes a variable-length 31-bit unsigned integer, as read by `int31_parser`.
+
+    Raises:
+        ValueError: If the value does not fit in 31 bits.
+    """
+    if not 0 <= value < 1 << 31:
+        raise ValueError(f"Value out of range for an int31: {value}")
+    if value < 0x80:
+        return bytes((value,))
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def int31_size(value: int) -> int:
+    """Returns the number of bytes of an int31, see `int31`.
+
+    Raises:
+        ValueError: If the value does not fit in 31 bits.
+    """
+    if not 0 <= value < 1 << 31:
+        raise ValueError(f"Value out of range for an int31: {value}")
+    return (value.bit_length() + 6) // 7 or 1
+
+
+def string(value: str) -> bytes:
+    """Encodes an int31 length prefixed UTF-8 string, as read by `string_parser`."""
+    data = value.encode("utf-8")
+    return int31(len(data)) + data
+
+
+def utf8_size(value: str) -> int:
+    """Returns the number of bytes of a string encoded as UTF-8."""
+    return len(value) if value.isascii() else len(value.encode("utf-8"))
+
+
+def string_size(value: str) -> int:
+    """Returns the number of bytes of a length prefixed string, see `string`."""
+    size = utf8_size(value)
+    return int31_size(size) + size
+
+
+def utf16(value: str) -> bytes:
+    """Encodes the payload of a UnicodeChars text record.
+
+    The decoders read it as "utf-16", which drops a leading byte order mark, so
+    text starting with one is written after a byte order mark of its own.
+    """
+    data = value.encode("utf-16-le")
+    return b"\xff\xfe" + data if value.startswith("\ufeff") else data
+
+
+def unicode_chars32_record(value: str, end: bool = False) -> bytes:
+    """Encodes text as a UnicodeChars32Text record with an int31 length."""
+    data = utf16(value)
+    return bytes((UNICODE_CHARS32_TEXT | end,)) + int31(len(data)) + data
+
+
+def chars_record_size(value: str) -> int:
+    """Returns the number of bytes of the Chars8Text or UnicodeChars32Text record
+    written by `Encoder.text_record` for text."""
+    if (size := utf8_size(value)) <= CHARS8_MAX:
+        return 2 + size
+    size = len(utf16(value))
+    return 1 + int31_size(size) + size
+
+
+def split_prefix(name: str) -> tuple[str, str]:
+    """Splits a qualified name into its prefix, empty if none, and local name."""
+    prefix, _, local = name.rpartition(":")
+    return prefix, local
+
+
+def letter_index(prefix: str, letter_range: range) -> int | None:
+    """Returns the index of a single letter prefix in a range of record types with
+    the prefix in their type, None if the prefix has no such record type."""
+    if len(prefix) != 1:
+        return None
+    index = ord(prefix) - ord("a")
+    return index if 0 <= index < len(letter_range) else None
+
+
+def int8_value(text: str) -> int | None:
+    """Returns the integer of text written as an Int8Text record, None if the
+    text is not the canonical form of an integer in its range."""
+    if 0 < len(text) <= 4 and text.lstrip("-").isdecimal():
+        number = int(text)
+        if str(number) == text and -0x80 <= number < 0x80:
+            return number
+    return None
+
+
+def text_value(value: Any) -> str:
+    """Returns the text of a value, bytes as base64 as the decoders return them."""
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value if type(value) is str else str(value)
+
+
+class Encoder:
+    """Target writing NBFX records.
+
+    Text passed to `data` is held until the next `start` or `end`, so text split
+    over several calls is written as one text, and the last text of an element
+    is written with the text record which ends it.
+
+    Subclasses change which strings are written as dictionary strings by
+    overriding `dictionary_id` and `text_dictionary_id`.
+
+    Args:
+        write (Callable[[bytes], Any]): called with the bytes of each record, such
+            as the `write` method of a file or the `extend` method of a bytearray
+    """
+
+    def __init__(self, write: Callable[[bytes], Any]):
+        self._write = write
+        self._text: list[Any] = []
+
+    def dictionary_id(self, value: str) -> int | None:
+        """Returns the dictionary id of a string, None to write it inline."""
+        return DICTIONARY_IDS.get(value)
+
+    def text_dictionary_id(self, text: str) -> int | None:
+        """Returns the dictionary id of a text value, None to write it as
+        characters.  Names and namespaces use `dictionary_id`."""
+        return self.dictionary_id(text)
+
+    def start(self, tag: str, attrib: dict[str, Any]) -> None:
+        self.flush_text()
+        self._write(self.element_record(tag))
+        for name, value in attrib.items():
+            self._write(self.attribute_record(name, value))
+
+    def data(self, text: Any) -> None:
+        self._text.append(text)
+
+    def end(self, tag: str) -> None:
+        if not self.flush_text(end=True):
+            self._write(bytes((END_TAG,)))
+
+    def close(self) -> None:
+        self.flush_text()
+
+    def element(self, element: Element) -> None:
+        """Writes an element, its children and their tails.  The tail of the
+        element itself is not written.
+
+        Raises:
+            ValueError: If the tree holds comments or processing instructions.
+        """
+        if not isinstance(element.tag, str):
+            raise ValueError(f"Can not encode {element.tag.__name__} nodes")
+        self.start(element.tag, element.attrib)
+        if element.text is not None:
+            self.data(element.text)
+        for child in element:
+            self.element(child)
+            if child.tail is not None:
+                self.data(child.tail)
+        self.end(element.tag)
+
+    def flush_text(self, end: bool = False) -> bool:
+        """Writes the text held since the last record.
+
+        Args:
+            end (bool): write the text with the text record which ends the element
+
+        Returns:
+            bool: False if there was no text to write.
+        """
+        if not self._text:
+            return False
+        value = (
+            self._text[0]
+            if len(self._text) == 1
+            else "".join(text_value(text) for text in self._text)
+        )
+        self._text.clear()
+        if value == "":
+            return False
+        self._write(self.text_record(value, end))
+        return True
+
+    def element_record(self, tag: str) -> bytes:
+        """Encodes the element record of a tag."""
+        prefix, name = split_prefix(tag)
+        key = self.dictionary_id(name)
+
+        if not prefix:
+            if key is not None:
+                return bytes((SHORT_DICTIONARY_ELEMENT,)) + int31(key)
+            return bytes((SHORT_ELEMENT,)) + string(name)
+
+        if (index := letter_index(prefix, PREFIX_ELEMENTS)) is not None:
+            if key is not None:
+                return bytes((PREFIX_DICTIONARY_ELEMENTS[index],)) + int31(key)
+            return bytes((PREFIX_ELEMENTS[index],)) + string(name)
+
+        if key is not None:
+            return bytes((DICTIONARY_ELEMENT,)) + string(prefix) + int31(key)
+        return bytes((ELEMENT,)) + string(prefix) + string(name)
+
+    def attribute_record(self, name: str, value: Any) -> bytes:
+        """Encodes the attribute record of an attribute, namespace declarations as
+        xmlns attribute records."""
+        if name == "xmlns" or name.startswith("xmlns:"):
+            return self.xmlns_record(name[6:], text_value(value))
+        return self.attribute_name(name) + self.text_record(value)
+
+    def attribute_name(self, name: str) -> bytes:
+        """Encodes the record type and name of an attribute record, the text
+        record of its value follows."""
+        prefix, name = split_prefix(name)
+        key = self.dictionary_id(name)
+
+        if not prefix:
+            if key is not None:
+                return bytes((SHORT_DICTIONARY_ATTRIBUTE,)) + int31(key)
+            return bytes((SHORT_ATTRIBUTE,)) + string(name)
+
+        if (index := letter_index(prefix, PREFIX_ATTRIBUTES)) is not None:
+            if key is not None:
+                return bytes((PREFIX_DICTIONARY_ATTRIBUTES[index],)) + int31(key)
+            return bytes((PREFIX_ATTRIBUTES[index],)) + string(name)
+
+        if key is not None:
+            return bytes((DICTIONARY_ATTRIBUTE,)) + string(prefix) + int31(key)
+        return bytes((ATTRIBUTE,)) + string(prefix) + string(name)
+
+    def xmlns_record(self, prefix: str, uri: str) -> bytes:
+        """Encodes the declaration of a namespace, the default namespace if the
+        prefix is empty."""
+        key = self.dictionary_id(uri)
+        if not prefix:
+            if key is not None:
+                return bytes((SHORT_DICTIONARY_XMLNS_ATTRIBUTE,)) + int31(key)
+            return bytes((SHORT_XMLNS_ATTRIBUTE,)) + string(uri)
+        if key is not None:
+            return bytes((DICTIONARY_XMLNS_ATTRIBUTE,)) + string(prefix) + int31(key)
+        return bytes((XMLNS_ATTRIBUTE,)) + string(prefix) + string(uri)
+
+    def text_record(self, value: Any, end: bool = False) -> bytes:
+        """Encodes a value as a single text record.
+
+        Args:
+            value (Any): str, bytes, bool or int
+            end (bool): use the text record which also ends the element
+        """
+        if isinstance(value, bytes):
+            return self.bytes_record(value, end)
+        if (record := self.short_text_record(text_value(value), end)) is not None:
+            return record
+
+        text = text_value(value)
+        data = text.encode("utf-8")
+        if len(data) > CHARS8_MAX:
+            return unicode_chars32_record(text, end)
+        return bytes((CHARS8_TEXT | end, len(data))) + data
+
+    def short_text_record(self, text: str, end: bool = False) -> bytes | None:
+        """Encodes text with a fixed size text record or as a dictionary string,
+        None if it has to be written as characters."""
+        if (record_type := FIXED_TEXTS.get(text)) is not None:
+            return bytes((record_type | end,))
+
+        if (number := int8_value(text)) is not None:
+            return bytes((INT8_TEXT | end,)) + number.to_bytes(1, signed=True)
+
+        if (key := self.text_dictionary_id(text)) is not None:
+            return bytes((DICTIONARY_TEXT | end,)) + int31(key)
+        return None
+
+    def bytes_record(self, value: bytes, end: bool = False) -> bytes:
+        """Encodes bytes as a Bytes8Text record, or longer bytes as the
+        UnicodeChars32Text record of their base64 text."""
+        if len(value) > CHARS8_MAX:
+            return unicode_chars32_record(base64.b64encode(value).decode(), end)
+        return bytes((BYTES8_TEXT | end, len(value))) + value
+
+    def element_size(self, element: Element) -> int:
+        """Returns the number of bytes `element` writes for an element tree,
+        without encoding it.
+
+        Raises:
+            ValueError: If the tree holds comments or processing instructions.
+        """
+        if not isinstance(element.tag, str):
+            raise ValueError(f"Can not encode {element.tag.__name__} nodes")
+        size = self.element_record_size(element.tag)
+        for name, value in element.attrib.items():
+            size += self.attribute_record_size(name, value)
+        text = element.text
+        for child in element:
+            size += self.text_size(text) + self.element_size(child)
+            text = child.tail
+        # the last text ends the element, otherwise an EndElement record does
+        return size + (self.text_size(text) or 1)
+
+    def text_size(self, text: Any) -> int:
+        """Returns the number of bytes of the text between two records, 0 for no
+        text, as written by `flush_text`."""
+        if text is None or text == "":
+            return 0
+        return self.text_record_size(text)
+
+    def element_record_size(self, tag: str) -> int:
+        """Returns the number of bytes of the element record of a tag."""
+        prefix, name = split_prefix(tag)
+        return self.name_size(prefix, name, PREFIX_ELEMENTS)
+
+    def attribute_record_size(self, name: str, value: Any) -> int:
+        """Returns the number of bytes of the attribute record of an attribute."""
+        if name == "xmlns" or name.startswith("xmlns:"):
+            prefix, uri = name[6:], text_value(value)
+            key = self.dictionary_id(uri)
+            return (
+                1
+                + (string_size(prefix) if prefix else 0)
+                + (int31_size(key) if key is not None else string_size(uri))
+            )
+        prefix, name = split_prefix(name)
+        return self.name_size(prefix, name, PREFIX_ATTRIBUTES) + self.text_record_size(
+            value
+        )
+
+    def name_size(self, prefix: str, name: str, letter_range: range) -> int:
+        """Returns the number of bytes of the record type and qualified name of an
+        element or attribute record."""
+        key = self.dictionary_id(name)
+        size = 1 + (int31_size(key) if key is not None else string_size(name))
+        if prefix and letter_index(prefix, letter_range) is None:
+            size += string_size(prefix)
+        return size
+
+    def text_record_size(self, value: Any) -> int:
+        """Returns the number of bytes of `text_record` for a value."""
+        if isinstance(value, bytes):
+            if len(value) > CHARS8_MAX:
+                return chars_record_size(base64.b64encode(value).decode())
+            return 2 + len(value)
+        text = text_value(value)
+        if (size := self.short_text_size(text)) is not None:
+            return size
+        return chars_record_size(text)
+
+    def short_text_size(self, text: str) -> int | None:
+        """Returns the number of bytes of `short_text_record` for a text, None if
+        it has to be written as characters."""
+        if text in FIXED_TEXTS:
+            return 1
+        if int8_value(text) is not None:
+            return 2
+        if (key := self.text_dictionary_id(text)) is not None:
+            return 1 + int31_size(key)
+        return None
+
+
+def encode(element: Element) -> bytes:
+    """Encodes an element tree as an NBFX document.
+
+    Raises:
+        ValueError: If the tree holds nodes which can not be encoded.
+    """
+    out = bytearray()
+    Encoder(out.extend).element(element)
+    return bytes(out)
+
+
+def encoded_size(element: Element) -> int:
+    """Returns the length of `encode(element)`, without encoding the tree.
+
+    Raises:
+        ValueError: If the tree holds nodes which can not be encoded.
+    """
+    return Encoder(None).element_size(element)
+
+
+def encode_into(element: Element, buffer: Any, offset: int = 0) -> int:
+    """Encodes an element tree as an NBFX document into a writable buffer, such as
+    a preallocated bytearray, memoryview or mmap.
+
+    Args:
+        element (Element): root of the tree
+        buffer (Any): writable object supporting the buffer protocol
+        offset (int): position in the buffer of the first byte of the document
+
+    Returns:
+        int: the number of bytes written.
+
+    Raises:
+        ValueError: If the tree holds nodes which can not be encoded, or the
+            document does not fit in the buffer after `offset`.
+    """
+    size = encoded_size(element)
+    view = memoryview(buffer).cast("B")
+    if not 0 <= offset <= len(view) - size:
+        raise ValueError(
+            f"Buffer of {len(view)} bytes too small for {size} bytes at {offset}"
+        )
+    position = offset
+
+    def write(data: bytes) -> None:
+        nonlocal position
+        view[position : position + len(data)] = data
+        position += len(data)
+
+    Encoder(write).element(element)
+    return size
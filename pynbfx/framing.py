@@ -0,0 +1,289 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Iterator
+from xml.etree.ElementTree import Element
+
+from .combinators import (
+    byte_parser,
+    byte_peak,
+    int31_parser,
+    sequence,
+    string_parser,
+    success,
+    type_selector,
+)
+from .parser import Parser
+from .records import record_parser
+from .result import Result
+
+"""
+[MC-NMF]: .NET Message Framing Protocol
+
+The framing records wrap each NBFX document sent over net.tcp (ADWS).  A session
+is a preamble (version, mode, via, encoding, preamble end), followed by envelope
+records carrying the NBFX payloads, and terminated with an end record.
+"""
+
+VERSION_RECORD = 0x00
+MODE_RECORD = 0x01
+VIA_RECORD = 0x02
+KNOWN_ENCODING_RECORD = 0x03
+EXTENSIBLE_ENCODING_RECORD = 0x04
+UNSIZED_ENVELOPE_RECORD = 0x05
+SIZED_ENVELOPE_RECORD = 0x06
+END_RECORD = 0x07
+FAULT_RECORD = 0x08
+UPGRADE_REQUEST_RECORD = 0x09
+UPGRADE_RESPONSE_RECORD = 0x0A
+PREAMBLE_ACK_RECORD = 0x0B
+PREAMBLE_END_RECORD = 0x0C
+
+# KnownEncodingRecord values which carry NBFX payloads
+BINARY_ENCODING = 0x07
+BINARY_SESSION_ENCODING = 0x08
+
+
+@dataclass
+class Envelope:
+    """The payload of an envelope record.
+
+    `payload` is a view into the framing stream's buffer for sized envelopes, so
+    no bytes are copied until the payload is decoded, and `offset` is where the
+    payload starts in the stream.  Unsized envelopes are split into chunks on the
+    wire and are joined into a single buffer, their `offset` is None.
+    """
+
+    payload: memoryview
+    encoding: int | None
+    offset: int | None = None
+
+
+def buffer_view(stream: BytesIO) -> memoryview:
+    """Returns a view over the whole underlying buffer of the stream without copying."""
+    if isinstance(stream, BytesIO):
+        return stream.getbuffer()
+    return memoryview(stream)
+
+
+def version_record_parser() -> Parser:
+    """VersionRecord 0x00"""
+    return sequence(byte_parser(), byte_parser())
+
+
+def mode_record_parser() -> Parser:
+    """ModeRecord 0x01"""
+    return byte_parser()
+
+
+def via_record_parser() -> Parser:
+    """ViaRecord 0x02"""
+    return string_parser()
+
+
+def known_encoding_record_parser() -> Parser:
+    """KnownEncodingRecord 0x03"""
+    return byte_parser()
+
+
+def extensible_encoding_record_parser() -> Parser:
+    """ExtensibleEncodingRecord 0x04"""
+    return string_parser()
+
+
+def sized_payload_parser() -> Parser:
+    """Parses an int31 size followed by that many bytes, returning a view of them."""
+
+    def sized_payload_fn(stream: BytesIO) -> Result:
+        if not (result := int31_parser()(stream)):
+            return result
+        size = result.unwrap()
+        start = stream.tell()
+
+        payload = buffer_view(stream)[start : start + size]
+        if len(payload) != size:
+            return Result.err(
+                stream, f"Truncated payload, expected {size} got {len(payload)}"
+            )
+        stream.seek(start + size)
+        return Result.ok(stream, payload)
+
+    return Parser(sized_payload_fn)
+
+
+def unsized_envelope_record_parser() -> Parser:
+    """UnsizedEnvelopeRecord 0x05
+
+    The payload is a series of sized data chunks terminated by a 0x00 byte.
+    """
+
+    def unsized_envelope_fn(stream: BytesIO) -> Result:
+        chunks = []
+        while True:
+            if not (result := byte_peak()(stream)):
+                return result
+            if result.unwrap() == 0x00:
+                byte_parser()(stream)
+                break
+            if not (result := sized_payload_parser()(stream)):
+                return result
+            chunks.append(result.unwrap())
+        return Result.ok(stream, memoryview(b"".join(chunks)))
+
+    return Parser(unsized_envelope_fn)
+
+
+def sized_envelope_record_parser() -> Parser:
+    """SizedEnvelopeRecord 0x06"""
+    return sized_payload_parser()
+
+
+def end_record_parser() -> Parser:
+    """EndRecord 0x07"""
+    return success(None)
+
+
+def fault_record_parser() -> Parser:
+    """FaultRecord 0x08"""
+    return string_parser()
+
+
+def upgrade_request_record_parser() -> Parser:
+    """UpgradeRequestRecord 0x09"""
+    return string_parser()
+
+
+def upgrade_response_record_parser() -> Parser:
+    """UpgradeResponseRecord 0x0A"""
+    return success(None)
+
+
+def preamble_ack_record_parser() -> Parser:
+    """PreambleAckRecord 0x0B"""
+    return success(None)
+
+
+def preamble_end_record_parser() -> Parser:
+    """PreambleEndRecord 0x0C"""
+    return success(None)
+
+
+def nmf_record_parser() -> Parser:
+    """Parses a single framing record.
+
+    Returns:
+        Parser: parser which returns a tuple of the record type and the record value.
+    """
+    record_selector = type_selector(
+        {
+            VERSION_RECORD: version_record_parser(),
+            MODE_RECORD: mode_record_parser(),
+            VIA_RECORD: via_record_parser(),
+            KNOWN_ENCODING_RECORD: known_encoding_record_parser(),
+            EXTENSIBLE_ENCODING_RECORD: extensible_encoding_record_parser(),
+            UNSIZED_ENVELOPE_RECORD: unsized_envelope_record_parser(),
+            SIZED_ENVELOPE_RECORD: sized_envelope_record_parser(),
+            END_RECORD: end_record_parser(),
+            FAULT_RECORD: fault_record_parser(),
+            UPGRADE_REQUEST_RECORD: upgrade_request_record_parser(),
+            UPGRADE_RESPONSE_RECORD: upgrade_response_record_parser(),
+            PREAMBLE_ACK_RECORD: preamble_ack_record_parser(),
+            PREAMBLE_END_RECORD: preamble_end_record_parser(),
+        }
+    )
+
+    def nmf_record_fn(stream: BytesIO) -> Result:
+        if not (result := byte_peak()(stream)):
+            return result
+        record_type = result.unwrap()
+        return record_selector(stream).map(lambda value: (record_type, value))
+
+    return Parser(nmf_record_fn)
+
+
+def string_table_parser() -> Parser:
+    """Parses the [MC-NBFSE] StringTable which prefixes each envelope payload when
+    the session uses the binary encoding with an in-band dictionary.
+
+    Returns:
+        Parser: parser which returns the list of strings added to the session.
+    """
+
+    def string_table_fn(stream: BytesIO) -> Result:
+        if not (result := int31_parser()(stream)):
+            return result
+        end = stream.tell() + result.unwrap()
+
+        strings = []
+        while stream.tell() < end:
+            if not (result := string_parser()(stream)):
+                return result
+            strings.append(result.unwrap())
+
+        if stream.tell() != end:
+            return Result.err(stream, "StringTable overran its size")
+        return Result.ok(stream, strings)
+
+    return Parser(string_table_fn)
+
+
+def iter_envelopes(stream: BytesIO) -> Iterator[Envelope]:
+    """Walks the framing records of a session, yielding each envelope payload.
+
+    Args:
+        stream (BytesIO): bytes received from the connection
+
+    Raises:
+        ValueError: If a record is malformed or the peer sent a fault.
+    """
+    parser = nmf_record_parser()
+    encoding = None
+
+    while byte_peak()(stream):
+        record_type, value = parser(stream).expect("Invalid MC-NMF record")
+
+        if record_type == KNOWN_ENCODING_RECORD:
+            encoding = value
+        elif record_type == FAULT_RECORD:
+            raise ValueError(f"MC-NMF fault: {value}")
+        elif record_type == SIZED_ENVELOPE_RECORD:
+            yield Envelope(value, encoding, stream.tell() - len(value))
+        elif record_type == UNSIZED_ENVELOPE_RECORD:
+            yield Envelope(value, encoding)
+        elif record_type == END_RECORD:
+            return
+
+
+def iter_envelope_elements(stream: BytesIO) -> Iterator[Element]:
+    """Decodes the NBFX document of each envelope in a session.
+
+    Sized envelopes are decoded in place from the framing stream, so the only
+    buffer is the one the stream already holds.
+
+    The [MC-NBFSE] StringTable of each envelope is skipped; dictionary references
+    to session strings decode as the `[[VALUE_0x..]]` placeholders of `DICTIONARY`.
+
+    Args:
+        stream (BytesIO): bytes received from the connection
+
+    Raises:
+        ValueError: If a record is malformed, the peer sent a fault, or a payload
+            does not hold a valid NBFX document.
+    """
+    for envelope in iter_envelopes(stream):
+        resume = stream.tell()
+        if envelope.offset is not None:
+            payload_stream = stream
+            payload_stream.seek(envelope.offset)
+        else:
+            payload_stream = BytesIO(envelope.payload)
+        end = payload_stream.tell() + len(envelope.payload)
+
+        if envelope.encoding == BINARY_SESSION_ENCODING:
+            string_table_parser()(payload_stream).expect("Invalid StringTable")
+
+        element = record_parser()(payload_stream).expect("Invalid NBFX payload")
+        if payload_stream.tell() > end:
+            raise ValueError("NBFX document overran its envelope")
+
+        stream.seek(resume)
+        yield element
@@ -0,0 +1,204 @@
+import struct
+from array import array
+from bisect import bisect_left
+from io import BytesIO
+from typing import Iterator
+from xml.etree.ElementTree import Element
+
+from .parser import Parser
+from .reader import build_tree, iter_events
+from .records import (
+    ELEMENT_TYPES,
+    END_TAG,
+    TEXT_TYPES,
+    read_tag,
+    skip_attributes,
+    skip_text,
+)
+from .result import Result
+
+"""
+Structural index of the elements of an NBFX document.
+
+The index is built by a pre-scan which only decodes tags, text and attributes
+are skipped over by their lengths.  Each element is stored in document order as
+a row of four arrays: the offset of its element record, the offset just past its
+last record, its depth and the id of its tag.
+
+    >>> index = index_parser()(stream).unwrap()
+    >>> items = index.find("wsen:Items")
+    >>> user = index.decode(stream, index.child(items, 10))
+"""
+
+INDEX_MAGIC = b"NBXI"
+INDEX_HEADER = struct.Struct("<4sII")
+
+
+class StructuralIndex:
+    """Offsets of the elements of a document, in document order."""
+
+    def __init__(self):
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self.depths = array("H")
+        self.name_ids = array("I")
+        self.names: list[str] = []
+        self._name_lookup: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, start: int, depth: int, tag: str) -> int:
+        """Adds an element whose end is not known yet, returning its index."""
+        if (name_id := self._name_lookup.get(tag)) is None:
+            name_id = self._name_lookup[tag] = len(self.names)
+            self.names.append(tag)
+
+        self.starts.append(start)
+        self.ends.append(0)
+        self.depths.append(depth)
+        self.name_ids.append(name_id)
+        return len(self.starts) - 1
+
+    def tag(self, i: int) -> str:
+        """Returns the tag of the element at index `i`."""
+        return self.names[self.name_ids[i]]
+
+    def subtree_end(self, i: int) -> int:
+        """Returns the index just past the last descendant of element `i`."""
+        return bisect_left(self.starts, self.ends[i], i + 1)
+
+    def children(self, i: int) -> Iterator[int]:
+        """Yields the indexes of the children of element `i`, jumping over their
+        descendants."""
+        end = self.subtree_end(i)
+        child = i + 1
+        while child < end:
+            yield child
+            child = bisect_left(self.starts, self.ends[child], child + 1, end)
+
+    def child(self, i: int, n: int) -> int:
+        """Returns the index of the `n`th child of element `i`.
+
+        Raises:
+            IndexError: If the element has no `n`th child.
+        """
+        for count, child in enumerate(self.children(i)):
+            if count == n:
+                return child
+        raise IndexError(f"Element {i} has no child {n}")
+
+    def find(self, tag: str, start: int = 0) -> int:
+        """Returns the index of the first element with the tag from `start` on.
+
+        Raises:
+            KeyError: If no element has the tag.
+        """
+        if (name_id := self._name_lookup.get(tag)) is not None:
+            for i in range(start, len(self.name_ids)):
+                if self.name_ids[i] == name_id:
+                    return i
+        raise KeyError(tag)
+
+    def decode(self, stream: BytesIO, i: int) -> Element:
+        """Decodes the element at index `i` from the indexed stream.
+
+        Raises:
+            ValueError: If the element is malformed.
+        """
+        stream.seek(self.starts[i])
+        return build_tree(iter_events(stream))
+
+    def to_bytes(self) -> bytes:
+        """Serializes the index so it can be cached alongside the document.
+
+        The arrays are stored in the native byte order of the machine.
+        """
+        names = "\0".join(self.names).encode("utf-8")
+        return b"".join(
+            [
+                INDEX_HEADER.pack(INDEX_MAGIC, len(self), len(names)),
+                self.starts.tobytes(),
+                self.ends.tobytes(),
+                self.depths.tobytes(),
+                self.name_ids.tobytes(),
+                names,
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StructuralIndex":
+        """Loads an index serialized with `to_bytes`.
+
+        Raises:
+            ValueError: If the data is not a serialized index.
+        """
+        if len(data) < INDEX_HEADER.size:
+            raise ValueError("Truncated index")
+        magic, count, names_size = INDEX_HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC:
+            raise ValueError("Not a structural index")
+
+        index = cls()
+        offset = INDEX_HEADER.size
+        for column in [index.starts, index.ends, index.depths, index.name_ids]:
+            size = count * column.itemsize
+            column.frombytes(data[offset : offset + size])
+            offset += size
+        if len(index) != count or len(data) != offset + names_size:
+            raise ValueError("Truncated index")
+
+        if names_size:
+            index.names = data[offset:].decode("utf-8").split("\0")
+        index._name_lookup = {name: i for i, name in enumerate(index.names)}
+        return index
+
+
+def index_parser() -> Parser:
+    """Pre-scans the element at the current position into a `StructuralIndex`.
+
+    Offsets in the index are positions in the stream.  As with `element_parser`,
+    elements still open at the end of the stream end there.
+
+    Returns:
+        Parser: parser which returns the `StructuralIndex` of the element.
+    """
+
+    def index_fn(stream: BytesIO) -> Result:
+        index = StructuralIndex()
+        open_elements: list[int] = []
+
+        while record := stream.read(1):
+            record_type = record[0]
+
+            if record_type in ELEMENT_TYPES:
+                start = stream.tell() - 1
+                if (tag := read_tag(stream, record_type)) is None:
+                    return Result.err(stream, "Truncated element record")
+                if not skip_attributes(stream):
+                    return Result.err(stream, "Truncated attribute record")
+                open_elements.append(index.add(start, len(open_elements), tag))
+                continue
+
+            if record_type in TEXT_TYPES:
+                if not skip_text(stream, record_type):
+                    return Result.err(stream, "Truncated text record")
+                if record_type % 2 == 0:
+                    continue
+            elif record_type != END_TAG:
+                stream.seek(-1, 1)
+                return Result.err(
+                    stream, f"Unexpected record type: 0x{record_type:02X}"
+                )
+
+            if not open_elements:
+                return Result.err(stream, "End record outside of an element")
+            index.ends[open_elements.pop()] = stream.tell()
+            if not open_elements:
+                break
+
+        for i in open_elements:
+            index.ends[i] = stream.tell()
+        return Result.ok(stream, index)
+
+    return Parser(index_fn)
@@ -0,0 +1,243 @@
+from io import BytesIO
+from typing import Iterator
+
+from .combinators import byte_peak
+from .parser import Parser
+from .reader import as_text
+from .records import (
+    ELEMENT_TYPES,
+    END_TAG,
+    TEXT_TYPES,
+    element_start_parser,
+    read_tag,
+    skip_attributes,
+    skip_element_parser,
+    text_parser,
+)
+
+"""
+Lazily decoded elements.
+
+`parse_lazy` returns a `LazyElement` for the element at the current position of a
+stream, without reading any further.  Each node decodes its tag, attributes,
+text and children from the stream the first time they are accessed, children
+are found by skipping over their siblings by length.  Nodes present the read
+API of `xml.etree.ElementTree.Element`.
+
+    >>> root = parse_lazy(stream)
+    >>> action = root.find("s:Header/a:Action")
+    >>> action.text
+"""
+
+
+class LazyElement:
+    """Read only element decoded from its stream on first access.
+
+    The stream must not be modified while the element is in use.  Decoding errors
+    are raised as ValueError from the property or method which hit them.
+    """
+
+    __slots__ = (
+        "_stream",
+        "_start",
+        "_tag",
+        "_attrib",
+        "_content",
+        "_text",
+        "_children",
+        "_position",
+        "_text_parser",
+        "_parent",
+        "_tail",
+    )
+
+    def __init__(
+        self,
+        stream: BytesIO,
+        start: int,
+        text: Parser | None = None,
+        parent: "LazyElement | None" = None,
+    ):
+        self._stream = stream
+        self._text_parser = text or text_parser()
+        self._start = start
+        self._tag: str | None = None
+        self._attrib: dict[str, str] | None = None
+        # position of the first record after the attributes
+        self._content: int | None = None
+        self._text: str | None = None
+        self._children: list["LazyElement"] = []
+        # position of the next child record to scan, None once the end is reached
+        self._position: int | None = -1
+        self._parent = parent
+        self._tail: str | None = None
+
+    @property
+    def tag(self) -> str:
+        if self._tag is None:
+            self._stream.seek(self._start)
+            record_type = self._stream.read(1)[0]
+            if (tag := read_tag(self._stream, record_type)) is None:
+                raise ValueError(f"Truncated element record at {self._start}")
+            self._tag = tag
+        return self._tag
+
+    @property
+    def attrib(self) -> dict[str, str]:
+        if self._attrib is None:
+            self._stream.seek(self._start)
+            record_type = self._stream.read(1)[0]
+            _, attrib = element_start_parser(record_type)(self._stream).expect(
+                "Invalid element record"
+            )
+            self._attrib = {k: as_text(v) for k, v in attrib.items()}
+            self._content = self._stream.tell()
+        return self._attrib
+
+    @property
+    def text(self) -> str | None:
+        while not self._children and self._scan():
+            pass
+        return self._text
+
+    @property
+    def tail(self) -> str | None:
+        # the text after this element is scanned with the content of its parent
+        if (parent := self._parent) is not None:
+            while parent._children[-1] is self and parent._scan():
+                pass
+        return self._tail
+
+    def get(self, key: str, default=None):
+        return self.attrib.get(key, default)
+
+    def keys(self):
+        return self.attrib.keys()
+
+    def items(self):
+        return self.attrib.items()
+
+    def __iter__(self) -> Iterator["LazyElement"]:
+        i = 0
+        while i < len(self._children) or self._scan():
+            if i < len(self._children):
+                yield self._children[i]
+                i += 1
+
+    def __len__(self) -> int:
+        while self._scan():
+            pass
+        return len(self._children)
+
+    def __getitem__(self, index: int) -> "LazyElement":
+        if index < 0:
+            return list(self)[index]
+        while index >= len(self._children) and self._scan():
+            pass
+        return self._children[index]
+
+    def __repr__(self) -> str:
+        return f"<LazyElement {self.tag!r} at {self._start}>"
+
+    def iter(self, tag: str | None = None) -> Iterator["LazyElement"]:
+        """Yields this element and its descendants in document order."""
+        if tag in (None, "*") or self.tag == tag:
+            yield self
+        for child in self:
+            yield from child.iter(tag)
+
+    def iterfind(self, path: str) -> Iterator["LazyElement"]:
+        """Yields the elements matching a path of tags separated by "/".
+
+        Supports tags, "*", "." and a leading ".//" to search all descendants.
+        """
+        if path.startswith(".//"):
+            elements = self.iter()
+            path = path[3:]
+        else:
+            elements = iter([self])
+
+        for segment in path.split("/"):
+            if segment != ".":
+                elements = matching_children(elements, segment)
+        return elements
+
+    def find(self, path: str) -> "LazyElement | None":
+        return next(self.iterfind(path), None)
+
+    def findall(self, path: str) -> list["LazyElement"]:
+        return list(self.iterfind(path))
+
+    def findtext(self, path: str, default: str | None = None) -> str | None:
+        if (element := self.find(path)) is None:
+            return default
+        return element.text or ""
+
+    def _scan(self) -> bool:
+        """Decodes the next record of the content, returning False at the end."""
+        if self._position is None:
+            return False
+
+        if self._position == -1:
+            if self._content is None:
+                self._stream.seek(self._start)
+                record_type = self._stream.read(1)[0]
+                if read_tag(self._stream, record_type) is None or not skip_attributes(
+                    self._stream
+                ):
+                    raise ValueError(f"Truncated element record at {self._start}")
+                self._content = self._stream.tell()
+            self._position = self._content
+
+        stream = self._stream
+        stream.seek(self._position)
+        if not (result := byte_peak()(stream)) or result.unwrap() == END_TAG:
+            # as with element_parser, the end of the stream closes all elements
+            self._position = None
+            return False
+        record_type = result.unwrap()
+
+        if record_type in ELEMENT_TYPES:
+            self._children.append(
+                LazyElement(stream, self._position, self._text_parser, self)
+            )
+            skip_element_parser()(stream).expect("Invalid element")
+            self._position = stream.tell()
+            return True
+
+        if record_type not in TEXT_TYPES:
+            raise ValueError(f"Unexpected record type: 0x{record_type:02X}")
+
+        value = self._text_parser(stream).expect("Invalid text record")
+        # split text records are joined, as a TreeBuilder would
+        if self._children:
+            self._children[-1]._tail = (self._children[-1]._tail or "") + as_text(value)
+        else:
+            self._text = (self._text or "") + as_text(value)
+
+        # text records with an odd type end the current element
+        self._position = None if record_type % 2 == 1 else stream.tell()
+        return True
+
+
+def matching_children(
+    elements: Iterator[LazyElement], tag: str
+) -> Iterator[LazyElement]:
+    """Yields the children of the elements with the tag, or all of them for "*"."""
+    for element in elements:
+        for child in element:
+            if tag == "*" or child.tag == tag:
+                yield child
+
+
+def parse_lazy(stream: BytesIO) -> LazyElement:
+    """Returns a lazily decoded element for the element record at the current
+    position of the stream.
+
+    Raises:
+        ValueError: If there is no element record at the current position.
+    """
+    start = stream.tell()
+    if not (result := byte_peak()(stream)) or result.unwrap() not in ELEMENT_TYPES:
+        raise ValueError(f"No element record at {start}")
+    return LazyElement(stream, start)
@@ -0,0 +1,405 @@
+import argparse
+import mmap
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable
+
+from .analyze import iter_capture_files
+from .combinators import read_int31
+from .dictonary import DICTIONARY
+from .encoder import DICTIONARY_IDS, Encoder, int31, int31_size
+from .framing import (
+    BINARY_SESSION_ENCODING,
+    SIZED_ENVELOPE_RECORD,
+    VERSION_RECORD,
+    iter_envelopes,
+    string_table_parser,
+)
+from .records import (
+    ATTRIBUTE_TYPES,
+    DICTIONARY_NAME_TYPES,
+    DICTIONARY_XMLNS_ATTRIBUTE,
+    ELEMENT_TYPES,
+    END_TAG,
+    INLINE_PREFIX_TYPES,
+    PREFIX_ATTRIBUTES,
+    PREFIX_DICTIONARY_ATTRIBUTES,
+    PREFIX_DICTIONARY_ELEMENTS,
+    PREFIX_ELEMENTS,
+    SHORT_DICTIONARY_XMLNS_ATTRIBUTE,
+    SHORT_XMLNS_ATTRIBUTE,
+    TEXT_TYPES,
+    XMLNS_ATTRIBUTE,
+    read_string,
+    skip_text,
+    text_payload_size,
+)
+from .utils import letter_in_range
+
+"""
+Rewriting of NBFX documents with the shortest form of each record.
+
+`minimize` reads records one at a time and writes each in the shortest form
+which decodes to the same XML:
+
+- names and namespaces found in `DICTIONARY` are written as dictionary strings,
+  and the prefixes `a` to `y` with the records which have them in their type
+- Chars and UnicodeChars8 text is written as Chars8Text, or as the fixed size
+  and dictionary text records of `Encoder`, empty element text is dropped
+- Int8Text and BoolText values with a record of their own use it
+- text followed by an EndElement record uses its `*WithEndElement` variant
+
+A record is only replaced when its replacement is shorter, other records, such
+as Bytes, DateTime or UniqueId text, are copied as they are.  Documents can
+follow each other in the stream:
+
+    >>> with open("capture.min", "wb") as out:
+    ...     report = minimize(stream, out.write)
+    >>> report.saved
+
+References to [MC-NBFSE] session strings are kept, the minimized documents
+need the StringTable of their session as much as the originals.
+
+`minimize_session` rewrites the documents of the sized envelopes of an [MC-NMF]
+session instead, keeping the framing records and the StringTable of each
+envelope.
+"""
+
+CHARS_TEXT_TYPES = {0x98, 0x9A, 0x9C}
+UNICODE_CHARS8_TEXT = 0xB6
+EMPTY_TEXT = 0xA8
+INT8_TEXT = 0x88
+BOOL_TEXT = 0xB4
+
+# prefix letter ranges of the record types with the prefix in their type
+LETTER_RANGES = (
+    PREFIX_DICTIONARY_ELEMENTS,
+    PREFIX_ELEMENTS,
+    PREFIX_DICTIONARY_ATTRIBUTES,
+    PREFIX_ATTRIBUTES,
+)
+
+
+@dataclass
+class MinimizeReport:
+    """Sizes of the minimized records."""
+
+    records: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+
+def end_record(record: bytes) -> bytes:
+    """Returns a text record as its variant which also ends the element."""
+    return bytes((record[0] | 1,)) + record[1:]
+
+
+class MinimizingEncoder(Encoder):
+    """`Encoder` which also writes the names and namespaces the source read from
+    session strings by their id, so references to them are kept."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.session_ids: dict[str, int] = {}
+
+    def dictionary_id(self, value: str) -> int | None:
+        if (key := DICTIONARY_IDS.get(value)) is not None:
+            return key
+        return self.session_ids.get(value)
+
+    def text_dictionary_id(self, text: str) -> int | None:
+        # DictionaryText records are copied, so text never refers to the session
+        return DICTIONARY_IDS.get(text)
+
+
+class Minimizer:
+    """Rewrites records read from a stream in their shortest form.
+
+    Args:
+        write (Callable[[bytes], Any]): called with the bytes of the rewritten
+            records
+    """
+
+    def __init__(self, write: Callable[[bytes], Any]):
+        self._write = write
+        self.encoder = MinimizingEncoder()
+        self.report = MinimizeReport()
+        # text records held until it is known whether an end record follows
+        self._text: list[bytes] = []
+
+    def minimize(self, stream: BytesIO) -> MinimizeReport:
+        """Rewrites every record up to the end of the stream.
+
+        Raises:
+            ValueError: If a record is malformed.
+        """
+        while record := stream.read(1):
+            start = stream.tell() - 1
+            written = self.record(stream, record[0])
+            self.report.records += 1
+            self.report.bytes_in += stream.tell() - start
+            self.report.bytes_out += written
+        self.report.bytes_out += self.flush()
+        return self.report
+
+    def record(self, stream: BytesIO, record_type: int) -> int:
+        """Rewrites the record of the given type, just read from the stream.
+
+        Returns:
+            int: the number of bytes written, including held text written before
+            the record.
+        """
+        if record_type == END_TAG:
+            return self.flush(end=True) or self.write(bytes((END_TAG,)))
+
+        if record_type in ELEMENT_TYPES:
+            written = self.flush()
+            return written + self.write(self.element(stream, record_type))
+
+        if record_type in TEXT_TYPES:
+            written = self.flush()
+            self._text = self.text(stream, record_type)
+            if record_type % 2 == 1:
+                return written + self.record(stream, END_TAG)
+            return written
+
+        raise ValueError(f"Unexpected record type: 0x{record_type:02X}")
+
+    def write(self, data: bytes) -> int:
+        self._write(data)
+        return len(data)
+
+    def flush(self, end: bool = False) -> int:
+        """Writes the held text records, the last one ending the element if
+        `end` is set.
+
+        Returns:
+            int: the number of bytes written, 0 if no text was held.
+        """
+        if not self._text:
+            return 0
+        records, self._text = self._text, []
+        if end:
+            records[-1] = end_record(records[-1])
+        return sum(self.write(record) for record in records)
+
+    def element(self, stream: BytesIO, record_type: int) -> bytes:
+        """Rewrites an element record and its attribute records."""
+        out = bytearray(self.encoder.element_record(self.name(stream, record_type)))
+
+        while (peek := stream.read(1)) and peek[0] in ATTRIBUTE_TYPES:
+            attribute_type = peek[0]
+            if attribute_type in (SHORT_XMLNS_ATTRIBUTE, XMLNS_ATTRIBUTE):
+                prefix = (
+                    self.string(stream) if attribute_type == XMLNS_ATTRIBUTE else ""
+                )
+                out += self.encoder.xmlns_record(prefix, self.string(stream))
+            elif attribute_type in (
+                SHORT_DICTIONARY_XMLNS_ATTRIBUTE,
+                DICTIONARY_XMLNS_ATTRIBUTE,
+            ):
+                prefix = (
+                    self.string(stream)
+                    if attribute_type == DICTIONARY_XMLNS_ATTRIBUTE
+                    else ""
+                )
+                out += self.encoder.xmlns_record(prefix, self.dictionary_string(stream))
+            else:
+                out += self.encoder.attribute_name(self.name(stream, attribute_type))
+                text = stream.read(1)
+                if not text or text[0] not in TEXT_TYPES:
+                    raise ValueError("Attribute record without a text record")
+                records = self.text(stream, text[0] & ~1, attribute=True)
+                out += b"".join(records)
+
+        if peek:
+            stream.seek(-1, 1)
+        return bytes(out)
+
+    def name(self, stream: BytesIO, record_type: int) -> str:
+        """Reads the qualified name of an element or attribute record."""
+        prefix = ""
+        for letter_range in LETTER_RANGES:
+            if record_type in letter_range:
+                prefix = letter_in_range(record_type, letter_range) + ":"
+                break
+        else:
+            if record_type in INLINE_PREFIX_TYPES:
+                prefix = self.string(stream) + ":"
+
+        if record_type in DICTIONARY_NAME_TYPES:
+            return prefix + self.dictionary_string(stream)
+        return prefix + self.string(stream)
+
+    def string(self, stream: BytesIO) -> str:
+        if (value := read_string(stream)) is None:
+            raise ValueError("Truncated string")
+        return value
+
+    def dictionary_string(self, stream: BytesIO) -> str:
+        """Reads a dictionary string, remembering the ids of session strings."""
+        key = read_int31(stream)
+        if key is None or (value := DICTIONARY.get(key)) is None:
+            raise ValueError(f"Invalid dictionary string: {key}")
+        if key % 2 == 1:
+            self.encoder.session_ids[value] = key
+        return value
+
+    def text(
+        self, stream: BytesIO, record_type: int, attribute: bool = False
+    ) -> list[bytes]:
+        """Rewrites a text record without ending the element, as no record for
+        empty element text.
+
+        Returns:
+            list[bytes]: the text records.
+        """
+        start = stream.tell() - 1
+        text = self.text_value(stream, record_type & ~1)
+        if text is None:
+            stream.seek(start + 1)
+            if not skip_text(stream, record_type):
+                raise ValueError(f"Truncated record: 0x{record_type:02X}")
+        end = stream.tell()
+        stream.seek(start)
+        original = [bytes((record_type & ~1,)) + stream.read(end - start)[1:]]
+
+        if text is None:
+            return original
+        if text == "" and not attribute:
+            return []
+        record = self.encoder.text_record(text)
+        if len(record) < end - start:
+            return [record]
+        return original
+
+    def text_value(self, stream: BytesIO, record_type: int) -> str | None:
+        """Reads the text of a text record which can be rewritten, None for other
+        records, which are copied."""
+        if record_type == INT8_TEXT:
+            value = stream.read(1)
+            return str(int.from_bytes(value, signed=True)) if value else None
+        if record_type == BOOL_TEXT:
+            value = stream.read(1)
+            return ("true" if value[0] else "false") if value else None
+        if record_type == EMPTY_TEXT:
+            return ""
+        if record_type in CHARS_TEXT_TYPES or record_type == UNICODE_CHARS8_TEXT:
+            size = text_payload_size(stream, record_type)
+            if size is None or len(data := stream.read(size)) != size:
+                return None
+            encoding = "utf-8" if record_type in CHARS_TEXT_TYPES else "utf-16-le"
+            try:
+                return data.decode(encoding)
+            except UnicodeDecodeError:
+                return None
+        return None
+
+
+def minimize(stream: BytesIO, write: Callable[[bytes], Any]) -> MinimizeReport:
+    """Rewrites the records of a stream in their shortest form, see `Minimizer`.
+
+    Raises:
+        ValueError: If a record is malformed.
+    """
+    return Minimizer(write).minimize(stream)
+
+
+def minimize_bytes(data: bytes) -> bytes:
+    """Rewrites NBFX documents in their shortest form.
+
+    Raises:
+        ValueError: If a record is malformed.
+    """
+    out = bytearray()
+    minimize(BytesIO(data), out.extend)
+    return bytes(out)
+
+
+def minimize_session(stream: BytesIO, write: Callable[[bytes], Any]) -> MinimizeReport:
+    """Rewrites the NBFX documents of the sized envelopes of an [MC-NMF] session
+    in their shortest form, updating the size of the envelopes.
+
+    The StringTable of each envelope, the other framing records and unsized
+    envelopes are copied as they are.
+
+    Returns:
+        MinimizeReport: sizes of the records of the rewritten documents.
+
+    Raises:
+        ValueError: If a framing or NBFX record is malformed.
+    """
+    total = MinimizeReport()
+    position = 0
+    for envelope in iter_envelopes(stream):
+        if envelope.offset is None:
+            continue
+        resume = stream.tell()
+        payload = BytesIO(envelope.payload)
+        if envelope.encoding == BINARY_SESSION_ENCODING:
+            string_table_parser()(payload).expect("Invalid StringTable")
+        out = bytearray(envelope.payload[: payload.tell()])
+        report = minimize(payload, out.extend)
+
+        start = envelope.offset - int31_size(len(envelope.payload)) - 1
+        stream.seek(position)
+        write(stream.read(start - position))
+        write(bytes((SIZED_ENVELOPE_RECORD,)) + int31(len(out)) + out)
+        position = resume
+        stream.seek(resume)
+
+        total.records += report.records
+        total.bytes_in += report.bytes_in
+        total.bytes_out += report.bytes_out
+
+    stream.seek(position)
+    write(stream.read())
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rewrites captured NBFX documents in their shortest form. "
+        "Files starting with an [MC-NMF] version record are read as sessions, "
+        "see minimize_session."
+    )
+    parser.add_argument("source", type=Path)
+    parser.add_argument("destination", type=Path)
+    args = parser.parse_args()
+
+    total = MinimizeReport()
+    for file in iter_capture_files(args.source):
+        target = (
+            args.destination / file.relative_to(args.source)
+            if args.source.is_dir()
+            else args.destination
+        )
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with (
+            open(file, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+            open(target, "wb") as out,
+        ):
+            session = data[:1] == bytes((VERSION_RECORD,))
+            try:
+                report = (minimize_session if session else minimize)(data, out.write)
+            except ValueError as e:
+                print(f"{file}: {e}")
+                continue
+        total.records += report.records
+        total.bytes_in += report.bytes_in
+        total.bytes_out += report.bytes_out
+
+    print(
+        f"records: {total.records}  bytes: {total.bytes_in} -> {total.bytes_out}  "
+        f"saved: {total.saved}"
+    )
+
+
+if __name__ == "__main__":
+    main()
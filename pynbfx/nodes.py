@@ -0,0 +1,103 @@
+from typing import Any, Callable, Iterator
+
+"""
+Compact nodes for extraction workloads.
+
+`Node` is an alternative to `xml.etree.ElementTree.Element` as the output of
+`record_parser` and `element_parser`.  Attribute names are stored as a tuple of
+keys shared by every node with the same attribute names, next to a tuple of their
+values, and tags are shared between nodes:
+
+    >>> root = record_parser(node_factory())(stream).unwrap()
+    >>> [user.find("addata:sAMAccountName") for user in root.iter("addata:user")]
+"""
+
+
+class Node:
+    """Read mostly element with the common `Element` read API."""
+
+    __slots__ = ("tag", "names", "values", "text", "children")
+
+    def __init__(
+        self,
+        tag: str,
+        names: tuple[str, ...] = (),
+        values: tuple[Any, ...] = (),
+        text: Any = None,
+    ):
+        self.tag = tag
+        self.names = names
+        self.values = values
+        self.text = text
+        self.children: list["Node"] | tuple = ()
+
+    @property
+    def attrib(self) -> dict[str, Any]:
+        return dict(zip(self.names, self.values, strict=True))
+
+    def get(self, key: str, default=None):
+        try:
+            return self.values[self.names.index(key)]
+        except ValueError:
+            return default
+
+    def keys(self) -> tuple[str, ...]:
+        return self.names
+
+    def items(self) -> list[tuple[str, Any]]:
+        return list(zip(self.names, self.values, strict=True))
+
+    def append(self, child: "Node") -> None:
+        if not self.children:
+            self.children = []
+        self.children.append(child)
+
+    def __iter__(self) -> Iterator["Node"]:
+        return iter(self.children)
+
+    def __len__(self) -> int:
+        return len(self.children)
+
+    def __getitem__(self, index: int) -> "Node":
+        return self.children[index]
+
+    def __repr__(self) -> str:
+        return f"<Node {self.tag!r}>"
+
+    def iter(self, tag: str | None = None) -> Iterator["Node"]:
+        """Yields this node and its descendants in document order."""
+        if tag in (None, "*") or self.tag == tag:
+            yield self
+        for child in self.children:
+            yield from child.iter(tag)
+
+    def find(self, tag: str) -> "Node | None":
+        """Returns the first child with the tag."""
+        return next((child for child in self.children if child.tag == tag), None)
+
+    def findall(self, tag: str) -> list["Node"]:
+        """Returns the children with the tag."""
+        return [child for child in self.children if child.tag == tag]
+
+    def findtext(self, tag: str, default: Any = None) -> Any:
+        if (child := self.find(tag)) is None:
+            return default
+        return "" if child.text is None else child.text
+
+
+def node_factory() -> Callable[[str, dict], Node]:
+    """Returns a factory for `element_parser` building `Node`s.
+
+    Tags and tuples of attribute names are shared between the nodes built by the
+    same factory.
+    """
+    shared: dict[Any, Any] = {}
+
+    def node_fn(tag: str, attrib: dict) -> Node:
+        tag = shared.setdefault(tag, tag)
+        if not attrib:
+            return Node(tag)
+        names = tuple(attrib)
+        return Node(tag, shared.setdefault(names, names), tuple(attrib.values()))
+
+    return node_fn
@@ -2,6 +2,50 @@ from io import BytesIO
 from typing import Any, Callable, Self
 
 from .result import Result
+from .trace import Trace
+
+# receives the `enter` and `exit` of every parser call while set, see
+# `pynbfx.profiling`
+_profiler: Any = None
+
+
+def set_profiler(profiler: Any) -> Any:
+    """Sets the profiler of parser calls, None to stop profiling.
+
+    Returns:
+        Any: the profiler which was set before.
+    """
+    global _profiler
+    previous, _profiler = _profiler, profiler
+    return previous
+
+
+# the last records started, copied into the results of failed calls, see
+# `pynbfx.trace`
+_trace: Trace | None = Trace()
+
+
+def set_trace(trace: Trace | None) -> Trace | None:
+    """Sets the trace of records, None to stop tracing.
+
+    Returns:
+        Trace | None: the trace which was set before.
+    """
+    global _trace
+    previous, _trace = _trace, trace
+    return previous
+
+
+def trace_record(offset: int, record_type: int, parser: str) -> None:
+    """Adds the start of a record to the trace.
+
+    Args:
+        offset (int): position of the record type in the stream
+        record_type (int): type of the record
+        parser (str): name of the parser of the record
+    """
+    if _trace is not None:
+        _trace.steps.append((offset, record_type, parser))
 
 
 class Parser:
@@ -9,16 +53,24 @@ class Parser:
         self.wrapped_fn = wrapped_fn
 
     def __call__(self, stream: BytesIO) -> Result:
-        result = self.wrapped_fn(stream)
+        if _profiler is not None:
+            return self._profiled_call(_profiler, stream)
+        return self._call(stream)
 
-        trace_info = f"{self.desc():<20} at position {stream.tell()}"
-        if result.is_err():
-            trace_info += f" with error: {result.error_msg}"
-        else:
-            trace_info += f" result: {result.unwrap()}"
-        print(trace_info)
+    def _call(self, stream: BytesIO) -> Result:
+        result = self.wrapped_fn(stream)
+        # results failed further down already hold the steps up to the failure
+        if not result.status and _trace is not None and result.trace is None:
+            result.trace = _trace.snapshot()
         return result
 
+    def _profiled_call(self, profiler: Any, stream: BytesIO) -> Result:
+        profiler.enter(self.desc())
+        try:
+            return self._call(stream)
+        finally:
+            profiler.exit()
+
     def desc(self) -> str:
         """Return the name of the current parser
 
@@ -0,0 +1,121 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from .parser import set_profiler
+
+"""
+Opt-in profiling of parser calls.
+
+While a `ParserProfiler` is active, every call of a `Parser` is timed and
+attributed to the name `Parser.desc` gives it, the name of its wrapped
+function.  Profiles aggregate over every call made while they are active, so a
+batch of messages is profiled by decoding them all within `profile`:
+
+    >>> with profile() as profiler:
+    ...     for message in messages:
+    ...         record_parser()(BytesIO(message))
+    >>> print(profiler.table(limit=20))
+    >>> Path("parsers.folded").write_text(profiler.collapsed())
+
+`collapsed` writes the nested calls in the collapsed stack format read by
+flamegraph tools, one line per call stack with its self time in nanoseconds.
+Parsers are not profiled unless a profiler is active, and then only cost the
+check for it.
+"""
+
+
+@dataclass
+class ParserStats:
+    """Calls of the parsers of one name.
+
+    `cumulative_ns` counts the time of recursive calls of the same name once.
+    """
+
+    calls: int = 0
+    self_ns: int = 0
+    cumulative_ns: int = 0
+
+
+class ParserProfiler:
+    """Call counts, self time and cumulative time of each named parser, and the
+    self time of each stack of nested parser calls."""
+
+    def __init__(self):
+        self.stats: dict[str, ParserStats] = {}
+        self.stacks: Counter = Counter()
+        # name, start and time spent in the children of each running call
+        self._calls: list[list] = []
+        self._names: list[str] = []
+        self._running: Counter = Counter()
+
+    def enter(self, name: str) -> None:
+        self._names.append(name)
+        self._running[name] += 1
+        self._calls.append([name, time.perf_counter_ns(), 0])
+
+    def exit(self) -> None:
+        name, start, children_ns = self._calls.pop()
+        elapsed = time.perf_counter_ns() - start
+        self_ns = elapsed - children_ns
+
+        if (stats := self.stats.get(name)) is None:
+            stats = self.stats[name] = ParserStats()
+        stats.calls += 1
+        stats.self_ns += self_ns
+        self._running[name] -= 1
+        if not self._running[name]:
+            stats.cumulative_ns += elapsed
+
+        self.stacks[tuple(self._names)] += self_ns
+        self._names.pop()
+        if self._calls:
+            self._calls[-1][2] += elapsed
+
+    def table(self, sort: str = "self_ns", limit: int | None = None) -> str:
+        """Formats the stats of each parser as a text table.
+
+        Args:
+            sort (str): `ParserStats` field to sort by, in descending order
+            limit (int | None): number of parsers to list, None for all
+        """
+        total = sum(stats.self_ns for stats in self.stats.values()) or 1
+        ranked = sorted(
+            self.stats.items(), key=lambda item: getattr(item[1], sort), reverse=True
+        )[:limit]
+        lines = [
+            f"{'parser':<28} {'calls':>10} {'self ms':>10} {'self %':>7} "
+            f"{'cum ms':>10} {'ns/call':>9}"
+        ]
+        for name, stats in ranked:
+            lines.append(
+                f"{name:<28} {stats.calls:10} {stats.self_ns / 1e6:10.2f} "
+                f"{stats.self_ns / total:7.1%} {stats.cumulative_ns / 1e6:10.2f} "
+                f"{stats.self_ns / stats.calls:9.0f}"
+            )
+        return "\n".join(lines)
+
+    def collapsed(self) -> str:
+        """Formats the self time of each call stack as collapsed stacks,
+        `outer;inner nanoseconds` per line."""
+        return "".join(
+            f"{';'.join(stack)} {ns}\n" for stack, ns in sorted(self.stacks.items())
+        )
+
+
+@contextmanager
+def profile(profiler: ParserProfiler | None = None) -> Iterator[ParserProfiler]:
+    """Profiles the parser calls made within the block.
+
+    Args:
+        profiler (ParserProfiler | None): profiler to add the calls to, such as
+            the profiler of a previous batch, None for a new one
+    """
+    profiler = profiler or ParserProfiler()
+    previous = set_profiler(profiler)
+    try:
+        yield profiler
+    finally:
+        set_profiler(previous)
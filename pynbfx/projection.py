@@ -0,0 +1,199 @@
+from io import BytesIO
+from xml.etree.ElementTree import Element
+
+from .parser import Parser
+from .reader import build_tree, iter_events
+from .records import (
+    ELEMENT_TYPES,
+    END_TAG,
+    TEXT_TYPES,
+    read_tag,
+    record_event_parser,
+    skip_attributes,
+    skip_element_parser,
+    skip_text,
+)
+from .result import Result
+
+"""
+Selective decoding of the elements matching simple paths.
+
+A path is a list of tags separated by "/", where "*" matches any tag:
+
+    addata:sAMAccountName/ad:value
+    addata:user/*/ad:value
+    /s:Envelope/s:Header/a:Action
+
+Paths starting with "/" are anchored at the root element, other paths match
+elements at any depth.  Matching elements are fully decoded, all other records
+are skipped over by their lengths without decoding them.
+
+The elements which no path can match below are skipped with their subtree, only
+reading the tags of their descendants to stop at the first one which can start
+a match of a relative path.
+"""
+
+
+class Path:
+    """A parsed projection path."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.anchored = path.startswith("/")
+        self.segments = path.strip("/").split("/")
+
+    def matches(self, tags: list[str]) -> bool:
+        """Checks if the element with the tags of `tags` as its ancestors and self
+        matches the path."""
+        if len(tags) < len(self.segments) or (
+            self.anchored and len(tags) != len(self.segments)
+        ):
+            return False
+        return all(
+            segment in ("*", tag)
+            for segment, tag in zip(
+                self.segments, tags[-len(self.segments) :], strict=True
+            )
+        )
+
+    def may_match_below(self, tags: list[str]) -> bool:
+        """Checks if a descendant of the element with `tags` could continue a match
+        of the path started by the element or its ancestors.
+
+        Relative paths can also match below the element by starting at a
+        descendant with the tag of their first segment, see `skip_to_element`.
+        """
+        if self.anchored:
+            return len(tags) < len(self.segments) and all(
+                segment in ("*", tag)
+                for segment, tag in zip(self.segments, tags, strict=False)
+            )
+        if self.segments[0] == "*":
+            return True
+        return any(
+            all(
+                segment in ("*", tag)
+                for segment, tag in zip(self.segments[:size], tags[-size:], strict=True)
+            )
+            for size in range(1, min(len(tags) + 1, len(self.segments)))
+        )
+
+
+def skip_to_element(stream: BytesIO, tags: set[str]) -> int | None:
+    """Advances over the rest of an element whose element record was already read,
+    stopping before the first of its descendants with a tag in `tags`.
+
+    Args:
+        stream (BytesIO): stream positioned after the attributes of the element
+        tags (set[str]): tags to stop at
+
+    Returns:
+        int | None: the number of elements open at the descendant, from the
+        skipped element down to its parent, 0 if the whole element was skipped,
+        None if a record is truncated or invalid.
+    """
+    level = 1
+    while record := stream.read(1):
+        record_type = record[0]
+        if record_type == END_TAG:
+            level -= 1
+        elif record_type in TEXT_TYPES:
+            if not skip_text(stream, record_type):
+                return None
+            level -= record_type % 2
+        elif record_type in ELEMENT_TYPES:
+            start = stream.tell() - 1
+            if (tag := read_tag(stream, record_type)) is None:
+                return None
+            if tag in tags:
+                stream.seek(start)
+                return level
+            if not skip_attributes(stream):
+                return None
+            level += 1
+        else:
+            return None
+
+        if level <= 0:
+            return 0
+    # as with element_parser, the end of the stream closes all elements
+    return 0
+
+
+def projection_parser(*paths: str) -> Parser:
+    """Decodes only the elements matching the paths.
+
+    Args:
+        *paths (str): paths of the elements to decode
+
+    Returns:
+        Parser: parser which returns a dict of each path to the list of elements
+        matching it, in document order.
+
+    Example:
+        >>> path = "addata:sAMAccountName/ad:value"
+        >>> names = [e.text for e in projection_parser(path)(stream).unwrap()[path]]
+    """
+    patterns = [Path(path) for path in paths]
+    # tags which start a match of a relative path
+    first_tags = {pattern.segments[0] for pattern in patterns if not pattern.anchored}
+    skip_element = skip_element_parser(depth=1)
+    record_event = record_event_parser()
+
+    def projection_fn(stream: BytesIO) -> Result:
+        matches: dict[str, list[Element]] = {pattern.path: [] for pattern in patterns}
+        tags: list[str] = []
+
+        while record := stream.read(1):
+            record_type = record[0]
+
+            if record_type == END_TAG or (
+                record_type in TEXT_TYPES and record_type % 2 == 1
+            ):
+                if record_type != END_TAG and not skip_text(stream, record_type):
+                    return Result.err(stream, "Truncated text record")
+                if not tags:
+                    return Result.err(stream, "End record outside of an element")
+                tags.pop()
+
+            elif record_type in TEXT_TYPES:
+                if not skip_text(stream, record_type):
+                    return Result.err(stream, "Truncated text record")
+
+            elif record_type in ELEMENT_TYPES:
+                start = stream.tell() - 1
+                if (tag := read_tag(stream, record_type)) is None:
+                    return Result.err(stream, "Truncated element record")
+                path = tags + [tag]
+
+                matched = [pattern for pattern in patterns if pattern.matches(path)]
+                if matched:
+                    stream.seek(start)
+                    element = build_tree(iter_events(stream, record_event))
+                    for pattern in matched:
+                        matches[pattern.path].append(element)
+                elif not skip_attributes(stream):
+                    return Result.err(stream, "Truncated attribute record")
+                elif any(pattern.may_match_below(path) for pattern in patterns):
+                    tags = path
+                elif not first_tags:
+                    if not (result := skip_element(stream)):
+                        return result
+                elif (level := skip_to_element(stream, first_tags)) is None:
+                    return Result.err(stream, "Truncated or invalid record")
+                elif level:
+                    # the tags of the skipped ancestors can not be part of a match
+                    tags = path + [""] * (level - 1)
+
+            else:
+                stream.seek(-1, 1)
+                return Result.err(
+                    stream, f"Unexpected record type: 0x{record_type:02X}"
+                )
+
+            if not tags:
+                break
+
+        return Result.ok(stream, matches)
+
+    return Parser(projection_fn)
@@ -0,0 +1,244 @@
+from collections import deque
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+from xml.etree.ElementTree import Element, TreeBuilder
+
+from .combinators import byte_peak
+from .parser import Parser
+from .records import (
+    ELEMENT_TYPES,
+    END_TAG,
+    TEXT_TYPES,
+    record_event_parser,
+)
+from .result import Result
+
+if TYPE_CHECKING:
+    from .stats import ParseStats
+
+"""
+Event based reading of NBFX documents, one record at a time.
+
+Events follow the naming of `xml.etree.ElementTree.iterparse`:
+
+    ("start", (tag, attributes))
+    ("data", text)
+    ("end", tag)
+"""
+
+RECORD_TYPES = {END_TAG, *ELEMENT_TYPES, *TEXT_TYPES}
+
+
+def as_text(value: Any) -> str:
+    """Text records decode some values, such as integers, to python types."""
+    return value if type(value) is str else str(value)
+
+
+def record_events(
+    record_type: int, value: Any, tags: list[str]
+) -> list[tuple[str, Any]]:
+    """Translates a record parsed by `record_event_parser` into events.
+
+    Args:
+        record_type (int): type of the record
+        value (Any): value of the record
+        tags (list[str]): tags of the currently open elements, updated in place
+
+    Raises:
+        ValueError: If a text or end record is outside of any element.
+    """
+    if record_type in ELEMENT_TYPES:
+        tag, attrib = value
+        tags.append(tag)
+        return [("start", (tag, {k: as_text(v) for k, v in attrib.items()}))]
+
+    if not tags:
+        raise ValueError(f"Record 0x{record_type:02X} outside of an element")
+
+    if record_type == END_TAG:
+        return [("end", tags.pop())]
+
+    # text records with an odd type end the current element
+    if record_type % 2 == 1:
+        return [("data", as_text(value)), ("end", tags.pop())]
+    return [("data", as_text(value))]
+
+
+def iter_events(
+    stream: BytesIO, parser: Parser | None = None, stats: "ParseStats | None" = None
+) -> Iterator[tuple[str, Any]]:
+    """Yields the events of the element at the current position of the stream.
+
+    Stops after the end of that element, leaving the stream just past its last
+    record.  Elements still open at the end of the stream are closed, as with
+    `element_parser`.
+
+    Args:
+        stream (BytesIO): stream positioned at an element record
+        parser (Parser | None): a `record_event_parser` to reuse across calls
+        stats (ParseStats | None): `pynbfx.stats.ParseStats` to count the
+            records in, updated once the events are exhausted
+
+    Raises:
+        ValueError: If a record is malformed.
+    """
+    parser = parser or record_event_parser()
+    tags: list[str] = []
+    if stats is not None:
+        stats.start(stream)
+
+    while byte_peak()(stream):
+        position = stream.tell()
+        record_type, value = parser(stream).expect("Invalid record")
+        events = record_events(record_type, value, tags)
+        if stats is not None:
+            stats.add_record(stream, record_type, position, len(tags))
+        yield from events
+        if not tags:
+            break
+
+    while tags:
+        yield "end", tags.pop()
+    if stats is not None:
+        stats.finish(stream)
+
+
+def feed_events(events: Iterable[tuple[str, Any]], target: Any) -> Any:
+    """Calls the `start`, `data` and `end` methods of the target for each event,
+    returning the result of its `close` method."""
+    for kind, value in events:
+        if kind == "start":
+            target.start(*value)
+        elif kind == "data":
+            target.data(value)
+        else:
+            target.end(value)
+    return target.close()
+
+
+def build_tree(events: Iterable[tuple[str, Any]]) -> Element:
+    """Builds an element tree from events.
+
+    Raises:
+        ValueError: If the events do not hold an element.
+    """
+    if (root := feed_events(events, TreeBuilder())) is None:
+        raise ValueError("No element in events")
+    return root
+
+
+def target_parser(target: Any) -> Parser:
+    """Decodes the element at the current position into a target object, as
+    `ElementTree.XMLParser(target=...)` does.
+
+    The target receives `start(tag, attrib)`, `data(text)` and `end(tag)` calls
+    while records are decoded, so no tree is built unless the target builds one.
+
+    Args:
+        target (Any): object with `start`, `data`, `end` and `close` methods
+
+    Returns:
+        Parser: parser which returns the result of `target.close()`.
+
+    Example:
+        >>> root = target_parser(TreeBuilder())(stream).unwrap()
+    """
+    parser = record_event_parser()
+
+    def target_fn(stream: BytesIO) -> Result:
+        try:
+            return Result.ok(stream, feed_events(iter_events(stream, parser), target))
+        except ValueError as e:
+            return Result.err(stream, str(e))
+
+    return Parser(target_fn)
+
+
+class PullParser:
+    """Incremental NBFX decoder with the interface of `ElementTree.XMLPullParser`.
+
+    Data is fed in arbitrary chunks.  Only the bytes of the record being decoded
+    are buffered, the decoded tree is built with a `TreeBuilder`.
+
+        >>> parser = PullParser(events=("end",))
+        >>> for chunk in chunks:
+        ...     parser.feed(chunk)
+        ...     for event, element in parser.read_events():
+        ...         ...
+        >>> root = parser.close()
+    """
+
+    def __init__(self, events: tuple[str, ...] = ("end",)):
+        self._buffer = bytearray()
+        self._events: deque[tuple[str, Element]] = deque()
+        self._wanted = set(events)
+        self._builder = TreeBuilder()
+        self._parser = record_event_parser()
+        self._tags: list[str] = []
+        self._root: Element | None = None
+
+    def feed(self, data: bytes) -> None:
+        """Feeds encoded bytes to the parser."""
+        self._buffer += data
+        self._parse(final=False)
+
+    def read_events(self) -> Iterator[tuple[str, Element]]:
+        """Yields the events decoded since the last call."""
+        while self._events:
+            yield self._events.popleft()
+
+    def close(self) -> Element:
+        """Finishes decoding, returning the root element.
+
+        Raises:
+            ValueError: If the fed data does not hold a complete document.
+        """
+        self._parse(final=True)
+        if self._root is None or self._tags:
+            raise ValueError("Incomplete NBFX document")
+        return self._builder.close()
+
+    def _parse(self, final: bool) -> None:
+        stream = BytesIO(self._buffer)
+        consumed = 0
+
+        while consumed < len(self._buffer) and (self._root is None or self._tags):
+            result = self._parser(stream)
+
+            if result.is_err():
+                record_type = self._buffer[consumed]
+                if final or record_type not in RECORD_TYPES:
+                    raise ValueError(f"Invalid record: {result.error_msg}")
+                break
+
+            record_type, value = result.unwrap()
+
+            # attributes follow their element, so the element can only be
+            # completed once the next record has started
+            if (
+                record_type in ELEMENT_TYPES
+                and stream.tell() == len(self._buffer)
+                and not final
+            ):
+                break
+
+            consumed = stream.tell()
+            for event in record_events(record_type, value, self._tags):
+                self._build(event)
+
+        del self._buffer[:consumed]
+
+    def _build(self, event: tuple[str, Any]) -> None:
+        kind, value = event
+        if kind == "start":
+            element = self._builder.start(*value)
+            if self._root is None:
+                self._root = element
+        elif kind == "data":
+            self._builder.data(value)
+            return
+        else:
+            element = self._builder.end(value)
+
+        if kind in self._wanted:
+            self._events.append((kind, element))
@@ -1,8 +1,9 @@
-from .parser import Parser
+from .parser import Parser, trace_record
 from .result import Result
 
 import struct
 
+from typing import Any, Callable
 from xml.etree.ElementTree import Element
 
 from io import BytesIO
@@ -21,6 +22,7 @@ from .combinators import (
     sequence,
     type_selector,
     byte_parser,
+    bytes_parser,
     byte_peak,
     signed_int_x_parser,
     int31_parser,
@@ -28,6 +30,8 @@ from .combinators import (
     many_while_prefix,
     string_parser,
     not_implmented,
+    read_int31,
+    seek_forward,
 )
 
 
@@ -185,7 +189,7 @@ def chars8_text_parser() -> Parser:
 
     return (
         byte_parser()
-        .bind_ignore(lambda length: byte_parser(length))
+        .bind_ignore(lambda length: bytes_parser(length))
         .bind_ignore(lambda s: success(s.decode("utf-8")))
     )
 
@@ -195,7 +199,7 @@ def chars16_text_parser() -> Parser:
 
     return (
         byte_parser()
-        .bind_ignore(lambda length: byte_parser(length))
+        .bind_ignore(lambda length: bytes_parser(length))
         .bind_ignore(lambda s: success(s.decode("utf-8")))
     )
 
@@ -205,7 +209,7 @@ def chars32_text_parser() -> Parser:
 
     return (
         byte_parser()
-        .bind_ignore(lambda length: byte_parser(length))
+        .bind_ignore(lambda length: bytes_parser(length))
         .bind_ignore(lambda s: success(s.decode("utf-8")))
     )
 
@@ -215,7 +219,7 @@ def bytes8_text_parser() -> Parser:
 
     return (
         byte_parser()
-        .bind_ignore(lambda length: byte_parser(length))
+        .bind_ignore(lambda length: bytes_parser(length))
         .bind_ignore(lambda bs: success(bs))
         .map(lambda s: base64.b64encode(s).decode("utf-8"))
     )
@@ -226,7 +230,7 @@ def bytes16_text_parser() -> Parser:
 
     return (
         byte_parser()
-        .bind_ignore(lambda length: byte_parser(length))
+        .bind_ignore(lambda length: bytes_parser(length))
         .bind_ignore(lambda bs: success(bs))
         .map(lambda s: base64.b64encode(s).decode("utf-8"))
     )
@@ -237,7 +241,7 @@ def bytes32_text_parser() -> Parser:
 
     return (
         byte_parser()
-        .bind_ignore(lambda length: byte_parser(length))
+        .bind_ignore(lambda length: bytes_parser(length))
         .bind_ignore(lambda bs: success(bs))
         .map(lambda s: base64.b64encode(s).decode("utf-8"))
     )
@@ -349,7 +353,7 @@ def unicode_chars8_text_parser() -> Parser:
 
     return (
         byte_parser()
-        .bind_ignore(lambda length: byte_parser(length))
+        .bind_ignore(lambda length: bytes_parser(length))
         .map(lambda utf16_bytes: utf16_bytes.decode("utf-16"))
     )
 
@@ -359,7 +363,7 @@ def unicode_chars16_text_parser() -> Parser:
 
     return (
         byte_parser(2)
-        .bind_ignore(lambda length: byte_parser(int.from_bytes(length)))
+        .bind_ignore(lambda length: bytes_parser(int.from_bytes(length)))
         .map(lambda utf16_bytes: utf16_bytes.decode("utf-16"))
     )
 
@@ -369,7 +373,7 @@ def unicode_chars32_text_parser() -> Parser:
 
     return (
         int31_parser()
-        .bind_ignore(lambda length: byte_parser(length))
+        .bind_ignore(lambda length: bytes_parser(length))
         .map(lambda utf16_bytes: utf16_bytes.decode("utf-16"))
     )
 
@@ -584,10 +588,13 @@ def tag_name_parser(record_type: int) -> Parser:
 
 
 def attribute_parser() -> Parser:
+    text = text_parser()
+
     def parse_attribte_fn(stream: BytesIO) -> Result:
         if not (result := byte_parser()(stream)):
             return result
         record_type = result.unwrap()
+        trace_record(stream.tell() - 1, record_type, "attribute_parser")
         if record_type not in ATTRIBUTE_TYPES:
             return Result.err(stream, "Not Attribute Record")
 
@@ -608,7 +615,7 @@ def attribute_parser() -> Parser:
         ]:
             result = dict_parser(DICTIONARY)(stream)
         else:
-            result = text_parser()(stream)
+            result = text(stream)
         if result.is_err():
             return result
         value = result.unwrap()
@@ -618,11 +625,48 @@ def attribute_parser() -> Parser:
     return Parser(parse_attribte_fn)
 
 
-def element_parser() -> Parser:
+def element_start_parser(record_type: int) -> Parser:
+    """Parses the tag and attributes of an element record, after its record type.
+
+    Args:
+        record_type (int): type of the current element record
+
+    Returns:
+        Parser: parser which returns a tuple of the tag and the attribute dict.
+    """
+    tag_parser = sequence(
+        tag_prefix_parser(record_type), tag_name_parser(record_type)
+    ).map(lambda tag: "".join(tag))
+
+    attributes_parser = many_while_prefix(
+        attribute_parser(),
+        byte_peak(),
+        lambda value: value in ATTRIBUTE_TYPES,
+    )
+
+    return tag_parser.bind_ignore(
+        lambda tag: attributes_parser.map(
+            lambda attribs: (tag, {k: v for d in attribs for k, v in d.items()})
+        )
+    )
+
+
+def element_parser(factory: Callable[[str, dict], Any] = Element) -> Parser:
+    """Parses an element record and all of its children.
+
+    Args:
+        factory (Callable[[str, dict], Any]): builds a node from a tag and
+            attributes, the node needs a `text` attribute and an `append` method
+
+    Returns:
+        Parser: parser which returns the root node.
+    """
+
     def parse_element_fn(stream: BytesIO) -> Result:
         if not (result := byte_parser()(stream)):
             return result
         record_type = result.unwrap()
+        trace_record(stream.tell() - 1, record_type, "element_parser")
 
         if record_type == END_TAG:
             return Result.ok(stream, "End record")
@@ -638,22 +682,8 @@ def element_parser() -> Parser:
             return Result.err(stream, "Not Element Record")
 
         ########## define parsers ###############
-        tag_parser = sequence(
-            tag_prefix_parser(record_type), tag_name_parser(record_type)
-        ).map(lambda tag: "".join(tag))
-
-        attributes_parser = many_while_prefix(
-            attribute_parser(),
-            byte_peak(),
-            lambda value: value in ATTRIBUTE_TYPES,
-        )
-
-        current_element_parser = tag_parser.bind_ignore(
-            lambda tag: attributes_parser.bind_ignore(
-                lambda attribs: success(
-                    Element(tag, **{k: v for d in attribs for k, v in d.items()})
-                )
-            )
+        current_element_parser = element_start_parser(record_type).map(
+            lambda start: factory(start[0], start[1])
         )
         ########## apply parsers ##################
 
@@ -661,7 +691,7 @@ def element_parser() -> Parser:
             return result.aggregate(
                 Result.err(stream, f"{current_element_parser.desc()}")
             )
-        root: Element = result.unwrap()
+        root = result.unwrap()
 
         # Peek ahead to determine if we've reached the end of input
         if not (result := byte_peak()(stream)):
@@ -680,15 +710,16 @@ def element_parser() -> Parser:
                 if peaked_record_type % 2 == 1:  # is an end record so return root
                     return Result.ok(stream, root)
 
-        childeren_parser = many_while_prefix(
-            element_parser(),
+        children_parser = many_while_prefix(
+            element_parser(factory),
             byte_peak(),
             lambda value: value in list(ELEMENT_TYPES),
         )
 
-        while (result := childeren_parser(stream)) and result.value:
+        while (result := children_parser(stream)) and result.value:
             for i in result.value:
-                if isinstance(i, Element):
+                # end records parse to a string
+                if not isinstance(i, str):
                     root.append(i)
 
         # if the next thing is an end record, clear it preemptivly
@@ -702,9 +733,291 @@ def element_parser() -> Parser:
     return Parser(parse_element_fn)
 
 
-def record_parser() -> Parser:
+def record_event_parser() -> Parser:
+    """Parses a single record without descending into the children of elements.
+
+    Element records are parsed together with their attribute records.
+
+    Returns:
+        Parser: parser which returns a tuple of the record type and its value,
+        `(tag, attributes)` for element records, the decoded text for text
+        records and None for end records.
+    """
+    text = text_parser()
+    element_starts: dict[int, Parser] = {}
+
+    def record_event_fn(stream: BytesIO) -> Result:
+        if not (result := byte_peak()(stream)):
+            return result
+        record_type = result.unwrap()
+        trace_record(stream.tell(), record_type, "record_event_parser")
+
+        if record_type == END_TAG:
+            byte_parser()(stream)
+            return Result.ok(stream, (record_type, None))
+
+        if record_type in ELEMENT_TYPES:
+            byte_parser()(stream)
+            if record_type not in element_starts:
+                element_starts[record_type] = element_start_parser(record_type)
+            return element_starts[record_type](stream).map(
+                lambda start: (record_type, start)
+            )
+
+        if record_type in TEXT_TYPES:
+            return text(stream).map(lambda value: (record_type, value))
+
+        return Result.err(stream, f"Unexpected record type: 0x{record_type:02X}")
+
+    return Parser(record_event_fn)
+
+
+def record_parser(factory: Callable[[str, dict], Any] = Element) -> Parser:
     def parse_record_fn(stream: BytesIO) -> Result:
         # Parse the root element and its children
-        return element_parser()(stream)
+        return element_parser(factory)(stream)
 
     return Parser(parse_record_fn)
+
+
+"""
+Skip parsers
+
+These advance over records using only their lengths, without decoding text or
+names.  Lengths are read the same way the parsers above read them.
+"""
+
+# payload sizes of fixed size text records, by their even record type
+FIXED_TEXT_SIZES = {
+    0x80: 0,  # ZeroText
+    0x82: 0,  # OneText
+    0x84: 0,  # FalseText
+    0x86: 0,  # TrueText
+    0x88: 1,  # Int8Text
+    0x8A: 2,  # Int16Text
+    0x8C: 4,  # Int32Text
+    0x8E: 8,  # Int64Text
+    0x90: 4,  # FloatText
+    0x92: 8,  # DoubleText
+    0x94: 16,  # DecimalText
+    0x96: 8,  # DateTimeText
+    0xA4: 0,  # StartListText
+    0xA6: 0,  # EndListText
+    0xA8: 0,  # EmptyText
+    0xAC: 16,  # UniqueIdText
+    0xAE: 8,  # TimeSpanText
+    0xB0: 16,  # UuidText
+    0xB2: 8,  # UInt64Text
+    0xB4: 1,  # BoolText
+}
+
+# size of the length prefix of variable size text records, by their even record type
+PREFIXED_TEXT_LENGTHS = {
+    0x98: 1,  # Chars8Text
+    0x9A: 1,  # Chars16Text
+    0x9C: 1,  # Chars32Text
+    0x9E: 1,  # Bytes8Text
+    0xA0: 1,  # Bytes16Text
+    0xA2: 1,  # Bytes32Text
+    0xB6: 1,  # UnicodeChars8Text
+    0xB8: 2,  # UnicodeChars16Text
+}
+
+DICTIONARY_TEXT = 0xAA
+QNAME_DICTIONARY_TEXT = 0xBC
+UNICODE_CHARS32_TEXT = 0xBA
+
+INLINE_PREFIX_TYPES = [ATTRIBUTE, DICTIONARY_ATTRIBUTE, ELEMENT, DICTIONARY_ELEMENT]
+NAMELESS_TYPES = [SHORT_XMLNS_ATTRIBUTE, SHORT_DICTIONARY_XMLNS_ATTRIBUTE]
+DICTIONARY_NAME_TYPES = set(GROUP_DICTIONARY_ATTRIBUTES + GROUP_DICTIONARY_ELEMENTS)
+
+
+def text_payload_size(stream: BytesIO, record_type: int) -> int | None:
+    """Returns the size of the payload of a text record, reading past its length
+    prefix if it has one.
+
+    Args:
+        stream (BytesIO): stream positioned just after the record type
+        record_type (int): type of the text record
+
+    Returns:
+        int | None: size of the payload, None for unknown or truncated records
+    """
+    record_type &= ~1
+    if (size := FIXED_TEXT_SIZES.get(record_type)) is not None:
+        return size
+
+    if length_size := PREFIXED_TEXT_LENGTHS.get(record_type):
+        length = stream.read(length_size)
+        if len(length) != length_size:
+            return None
+        return int.from_bytes(length)
+
+    if record_type == DICTIONARY_TEXT:
+        # the payload is the int31 key itself
+        return None if read_int31(stream) is None else 0
+
+    if record_type == QNAME_DICTIONARY_TEXT:
+        # a prefix byte then the int31 key of the name
+        if not stream.read(1):
+            return None
+        return None if read_int31(stream) is None else 0
+
+    if record_type == UNICODE_CHARS32_TEXT:
+        return read_int31(stream)
+
+    return None
+
+
+def skip_string(stream: BytesIO) -> bool:
+    """Advances over an int31 length prefixed string."""
+    length = read_int31(stream)
+    return length is not None and seek_forward(stream, length)
+
+
+def skip_name(stream: BytesIO, record_type: int) -> bool:
+    """Advances over the prefix and name of an element or attribute record."""
+    if record_type in INLINE_PREFIX_TYPES and not skip_string(stream):
+        return False
+    if record_type in NAMELESS_TYPES:
+        return True
+    if record_type in DICTIONARY_NAME_TYPES:
+        return read_int31(stream) is not None
+    return skip_string(stream)
+
+
+def read_string(stream: BytesIO) -> str | None:
+    """Reads an int31 length prefixed string, as `string_parser` does."""
+    length = read_int31(stream)
+    if length is None or len(data := stream.read(length)) != length:
+        return None
+    return data.decode("utf-8")
+
+
+def read_tag(stream: BytesIO, record_type: int) -> str | None:
+    """Reads the prefix and name of an element record, as `tag_prefix_parser` and
+    `tag_name_parser` do, without the overhead of parsers.
+
+    Args:
+        stream (BytesIO): stream positioned just after the record type
+        record_type (int): type of the element record
+
+    Returns:
+        str | None: the tag, None if the record is truncated or invalid.
+    """
+    if record_type in PREFIX_DICTIONARY_ELEMENTS:
+        prefix = letter_in_range(record_type, PREFIX_DICTIONARY_ELEMENTS) + ":"
+    elif record_type in PREFIX_ELEMENTS:
+        prefix = letter_in_range(record_type, PREFIX_ELEMENTS) + ":"
+    elif record_type in INLINE_PREFIX_TYPES:
+        if (prefix := read_string(stream)) is None:
+            return None
+        prefix += ":"
+    else:
+        prefix = ""
+
+    if record_type in DICTIONARY_NAME_TYPES:
+        if (key := read_int31(stream)) is None or not (name := DICTIONARY.get(key)):
+            return None
+        return prefix + name
+
+    if (name := read_string(stream)) is None:
+        return None
+    return prefix + name
+
+
+def skip_text(stream: BytesIO, record_type: int) -> bool:
+    """Advances over the payload of a text record."""
+    size = text_payload_size(stream, record_type)
+    return size is not None and seek_forward(stream, size)
+
+
+def skip_attributes(stream: BytesIO) -> bool:
+    """Advances over all attribute records at the current position."""
+    while (peek := stream.read(1)) and peek[0] in ATTRIBUTE_TYPES:
+        record_type = peek[0]
+        if not skip_name(stream, record_type):
+            return False
+
+        if record_type in [XMLNS_ATTRIBUTE, SHORT_XMLNS_ATTRIBUTE]:
+            skipped = skip_string(stream)
+        elif record_type in [
+            SHORT_DICTIONARY_XMLNS_ATTRIBUTE,
+            DICTIONARY_XMLNS_ATTRIBUTE,
+        ]:
+            skipped = read_int31(stream) is not None
+        else:
+            text = stream.read(1)
+            skipped = bool(text) and skip_text(stream, text[0])
+        if not skipped:
+            return False
+
+    if peek:
+        stream.seek(-1, 1)
+    return True
+
+
+def skip_record_parser() -> Parser:
+    """Advances over a single record, element records together with their attributes.
+
+    Returns:
+        Parser: parser which returns the type of the skipped record.
+    """
+
+    def skip_record_fn(stream: BytesIO) -> Result:
+        init_pos = stream.tell()
+        if not (record := stream.read(1)):
+            return Result.err(stream, "End of stream")
+        record_type = record[0]
+
+        if record_type == END_TAG:
+            skipped = True
+        elif record_type in ELEMENT_TYPES:
+            skipped = skip_name(stream, record_type) and skip_attributes(stream)
+        elif record_type in TEXT_TYPES:
+            skipped = skip_text(stream, record_type)
+        else:
+            stream.seek(init_pos)
+            return Result.err(stream, f"Unexpected record type: 0x{record_type:02X}")
+
+        if not skipped:
+            stream.seek(init_pos)
+            return Result.err(stream, f"Truncated record: 0x{record_type:02X}")
+        return Result.ok(stream, record_type)
+
+    return Parser(skip_record_fn)
+
+
+def skip_element_parser(depth: int = 0) -> Parser:
+    """Advances over the rest of an element and all of its children.
+
+    Args:
+        depth (int): 0 to skip the element starting at the current position, 1 to
+            skip the rest of an element whose element record was already read
+
+    Returns:
+        Parser: parser which returns the number of records skipped.
+    """
+    skip_record = skip_record_parser()
+
+    def skip_element_fn(stream: BytesIO) -> Result:
+        level = depth
+        count = 0
+        while True:
+            if not (result := skip_record(stream)):
+                # as with element_parser, the end of the stream closes all elements
+                if stream.read(1):
+                    return result
+                return Result.ok(stream, count)
+            record_type = result.unwrap()
+            count += 1
+
+            if record_type in ELEMENT_TYPES:
+                level += 1
+            elif record_type == END_TAG or record_type % 2 == 1:
+                level -= 1
+
+            if level <= 0:
+                return Result.ok(stream, count)
+
+    return Parser(skip_element_fn)
@@ -0,0 +1,244 @@
+import math
+import mmap
+import multiprocessing
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Iterable
+from xml.etree.ElementTree import TreeBuilder
+
+from .analyze import iter_capture_files
+from .framing import (
+    BINARY_SESSION_ENCODING,
+    VERSION_RECORD,
+    iter_envelopes,
+    string_table_parser,
+)
+from .parser import Parser
+from .reader import record_events
+from .records import record_event_parser
+
+"""
+Replay of captured messages through the decoder, measuring its throughput.
+
+Each message is decoded into an element tree, timing the decode of each
+message.  Files hold NBFX documents one after the other or an [MC-NMF] session,
+as read by `pynbfx.analyze`, and are mapped and replayed one at a time, by a
+pool of worker processes if `workers` is more than one:
+
+    >>> stats, seconds = replay([Path("captures/")], workers=4)
+    >>> print(stats.format(seconds))
+
+A message which fails to decode is counted by the type of the record it failed
+at, the rest of its file is skipped as the start of the next message is not
+known.
+"""
+
+# upper bounds of the message size buckets, larger messages are in a last bucket
+SIZE_BUCKETS = (1 << 10, 1 << 12, 1 << 14, 1 << 16, 1 << 18, 1 << 20)
+PERCENTILES = (50, 90, 99)
+
+# failures outside of a record
+TRUNCATED = "truncated"
+FRAMING = "framing"
+
+
+def size_bucket(size: int) -> int:
+    """Returns the index of the size bucket of a message."""
+    for index, bound in enumerate(SIZE_BUCKETS):
+        if size < bound:
+            return index
+    return len(SIZE_BUCKETS)
+
+
+def bucket_label(index: int) -> str:
+    def kb(size: int) -> str:
+        return f"{size >> 10}K" if size < 1 << 20 else f"{size >> 20}M"
+
+    if index == 0:
+        return f"< {kb(SIZE_BUCKETS[0])}"
+    if index == len(SIZE_BUCKETS):
+        return f">= {kb(SIZE_BUCKETS[-1])}"
+    return f"{kb(SIZE_BUCKETS[index - 1])}-{kb(SIZE_BUCKETS[index])}"
+
+
+def percentile(values: list[int], p: float) -> int:
+    """Returns the nearest-rank percentile of sorted values."""
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+@dataclass
+class ReplayStats:
+    """Counts and decode latencies of replayed messages."""
+
+    files: int = 0
+    messages: int = 0
+    bytes: int = 0
+    decode_ns: int = 0
+    # failed messages by the record type they failed at
+    failures: Counter = field(default_factory=Counter)
+    # nanoseconds to decode each message, by size bucket
+    latencies: dict[int, list[int]] = field(default_factory=dict)
+
+    def add(self, size: int, ns: int) -> None:
+        self.messages += 1
+        self.bytes += size
+        self.decode_ns += ns
+        self.latencies.setdefault(size_bucket(size), []).append(ns)
+
+    def merge(self, other: "ReplayStats") -> None:
+        self.files += other.files
+        self.messages += other.messages
+        self.bytes += other.bytes
+        self.decode_ns += other.decode_ns
+        self.failures.update(other.failures)
+        for bucket, latencies in other.latencies.items():
+            self.latencies.setdefault(bucket, []).extend(latencies)
+
+    def percentiles(self) -> dict[str, dict[str, float]]:
+        """Returns the message count and latency percentiles in microseconds of
+        each size bucket."""
+        buckets = {}
+        for bucket, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            buckets[bucket_label(bucket)] = {
+                "messages": len(latencies),
+                **{f"p{p}": percentile(latencies, p) / 1e3 for p in PERCENTILES},
+            }
+        return buckets
+
+    def format(self, seconds: float) -> str:
+        """Formats the stats as text tables, with rates over `seconds` of wall
+        clock time."""
+        failed = sum(self.failures.values())
+        lines = [
+            f"files: {self.files}  messages: {self.messages}  "
+            f"bytes: {self.bytes}  failures: {failed}",
+            f"wall: {seconds:.2f} s  {self.messages / seconds:.0f} messages/s  "
+            f"{self.bytes / 1e6 / seconds:.2f} MB/s",
+        ]
+        if self.decode_ns:
+            lines.append(
+                f"decode: {self.decode_ns / 1e9:.2f} s  "
+                f"{self.bytes / 1e3 / self.decode_ns * 1e6:.2f} MB/s per worker"
+            )
+
+        header = " ".join(f"{f'p{p} us':>10}" for p in PERCENTILES)
+        lines += ["", f"{'size':<12} {'messages':>10} {header}"]
+        for label, bucket in self.percentiles().items():
+            values = " ".join(f"{bucket[f'p{p}']:10.1f}" for p in PERCENTILES)
+            lines.append(f"{label:<12} {bucket['messages']:10} {values}")
+
+        if self.failures:
+            lines += ["", f"{'record':<12} {'failures':>10}"]
+            for record, count in self.failures.most_common():
+                lines.append(f"{record:<12} {count:10}")
+        return "\n".join(lines)
+
+
+def replay_message(stream: BytesIO, stats: ReplayStats, parser: Parser) -> bool:
+    """Decodes the element at the current position into an element tree, timing
+    it.
+
+    Returns:
+        bool: False if the message failed to decode, the stream is then left at
+        the record it failed at.
+    """
+    start = stream.tell()
+    builder = TreeBuilder()
+    tags: list[str] = []
+    begin = time.perf_counter_ns()
+
+    while True:
+        position = stream.tell()
+        try:
+            result = parser(stream)
+            if result.is_ok():
+                record_type, value = result.unwrap()
+                events = record_events(record_type, value, tags)
+        except (ValueError, NotImplementedError):
+            result = None
+        if not result:
+            stream.seek(position)
+            record = stream.read(1)
+            stats.failures[f"0x{record[0]:02X}" if record else TRUNCATED] += 1
+            stream.seek(position)
+            return False
+
+        for kind, item in events:
+            if kind == "start":
+                builder.start(*item)
+            elif kind == "data":
+                builder.data(item)
+            else:
+                builder.end(item)
+        if not tags:
+            break
+
+    builder.close()
+    stats.add(stream.tell() - start, time.perf_counter_ns() - begin)
+    return True
+
+
+def replay_stream(stream: BytesIO, stats: ReplayStats) -> None:
+    """Replays the messages of a stream, either NBFX documents one after the
+    other or an [MC-NMF] session."""
+    parser = record_event_parser()
+    if stream.read(1) != bytes((VERSION_RECORD,)):
+        stream.seek(0)
+        while stream.read(1):
+            stream.seek(-1, 1)
+            if not replay_message(stream, stats, parser):
+                return
+        return
+
+    stream.seek(0)
+    try:
+        for envelope in iter_envelopes(stream):
+            resume = stream.tell()
+            stream.seek(envelope.offset if envelope.offset is not None else resume)
+            payload = (
+                stream if envelope.offset is not None else BytesIO(envelope.payload)
+            )
+            if (
+                envelope.encoding == BINARY_SESSION_ENCODING
+                and string_table_parser()(payload).is_err()
+            ):
+                stats.failures[FRAMING] += 1
+            else:
+                replay_message(payload, stats, parser)
+            stream.seek(resume)
+    except ValueError:
+        stats.failures[FRAMING] += 1
+
+
+def replay_file(path: Path) -> ReplayStats:
+    """Replays the messages of a capture file, see `replay_stream`."""
+    stats = ReplayStats(files=1)
+    with open(path, "rb") as f:
+        # closed once the views of its envelopes are released
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    replay_stream(data, stats)
+    return stats
+
+
+def replay(paths: Iterable[Path], workers: int = 1) -> tuple[ReplayStats, float]:
+    """Replays every capture file in the paths, by `workers` processes.
+
+    Returns:
+        tuple[ReplayStats, float]: the merged stats, and the seconds of wall
+        clock time the replay took.
+    """
+    files = [file for path in paths for file in iter_capture_files(Path(path))]
+    stats = ReplayStats()
+    start = time.perf_counter()
+    if workers <= 1:
+        for file_stats in map(replay_file, files):
+            stats.merge(file_stats)
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            for file_stats in pool.imap_unordered(replay_file, files):
+                stats.merge(file_stats)
+    return stats, time.perf_counter() - start
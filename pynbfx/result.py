@@ -2,6 +2,8 @@ from dataclasses import dataclass
 from io import BytesIO
 from typing import Any, Optional, Self, Callable
 
+from .trace import TraceStep, format_trace
+
 
 @dataclass
 class Result:
@@ -11,12 +13,16 @@ class Result:
 
         >>> Result.ok(stream, "my val")
         >>> Result.err(stream, "my error message")
+
+    A failed result holds the `trace` of the parser calls leading to the
+    failure, see `pynbfx.trace`.
     """
 
     status: bool
     stream: BytesIO
     value: Optional[Any]
     error_msg: Optional[str] = None
+    trace: Optional[tuple[TraceStep, ...]] = None
 
     @staticmethod
     def ok(stream: BytesIO, value: Any) -> "Result":
@@ -58,7 +64,10 @@ class Result:
     def expect(self, err_msg: str) -> Any:
         """Return the value if Ok, otherwise raise an exception with a custom message."""
         if self.is_err():
-            raise ValueError(f"{err_msg}: {self.error_msg}")
+            error = ValueError(f"{err_msg}: {self.error_msg}")
+            if self.trace:
+                error.add_note(format_trace(self.trace))
+            raise error
         return self.value
 
     def match(
@@ -95,7 +104,9 @@ class Result:
                 if self.error_msg
                 else other.error_msg
             )
-            return Result.err(self.stream, error_msg=combined_error)
+            result = Result.err(self.stream, error_msg=combined_error)
+            result.trace = self.trace or other.trace
+            return result
 
         if isinstance(self.value, dict) and isinstance(other.value, dict):
             merged_value = {**self.value, **other.value}
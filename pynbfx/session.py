@@ -0,0 +1,141 @@
+from typing import Any, Callable
+from xml.etree.ElementTree import Element
+
+from .encoder import DICTIONARY_IDS, Encoder, int31, string, string_size
+
+"""
+[MC-NBFSE]: .NET Binary Format: SOAP Extension, encoding side.
+
+With the binary session encoding, each envelope payload starts with a
+StringTable of the strings it adds to the dictionary of the session.  The n-th
+string added to a session gets the id `2n + 1`, and every later payload of the
+session refers to it by that id instead of writing it inline:
+
+    >>> session = Session()
+    >>> for request in requests:
+    ...     send_envelope(session.encode(request))
+
+There is no record removing a string from the dictionary of a peer, so the table
+is bounded the way WCF bounds it, by a quota of `max_bytes` which each string
+added is charged with its size in the StringTable.  Strings which do not fit in
+what is left of the quota are written inline.  The default is the default
+`MaxSessionSize` of the WCF binary encoder, a peer faults a session which goes
+over its own quota.
+"""
+
+# default bytes of StringTable strings a session adds, MaxSessionSize of WCF
+MAX_SESSION_SIZE = 2048
+
+# text values whose uses are counted before the counts are dropped
+MAX_COUNTED_VALUES = 2048
+
+
+class Session:
+    """Strings added to the dictionary of one direction of a session.
+
+    Names and namespaces are added the first time they are written.  Text values
+    are added once they were written `value_uses` times, so values used only
+    once, such as message ids, do not fill the table.
+
+    Args:
+        max_bytes (int): bytes of StringTable strings the session adds at most,
+            their int31 lengths included
+        value_uses (int | None): uses of a text value before it is added, None
+            to never add text values
+    """
+
+    def __init__(self, max_bytes: int = MAX_SESSION_SIZE, value_uses: int | None = 2):
+        self.max_bytes = max_bytes
+        self.value_uses = value_uses
+        self.ids: dict[str, int] = {}
+        # bytes of the strings added, as charged against `max_bytes`
+        self.size = 0
+        # strings added since the last StringTable
+        self._pending: list[str] = []
+        # uses of text values not in the table yet
+        self._uses: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, value: str) -> int | None:
+        """Returns the id of a string, adding it if it fits in the quota."""
+        if (key := self.ids.get(value)) is not None:
+            return key
+        size = string_size(value)
+        if self.size + size > self.max_bytes:
+            return None
+        self.size += size
+        key = self.ids[value] = 2 * len(self.ids) + 1
+        self._pending.append(value)
+        return key
+
+    def use_value(self, text: str) -> int | None:
+        """Returns the id of a text value, adding it once it was used
+        `value_uses` times."""
+        if (key := self.ids.get(text)) is not None or self.value_uses is None:
+            return key
+        uses = self._uses.get(text, 0) + 1
+        if uses < self.value_uses:
+            # counts of values which were never added are dropped in bulk
+            if len(self._uses) >= MAX_COUNTED_VALUES:
+                self._uses.clear()
+            self._uses[text] = uses
+            return None
+        self._uses.pop(text, None)
+        return self.add(text)
+
+    def string_table(self) -> bytes:
+        """Encodes the StringTable of the strings added since the last call."""
+        table = b"".join(string(value) for value in self._pending)
+        self._pending.clear()
+        return int31(len(table)) + table
+
+    def rollback(self) -> None:
+        """Forgets the strings added since the last StringTable."""
+        for value in self._pending:
+            del self.ids[value]
+            self.size -= string_size(value)
+        self._pending.clear()
+
+    def encode(self, element: Element) -> bytes:
+        """Encodes an element tree as an envelope payload, its StringTable followed
+        by the NBFX document.
+
+        Raises:
+            ValueError: If the tree holds nodes which can not be encoded.
+        """
+        out = bytearray()
+        try:
+            SessionEncoder(out.extend, self).element(element)
+        except ValueError:
+            self.rollback()
+            raise
+        return self.string_table() + out
+
+
+class SessionEncoder(Encoder):
+    """`Encoder` using the strings of a session as dictionary strings, adding
+    strings to the session as it writes them.
+
+    The StringTable of the added strings has to be sent before the records, see
+    `Session.encode`.
+
+    Args:
+        write (Callable[[bytes], Any]): called with the bytes of each record
+        session (Session): strings of the session
+    """
+
+    def __init__(self, write: Callable[[bytes], Any], session: Session):
+        super().__init__(write)
+        self.session = session
+
+    def dictionary_id(self, value: str) -> int | None:
+        if (key := DICTIONARY_IDS.get(value)) is not None:
+            return key
+        return self.session.add(value)
+
+    def text_dictionary_id(self, text: str) -> int | None:
+        if (key := DICTIONARY_IDS.get(text)) is not None:
+            return key
+        return self.session.use_value(text)
@@ -0,0 +1,144 @@
+from dataclasses import dataclass, field
+from io import BytesIO
+from xml.etree.ElementTree import Element
+
+from .combinators import byte_peak
+from .framing import buffer_view
+from .parser import Parser
+from .reader import as_text, build_tree, iter_events
+from .records import (
+    ELEMENT_TYPES,
+    END_TAG,
+    TEXT_TYPES,
+    read_tag,
+    record_event_parser,
+    skip_element_parser,
+    skip_text,
+)
+from .result import Result
+from .utils import local_name
+
+"""
+Header first decoding of SOAP envelopes.
+
+Routing a message only needs the fields of `s:Header`, such as `a:Action` and
+`a:RelatesTo`.  `header_parser` decodes an envelope up to the start of `s:Body`
+and returns a `BodyHandle` to decode the body later, or to hand its bytes to
+another worker.
+
+    >>> header, body = header_parser()(stream).unwrap()
+    >>> fields = {child.tag: child.text for child in header}
+    >>> if fields["a:Action"] == PULL_RESPONSE:
+    ...     root = body.decode()
+"""
+
+
+@dataclass
+class BodyHandle:
+    """Position of the undecoded body of an envelope in its stream.
+
+    `namespaces` are the namespace declarations of the envelope, which the body
+    needs when it is decoded on its own.
+    """
+
+    stream: BytesIO
+    start: int
+    namespaces: dict[str, str] = field(default_factory=dict)
+    _end: int | None = field(default=None, init=False, repr=False)
+
+    @property
+    def end(self) -> int:
+        """Position just past the last record of the body, found by skipping over
+        the records of the body by length."""
+        if self._end is None:
+            self.stream.seek(self.start)
+            skip_element_parser()(self.stream).expect("Invalid body")
+            self._end = self.stream.tell()
+        return self._end
+
+    def raw(self) -> memoryview:
+        """Returns a view of the encoded body in the buffer of the stream."""
+        return buffer_view(self.stream)[self.start : self.end]
+
+    def decode(self) -> Element:
+        """Decodes the body.
+
+        Raises:
+            ValueError: If the body is malformed.
+        """
+        self.stream.seek(self.start)
+        body = build_tree(iter_events(self.stream))
+        self._end = self.stream.tell()
+        return body
+
+
+def header_parser() -> Parser:
+    """Decodes a SOAP envelope up to the start of its body.
+
+    The stream is left at the start of the body.  Text between the children of
+    the envelope, such as whitespace, is skipped.
+
+    Returns:
+        Parser: parser which returns a tuple of the header element, None if there
+        is no header, and a `BodyHandle`, None if there is no body.
+    """
+    record_event = record_event_parser()
+
+    def header_fn(stream: BytesIO) -> Result:
+        if not (result := record_event(stream)):
+            return result
+        record_type, value = result.unwrap()
+        if record_type not in ELEMENT_TYPES:
+            return Result.err(stream, "Not Element Record")
+        _, attrib = value
+        namespaces = {
+            name: as_text(uri)
+            for name, uri in attrib.items()
+            if name == "xmlns" or name.startswith("xmlns:")
+        }
+
+        header = None
+        while result := byte_peak()(stream):
+            start = stream.tell()
+            record_type = result.unwrap()
+            if record_type in TEXT_TYPES and record_type % 2 == 0:
+                # text, such as whitespace, between the children of the envelope
+                stream.read(1)
+                if not skip_text(stream, record_type):
+                    return Result.err(stream, "Truncated text record")
+                continue
+            if record_type not in ELEMENT_TYPES:
+                break
+
+            stream.read(1)
+            if (tag := read_tag(stream, record_type)) is None:
+                return Result.err(stream, "Truncated element record")
+            stream.seek(start)
+
+            if local_name(tag) == "Body":
+                return Result.ok(
+                    stream, (header, BodyHandle(stream, start, namespaces))
+                )
+
+            try:
+                child = build_tree(iter_events(stream, record_event))
+            except ValueError as e:
+                return Result.err(stream, str(e))
+            if local_name(tag) == "Header":
+                header = child
+
+        # the envelope has no body, it ends with the end of the stream, an end
+        # record or text ending the envelope
+        if result:
+            stream.read(1)
+            if record_type in TEXT_TYPES:
+                if not skip_text(stream, record_type):
+                    return Result.err(stream, "Truncated text record")
+            elif record_type != END_TAG:
+                stream.seek(-1, 1)
+                return Result.err(
+                    stream, f"Unexpected record type: 0x{record_type:02X}"
+                )
+        return Result.ok(stream, (header, None))
+
+    return Parser(header_fn)
@@ -0,0 +1,201 @@
+from io import BytesIO
+from typing import Any, Callable
+from xml.etree.ElementTree import Element, TreeBuilder
+
+from .combinators import byte_peak
+from .encoder import Encoder
+from .framing import buffer_view
+from .parser import Parser
+from .reader import record_events
+from .records import record_event_parser
+from .result import Result
+
+"""
+Re-encoding of decoded documents, copying the records of unmodified elements.
+
+`parse_spans` decodes a tree of `SpanElement`, which remember the position of
+their records in the source buffer and their content as decoded.  `splice` then
+copies the records of every element left untouched byte for byte, and only
+encodes the elements which changed:
+
+    >>> root = parse_spans(stream)
+    >>> next(root.iter("a:To")).text = "net.tcp://dc.example.com:9389/"
+    >>> data = splice(root)
+
+Copied records keep any dictionary strings of the source.  References to
+[MC-NBFSE] session strings are only valid on the connection they were read
+from, so spliced output of such a document has to be sent on that connection.
+"""
+
+
+class SpanElement(Element):
+    """Element remembering where its records are in the buffer it was decoded
+    from.
+
+    `span` is the position of its first record and the position past its last
+    record in `source`, None for elements which were not decoded.  Tails are
+    records of the parent, the span of an element does not hold its tail.
+    """
+
+    __slots__ = ("source", "span", "_snapshot")
+
+    def __init__(self, tag: str, attrib: dict[str, Any] | None = None, **extra: Any):
+        super().__init__(tag, attrib or {}, **extra)
+        self.source: memoryview | None = None
+        self.span: tuple[int, int] | None = None
+        self._snapshot: tuple | None = None
+
+    def snapshot(self) -> None:
+        """Records the content of the element as the content of its span."""
+        children = tuple(self)
+        self._snapshot = (
+            self.tag,
+            dict(self.attrib),
+            self.text,
+            children,
+            tuple(child.tail for child in children),
+        )
+
+    def is_modified(self) -> bool:
+        """Returns True if the tag, attributes, text, children or the tails of the
+        children changed since the snapshot.  Changes inside the children are not
+        checked."""
+        if self._snapshot is None:
+            return True
+        tag, attrib, text, children, tails = self._snapshot
+        return (
+            self.tag != tag
+            or self.text != text
+            or self.attrib != attrib
+            or tuple(self) != children
+            or tuple([child.tail for child in children]) != tails
+        )
+
+
+def span_parser() -> Parser:
+    """Decodes the element at the current position into `SpanElement`.
+
+    The elements hold a view of the buffer of the stream, which can not be
+    resized while they are alive.  Elements still open at the end of the stream
+    have no span.
+
+    Returns:
+        Parser: parser which returns the root `SpanElement`.
+    """
+    parser = record_event_parser()
+
+    def span_fn(stream: BytesIO) -> Result:
+        source = buffer_view(stream)
+        builder = TreeBuilder(element_factory=SpanElement)
+        tags: list[str] = []
+        starts: list[int] = []
+
+        while byte_peak()(stream):
+            position = stream.tell()
+            if not (result := parser(stream)):
+                return result
+            record_type, value = result.unwrap()
+            try:
+                events = record_events(record_type, value, tags)
+            except ValueError as e:
+                return Result.err(stream, str(e))
+
+            for kind, item in events:
+                if kind == "start":
+                    builder.start(*item)
+                    starts.append(position)
+                elif kind == "data":
+                    builder.data(item)
+                else:
+                    element = builder.end(item)
+                    element.source = source
+                    element.span = (starts.pop(), stream.tell())
+            if not tags:
+                break
+
+        while tags:
+            builder.end(tags.pop())
+        if (root := builder.close()) is None:
+            return Result.err(stream, "No element record")
+
+        for element in root.iter():
+            element.snapshot()
+        return Result.ok(stream, root)
+
+    return Parser(span_fn)
+
+
+def parse_spans(stream: BytesIO) -> SpanElement:
+    """Decodes the element at the current position of the stream into
+    `SpanElement`, see `span_parser`.
+
+    Raises:
+        ValueError: If a record is malformed.
+    """
+    return span_parser()(stream).expect("Invalid NBFX document")
+
+
+def unmodified_elements(root: Element) -> set[int]:
+    """Returns the ids of the elements which, with all of their descendants, are
+    unmodified `SpanElement` with a span."""
+    unmodified = set()
+
+    def visit(element: Element) -> bool:
+        # every child is visited, not only up to the first modified one
+        clean = True
+        for child in element:
+            clean = visit(child) and clean
+        if (
+            clean
+            and isinstance(element, SpanElement)
+            and element.span is not None
+            and not element.is_modified()
+        ):
+            unmodified.add(id(element))
+            return True
+        return False
+
+    visit(root)
+    return unmodified
+
+
+class SpliceEncoder(Encoder):
+    """`Encoder` copying the records of unmodified `SpanElement` from their
+    source instead of encoding them.
+
+    Args:
+        write (Callable[[bytes], Any]): called with the bytes of each record, or
+            a view of the records of an unmodified element
+    """
+
+    def __init__(self, write: Callable[[bytes], Any]):
+        super().__init__(write)
+        self._unmodified: set[int] | None = None
+
+    def element(self, element: Element) -> None:
+        if self._unmodified is None:
+            self._unmodified = unmodified_elements(element)
+            try:
+                self.element(element)
+            finally:
+                self._unmodified = None
+            return
+
+        if id(element) in self._unmodified:
+            self.flush_text()
+            start, end = element.span
+            self._write(element.source[start:end])
+        else:
+            super().element(element)
+
+
+def splice(element: Element) -> bytes:
+    """Encodes an element tree, copying the records of unmodified elements
+    decoded by `parse_spans`.
+
+    Raises:
+        ValueError: If the tree holds nodes which can not be encoded.
+    """
+    out = bytearray()
+    SpliceEncoder(out.extend).element(element)
+    return bytes(out)
@@ -0,0 +1,133 @@
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from io import BytesIO
+from xml.etree.ElementTree import Element
+
+from .analyze import TEXT, scan_attributes, scan_name, scan_text
+from .reader import build_tree, iter_events
+from .records import ATTRIBUTE_TYPES, ELEMENT_TYPES, TEXT_TYPES
+
+"""
+Statistics of decoded documents.
+
+`iter_events` counts the records it decodes in a `ParseStats` if one is given,
+and `parse_with_stats` returns the stats of a document with its tree:
+
+    >>> root, stats = parse_with_stats(stream)
+    >>> metrics.send(stats.to_dict())
+
+Without stats the decoder only checks for them once per record.  With stats the
+names, attributes and strings of each record are counted by scanning its bytes
+again, as `pynbfx.analyze` does.  Stats add up over every document decoded
+with them.
+"""
+
+
+@dataclass
+class ParseStats:
+    """Counts of the records of decoded documents.
+
+    Dictionary strings are names, namespaces and text referring to the static
+    or session dictionary, inline strings are those written out in the record.
+    `largest_text` is the size of the largest text record after its type,
+    including any length prefix.
+    """
+
+    documents: int = 0
+    bytes: int = 0
+    elements: int = 0
+    texts: int = 0
+    max_depth: int = 0
+    dictionary_strings: int = 0
+    inline_strings: int = 0
+    largest_text: int = 0
+    wall_ns: int = 0
+    # records by record type, attribute records included
+    record_counts: Counter = field(default_factory=Counter)
+    _start: tuple[int, int] | None = field(default=None, repr=False)
+
+    @property
+    def attributes(self) -> int:
+        return sum(self.record_counts[t] for t in ATTRIBUTE_TYPES)
+
+    def start(self, stream: BytesIO) -> None:
+        """Starts counting a document at the current position of the stream."""
+        self._start = (stream.tell(), time.perf_counter_ns())
+
+    def finish(self, stream: BytesIO) -> None:
+        """Ends the document started by `start` at the current position."""
+        if self._start is None:
+            return
+        position, begin = self._start
+        self.documents += 1
+        self.bytes += stream.tell() - position
+        self.wall_ns += time.perf_counter_ns() - begin
+        self._start = None
+
+    def add_record(
+        self, stream: BytesIO, record_type: int, position: int, depth: int
+    ) -> None:
+        """Counts a record just decoded from `position` to the current position
+        of the stream, `depth` elements deep."""
+        end = stream.tell()
+        self.record_counts[record_type] += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+        if record_type in ELEMENT_TYPES:
+            self.elements += 1
+            stream.seek(position + 1)
+            scan_name(stream, record_type, self)
+            scan_attributes(stream, self)
+        elif record_type in TEXT_TYPES:
+            self.texts += 1
+            self.largest_text = max(self.largest_text, end - position - 1)
+            stream.seek(position + 1)
+            scan_text(stream, record_type, self)
+        stream.seek(end)
+
+    def add_string(self, kind: str, value: str, size: int) -> None:
+        self.inline_strings += 1
+        if kind == TEXT and size > self.largest_text:
+            self.largest_text = size
+
+    def add_key(self, kind: str, key: int | None) -> None:
+        if key is not None:
+            self.dictionary_strings += 1
+
+    def to_dict(self) -> dict:
+        """Returns the stats as a dict of numbers, record types as hex strings."""
+        return {
+            "documents": self.documents,
+            "bytes": self.bytes,
+            "elements": self.elements,
+            "attributes": self.attributes,
+            "texts": self.texts,
+            "max_depth": self.max_depth,
+            "dictionary_strings": self.dictionary_strings,
+            "inline_strings": self.inline_strings,
+            "largest_text": self.largest_text,
+            "wall_ns": self.wall_ns,
+            "records": {
+                f"0x{record_type:02X}": count
+                for record_type, count in sorted(self.record_counts.items())
+            },
+        }
+
+
+def parse_with_stats(
+    stream: BytesIO, stats: ParseStats | None = None
+) -> tuple[Element, ParseStats]:
+    """Decodes the element at the current position into an element tree,
+    counting its records.
+
+    Args:
+        stream (BytesIO): stream positioned at an element record
+        stats (ParseStats | None): stats to add the document to, None for new
+
+    Raises:
+        ValueError: If a record is malformed.
+    """
+    stats = stats if stats is not None else ParseStats()
+    return build_tree(iter_events(stream, stats=stats)), stats
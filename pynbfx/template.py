@@ -0,0 +1,148 @@
+import re
+from dataclasses import dataclass
+from typing import Any
+from xml.etree.ElementTree import Element
+
+from .encoder import Encoder
+from .records import END_TAG
+
+"""
+Pre-encoded templates of messages which only differ in a few values.
+
+A template is an element tree where some text and attribute values are
+placeholders, a value of the form `{name}`.  `compile_template` encodes the
+records between the placeholders once, so rendering a message only encodes the
+values of the placeholders and joins them with the encoded records:
+
+    >>> template = compile_template(pull_envelope)
+    >>> template.names
+    ['MessageID', 'EnumerationContext', 'MaxElements']
+    >>> data = template.render(MessageID=f"urn:uuid:{uuid4()}", ...)
+
+A rendered message is the same as the output of `encode` for the tree with its
+placeholders replaced by the values.
+"""
+
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+# encoder of the values of placeholders
+VALUE_ENCODER = Encoder(None)
+
+
+def placeholder_name(value: Any) -> str | None:
+    """Returns the name of the placeholder a value is, None if it is not one."""
+    if type(value) is str and (match := PLACEHOLDER.fullmatch(value)):
+        return match[1]
+    return None
+
+
+@dataclass(frozen=True)
+class Slot:
+    """A placeholder in a compiled template.
+
+    `end` is set for text which ends its element, `attribute` for attribute
+    values, which are a single text record.
+
+    The record of a value is chosen when it is rendered, not when the template
+    is compiled: values such as "1", small integers or dictionary strings have
+    shorter records than Chars8Text, and a rendered message has to be the same
+    as the output of `encode`.
+    """
+
+    name: str
+    end: bool = False
+    attribute: bool = False
+
+    def encode(self, value: Any) -> bytes:
+        """Encodes the value of the placeholder as text records."""
+        if self.attribute:
+            return VALUE_ENCODER.text_record(value)
+        if value == "":
+            # as `Encoder` writes no text record for empty text
+            return bytes((END_TAG,)) if self.end else b""
+        return VALUE_ENCODER.text_record(value, self.end)
+
+
+@dataclass
+class Template:
+    """Encoded records of a template, `segments[i]` comes before `slots[i]` and
+    the last segment after the last slot."""
+
+    segments: list[bytes]
+    slots: list[Slot]
+
+    @property
+    def names(self) -> list[str]:
+        """Names of the placeholders, in the order of the document."""
+        return list(dict.fromkeys(slot.name for slot in self.slots))
+
+    def render(self, **values: Any) -> bytes:
+        """Encodes a message with the values of the placeholders.
+
+        Raises:
+            ValueError: If a placeholder has no value.
+        """
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:], strict=True):
+            try:
+                value = values[slot.name]
+            except KeyError:
+                raise ValueError(f"Missing value for {{{slot.name}}}") from None
+            parts.append(slot.encode(value))
+            parts.append(segment)
+        return b"".join(parts)
+
+
+class TemplateCompiler(Encoder):
+    """`Encoder` which writes the records of a template into segments, and the
+    placeholders it meets into slots between them.
+
+    Raises:
+        ValueError: from `start` if a namespace declaration is a placeholder.
+    """
+
+    def __init__(self):
+        self.segments = [bytearray()]
+        self.slots: list[Slot] = []
+        super().__init__(lambda data: self.segments[-1].extend(data))
+
+    def start(self, tag: str, attrib: dict[str, Any]) -> None:
+        self.flush_text()
+        self._write(self.element_record(tag))
+        for name, value in attrib.items():
+            if (slot := placeholder_name(value)) is None:
+                self._write(self.attribute_record(name, value))
+            elif name == "xmlns" or name.startswith("xmlns:"):
+                raise ValueError(
+                    f"Namespace declaration {name} can not be a placeholder"
+                )
+            else:
+                self._write(self.attribute_name(name))
+                self.add_slot(Slot(slot, attribute=True))
+
+    def flush_text(self, end: bool = False) -> bool:
+        if len(self._text) == 1 and (slot := placeholder_name(self._text[0])):
+            self._text.clear()
+            self.add_slot(Slot(slot, end=end))
+            return True
+        return super().flush_text(end)
+
+    def add_slot(self, slot: Slot) -> None:
+        self.slots.append(slot)
+        self.segments.append(bytearray())
+
+    def close(self) -> Template:
+        super().close()
+        return Template([bytes(segment) for segment in self.segments], self.slots)
+
+
+def compile_template(element: Element) -> Template:
+    """Encodes the records of an element tree around its placeholders.
+
+    Raises:
+        ValueError: If the tree holds nodes which can not be encoded, or a
+            namespace declaration is a placeholder.
+    """
+    compiler = TemplateCompiler()
+    compiler.element(element)
+    return compiler.close()
@@ -0,0 +1,47 @@
+from collections import deque
+from typing import NamedTuple
+
+"""
+Bounded trace of decoded records, for the post-mortem of failed parses.
+
+The record parsers add each record they start to a ring buffer holding the last
+`size` records, see `pynbfx.parser.set_trace` and `pynbfx.parser.trace_record`.
+A `Result` which fails takes a copy of the buffer as its `trace`, and
+`Result.expect` adds it to the error it raises:
+
+    >>> result = record_parser()(stream)
+    >>> if result.is_err():
+    ...     print(format_trace(result.trace))
+
+Only the start of records is traced, not every parser call, so the trace costs
+an append per record while parsing succeeds.
+"""
+
+DEFAULT_SIZE = 32
+
+
+class TraceStep(NamedTuple):
+    offset: int
+    record_type: int
+    parser: str
+
+
+class Trace:
+    """Ring buffer of the last records started."""
+
+    def __init__(self, size: int = DEFAULT_SIZE):
+        self.steps: deque[tuple[int, int, str]] = deque(maxlen=size)
+
+    def snapshot(self) -> tuple[TraceStep, ...]:
+        """Returns the steps in the buffer, oldest first."""
+        return tuple(TraceStep._make(step) for step in self.steps)
+
+    def clear(self) -> None:
+        self.steps.clear()
+
+
+def format_trace(steps: tuple[TraceStep, ...]) -> str:
+    """Formats trace steps as lines of offset, record type and parser name."""
+    return "\n".join(
+        f"{step.offset:>10}   0x{step.record_type:02X} {step.parser}" for step in steps
+    )
@@ -0,0 +1,310 @@
+import json
+from io import BytesIO, TextIOBase
+from typing import IO, Any, Iterable
+from xml.sax.saxutils import escape
+
+from .reader import target_parser
+
+"""
+Conversion of NBFX documents to XML text, JSON and dicts.
+
+The writers and builders are targets for `target_parser`, they produce their
+output as records are decoded, without building an element tree.
+
+    >>> with open("capture.xml", "w") as out:
+    ...     transcode(stream, out, indent="  ")
+"""
+
+# flush buffered output once it grows past this many characters
+WRITE_BUFFER_SIZE = 1 << 16
+
+ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+class TextWriter:
+    """Buffers text for a text or binary file object."""
+
+    def __init__(self, out: IO, encoding: str = "utf-8"):
+        self._out = out
+        self._binary = not isinstance(out, TextIOBase)
+        self._encoding = encoding
+        self._buffer: list[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> None:
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= WRITE_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        text = "".join(self._buffer)
+        self._out.write(text.encode(self._encoding) if self._binary else text)
+        self._buffer.clear()
+        self._size = 0
+
+
+class XMLWriter(TextWriter):
+    """Target writing escaped XML text.
+
+    Elements are always written with an end tag, as by
+    `ET.tostring(short_empty_elements=False)`.
+
+    Args:
+        out (IO): text or binary file object
+        indent (str | None): whitespace to indent each level with, None to write
+            the document without added whitespace
+        encoding (str): encoding of the text written to binary files
+    """
+
+    def __init__(self, out: IO, indent: str | None = None, encoding: str = "utf-8"):
+        super().__init__(out, encoding)
+        self._indent = indent
+        # for each open element, if it has child elements
+        self._parents: list[bool] = []
+
+    def start(self, tag: str, attrib: dict[str, Any]) -> None:
+        if self._indent is not None and self._parents:
+            self._parents[-1] = True
+            self.write("\n" + self._indent * len(self._parents))
+        self._parents.append(False)
+
+        self.write("<" + tag)
+        for name, value in attrib.items():
+            self.write(f' {name}="{escape(value, ATTRIBUTE_ENTITIES)}"')
+        self.write(">")
+
+    def data(self, text: str) -> None:
+        self.write(escape(text))
+
+    def end(self, tag: str) -> None:
+        if self._parents.pop() and self._indent is not None:
+            self.write("\n" + self._indent * len(self._parents))
+        self.write(f"</{tag}>")
+
+    def close(self) -> None:
+        self.flush()
+
+
+def transcode(
+    stream: BytesIO, out: IO, indent: str | None = None, encoding: str = "utf-8"
+) -> None:
+    """Writes the element at the current position of the stream as XML text.
+
+    Args:
+        stream (BytesIO): stream positioned at an element record
+        out (IO): text or binary file object
+        indent (str | None): whitespace to indent each level with
+        encoding (str): encoding of the text written to binary files
+
+    Raises:
+        ValueError: If a record is malformed.
+    """
+    target_parser(XMLWriter(out, indent, encoding))(stream).expect(
+        "Invalid NBFX document"
+    )
+
+
+class DictBuilder:
+    """Target building plain dicts and lists with the conventions of xmltodict.
+
+    An element without attributes or children is its text, or None when empty.
+    Other elements are dicts of their prefixed attributes, their children and
+    their text.  Children with a tag that repeats are gathered in a list.
+
+    Args:
+        attr_prefix (str): prefix of attribute keys
+        text_key (str): key of the text of elements with attributes or children
+        force_list (Iterable[str]): tags which are always gathered in a list
+    """
+
+    def __init__(
+        self,
+        attr_prefix: str = "@",
+        text_key: str = "#text",
+        force_list: Iterable[str] = (),
+    ):
+        self._attr_prefix = attr_prefix
+        self._text_key = text_key
+        self._force_list = set(force_list)
+        # tag, attributes and children, text parts of each open element
+        self._stack: list[tuple[str, dict[str, Any], list[str]]] = []
+        self._root: dict[str, Any] = {}
+
+    def start(self, tag: str, attrib: dict[str, Any]) -> None:
+        items = {self._attr_prefix + name: value for name, value in attrib.items()}
+        self._stack.append((tag, items, []))
+
+    def data(self, text: str) -> None:
+        self._stack[-1][2].append(text)
+
+    def end(self, tag: str) -> None:
+        tag, items, parts = self._stack.pop()
+        text = "".join(parts) or None
+        if items:
+            if text is not None:
+                items[self._text_key] = text
+            value = items
+        else:
+            value = text
+
+        parent = self._stack[-1][1] if self._stack else self._root
+        if tag in parent:
+            # values are never lists, other than the lists of repeated tags
+            if not isinstance(parent[tag], list):
+                parent[tag] = [parent[tag]]
+            parent[tag].append(value)
+        elif tag in self._force_list:
+            parent[tag] = [value]
+        else:
+            parent[tag] = value
+
+    def close(self) -> dict[str, Any]:
+        return self._root
+
+
+class JSONElement:
+    """Output state of an element open in a `JSONWriter`."""
+
+    __slots__ = ("tag", "attrib", "parts", "opened", "keys", "run")
+
+    def __init__(self, tag: str, attrib: dict[str, Any]):
+        self.tag = tag
+        self.attrib = attrib
+        self.parts: list[str] = []
+        # if the start of the object was written
+        self.opened = False
+        # tags of the children written so far
+        self.keys: set[str] = set()
+        # tag of the list of children being written
+        self.run: str | None = None
+
+
+class JSONWriter(TextWriter):
+    """Target writing the JSON of `DictBuilder`'s output while decoding.
+
+    The output is written as soon as elements end, so a list has to be declared
+    up front: repeated tags must be in `force_list`, and their elements must be
+    next to each other.
+
+    Args:
+        out (IO): text or binary file object
+        attr_prefix (str): prefix of attribute keys
+        text_key (str): key of the text of elements with attributes or children
+        force_list (Iterable[str]): tags which are always written as a list
+        encoding (str): encoding of the text written to binary files
+
+    Raises:
+        ValueError: from `start` if a tag repeats and can not be written as a list.
+    """
+
+    def __init__(
+        self,
+        out: IO,
+        attr_prefix: str = "@",
+        text_key: str = "#text",
+        force_list: Iterable[str] = (),
+        encoding: str = "utf-8",
+    ):
+        super().__init__(out, encoding)
+        self._attr_prefix = attr_prefix
+        self._text_key = text_key
+        self._force_list = set(force_list)
+        # the document is an object holding the root element
+        self._stack = [JSONElement("", {})]
+
+    def start(self, tag: str, attrib: dict[str, Any]) -> None:
+        parent = self._stack[-1]
+        self._open(parent)
+
+        if tag == parent.run:
+            self.write(", ")
+        else:
+            if tag in parent.keys:
+                raise ValueError(
+                    f"{tag} repeats in {parent.tag or 'the document'}, "
+                    "its elements have to be next to each other and in force_list"
+                )
+            if parent.run is not None:
+                self.write("]")
+            self.write(", " if parent.keys else "")
+            self.write(json.dumps(tag) + ": ")
+            parent.keys.add(tag)
+            parent.run = None
+            if tag in self._force_list:
+                self.write("[")
+                parent.run = tag
+
+        self._stack.append(JSONElement(tag, attrib))
+
+    def data(self, text: str) -> None:
+        self._stack[-1].parts.append(text)
+
+    def end(self, tag: str) -> None:
+        element = self._stack.pop()
+        text = "".join(element.parts) or None
+
+        if not element.opened and not element.attrib:
+            self.write(json.dumps(text))
+            return
+
+        self._open(element)
+        if element.run is not None:
+            self.write("]")
+        if text is not None:
+            self.write(", " if element.keys else "")
+            self.write(f"{json.dumps(self._text_key)}: {json.dumps(text)}")
+        self.write("}")
+
+    def close(self) -> None:
+        document = self._stack.pop()
+        self._open(document)
+        if document.run is not None:
+            self.write("]")
+        self.write("}")
+        self.flush()
+
+    def _open(self, element: JSONElement) -> None:
+        """Writes the start of the object of an element and its attributes."""
+        if element.opened:
+            return
+        element.opened = True
+
+        self.write("{")
+        for name, value in element.attrib.items():
+            self.write(", " if element.keys else "")
+            self.write(f"{json.dumps(self._attr_prefix + name)}: {json.dumps(value)}")
+            element.keys.add(self._attr_prefix + name)
+
+
+def to_dict(
+    stream: BytesIO,
+    attr_prefix: str = "@",
+    text_key: str = "#text",
+    force_list: Iterable[str] = (),
+) -> dict[str, Any]:
+    """Decodes the element at the current position of the stream into dicts.
+
+    Raises:
+        ValueError: If a record is malformed.
+    """
+    builder = DictBuilder(attr_prefix, text_key, force_list)
+    return target_parser(builder)(stream).expect("Invalid NBFX document")
+
+
+def transcode_json(
+    stream: BytesIO,
+    out: IO,
+    attr_prefix: str = "@",
+    text_key: str = "#text",
+    force_list: Iterable[str] = (),
+    encoding: str = "utf-8",
+) -> None:
+    """Writes the element at the current position of the stream as JSON.
+
+    Raises:
+        ValueError: If a record is malformed, or a repeated tag is not in
+            `force_list`.
+    """
+    writer = JSONWriter(out, attr_prefix, text_key, force_list, encoding)
+    target_parser(writer)(stream).expect("Invalid NBFX document")
@@ -18,3 +18,8 @@ def letter_in_range(value: int, letter_range: range) -> str:
         raise ValueError(f"Value {value} is out of the specified range.")
 
     return chr(ord("a") + (value - letter_range.start))
+
+
+def local_name(tag: str) -> str:
+    """Returns the tag without its prefix."""
+    return tag.rpartition(":")[2]
@@ -0,0 +1,144 @@
+from array import array
+from importlib.util import find_spec
+from io import BytesIO
+from unittest import TestCase, skipUnless
+
+from pynbfx.adws import Column, DirectoryItem, export_columns, iter_items
+
+
+def chars8(text: bytes) -> bytes:
+    return bytes([len(text)]) + text
+
+
+def value(xsi_type: bytes, text: bytes) -> bytes:
+    return b"A\x02ad\x05value\x05\x03xsi\x04type\x98" + chars8(xsi_type) + text
+
+
+def pull_response() -> bytes:
+    """A PullResponse with a user and a group."""
+    user = (
+        b"A\x06addata\x04user"
+        + b"A\x06addata\x0esAMAccountName"
+        + value(b"xsd:string", b"\x99\x04jdoe")
+        + b"\x01"
+        + b"A\x06addata\x09objectSid"
+        + value(b"xsd:base64Binary", b"\x9e\x03\x01\x05\x00\x9f\x01\x07")
+        + b"\x01"
+        + b"A\x06addata\x0bmemberOfIds"
+        + value(b"xsd:int", b"\x89\x07")
+        + value(b"xsd:int", b"\x89\x08")
+        + b"\x01"
+        + b"\x01"
+    )
+    group = (
+        b"A\x06addata\x05group"
+        + b"A\x06addata\x02cn"
+        + value(b"xsd:string", b"\x99\x06admins")
+        + b"\x01\x01"
+    )
+    return (
+        b"V\x02\x0b\x01s\x04V\x0e"
+        + b"A\x04wsen\x0cPullResponse"
+        + b"A\x04wsen\x05Items"
+        + user
+        + group
+        + b"\x01A\x04wsen\x0dEndOfSequence\x01\x01\x01\x01"
+    )
+
+
+class TestIterItems(TestCase):
+    def setUp(self):
+        self.data = pull_response()
+
+    def test_items(self):
+        items = list(iter_items(BytesIO(self.data)))
+        self.assertEqual(
+            [
+                DirectoryItem(
+                    "user",
+                    {
+                        "sAMAccountName": ["jdoe"],
+                        "objectSid": [b"\x01\x05\x00\x07"],
+                        "memberOfIds": [7, 8],
+                    },
+                ),
+                DirectoryItem("group", {"cn": ["admins"]}),
+            ],
+            items,
+        )
+
+    def test_item_access(self):
+        user = next(iter_items(BytesIO(self.data)))
+        self.assertEqual("jdoe", user.get("sAMAccountName"))
+        self.assertEqual([7, 8], user["memberOfIds"])
+        self.assertIsNone(user.get("mail"))
+
+    def test_streaming(self):
+        # the first item is yielded before the rest of the page is decoded
+        items = iter_items(BytesIO(self.data[: self.data.index(b"group") - 8]))
+        self.assertEqual("user", next(items).object_class)
+
+    def test_attribute_without_values(self):
+        data = self.data.replace(
+            b"\x01\x01A\x06addata\x05group",
+            b"\x01A\x06addata\x04mail\x01\x01A\x06addata\x05group",
+        )
+        user = next(iter_items(BytesIO(data)))
+        self.assertEqual([], user["mail"])
+        self.assertIsNone(user.get("mail"))
+
+    def test_invalid_value(self):
+        data = self.data.replace(b"\x89\x07", b"\x99\x01x")
+        with self.assertRaises(ValueError):
+            list(iter_items(BytesIO(data)))
+
+
+class TestColumnarItems(TestCase):
+    def setUp(self):
+        self.data = pull_response()
+
+    def test_columns(self):
+        table = export_columns([BytesIO(self.data), BytesIO(self.data)])
+        self.assertEqual(["user", "group", "user", "group"], table.object_classes)
+        self.assertEqual(4, len(table.columns["cn"]))
+
+        ids = table.columns["memberOfIds"]
+        self.assertEqual(array("q", [7, 8, 7, 8]), ids.values)
+        self.assertEqual([7, 8], ids.get(2))
+        self.assertIsNone(ids.get(1))
+        self.assertEqual([True, False], [ids.is_null(1), ids.is_null(2)])
+
+        cn = table.columns["cn"]
+        self.assertEqual(
+            [None, ["admins"], None, ["admins"]], [cn.get(i) for i in range(4)]
+        )
+        self.assertIs(cn.values[0], cn.values[1])
+
+    def test_rows(self):
+        table = export_columns([BytesIO(self.data)])
+        self.assertEqual(
+            list(iter_items(BytesIO(self.data))), [table.row(0), table.row(1)]
+        )
+
+    def test_rows_without_values(self):
+        data = self.data.replace(
+            b"\x01\x01A\x06addata\x05group",
+            b"\x01A\x06addata\x04mail\x01\x01A\x06addata\x05group",
+        )
+        table = export_columns([BytesIO(data)])
+        self.assertEqual(list(iter_items(BytesIO(data))), [table.row(0), table.row(1)])
+        self.assertEqual([], table.row(0)["mail"])
+        self.assertIsNone(table.columns["mail"].get(1))
+
+    def test_large_integers(self):
+        column = Column("value")
+        for value in [1, 1 << 70]:
+            column.append(value)
+            column.end_row()
+        self.assertEqual([1, 1 << 70], column.values)
+
+    @skipUnless(find_spec("numpy"), "NumPy is not installed")
+    def test_numpy(self):
+        arrays = export_columns([BytesIO(self.data)]).to_numpy()
+        self.assertEqual([(7, 8), None], arrays["memberOfIds"].tolist())
+        self.assertEqual([None, "admins"], arrays["cn"].tolist())
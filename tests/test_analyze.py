@@ -0,0 +1,109 @@
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.analyze import (
+    INLINE,
+    NAME,
+    NAMESPACE,
+    SESSION,
+    STATIC,
+    TEXT,
+    CorpusReport,
+    StringCounts,
+    analyze,
+    analyze_message,
+)
+from pynbfx.encoder import encode
+from pynbfx.framing import BINARY_SESSION_ENCODING
+from pynbfx.session import Session
+
+
+def message(i: int) -> ET.Element:
+    root = ET.Element(
+        "s:Envelope", {"xmlns:s": "http://www.w3.org/2003/05/soap-envelope"}
+    )
+    body = ET.SubElement(root, "s:Body")
+    user = ET.SubElement(body, "addata:user", {"xmlns:addata": "urn:addata"})
+    ET.SubElement(user, "addata:sAMAccountName").text = f"user{i}"
+    ET.SubElement(user, "addata:objectClass").text = "organizationalPerson"
+    return root
+
+
+class TestAnalyze(TestCase):
+    def test_message(self):
+        report = CorpusReport()
+        data = encode(message(1))
+        self.assertTrue(analyze_message(BytesIO(data), report))
+
+        self.assertEqual(1, report.messages)
+        self.assertEqual(len(data), report.bytes)
+        self.assertEqual(2, report.record_counts[0x56])
+        self.assertEqual(1, report.record_counts[0x0B])
+        self.assertEqual(1, report.record_counts[0x09])
+        self.assertEqual(3, report.record_counts[0x41])
+        self.assertIn(0x41, report.record_ns)
+        self.assertEqual(2, report.sources[NAME, STATIC])
+        self.assertEqual(3, report.sources[NAME, INLINE])
+        self.assertEqual(1, report.sources[NAMESPACE, STATIC])
+        self.assertEqual(1, report.sources[NAMESPACE, INLINE])
+        self.assertEqual(2, report.sources[TEXT, INLINE])
+
+    def test_invalid_message(self):
+        report = CorpusReport()
+        self.assertFalse(analyze_message(BytesIO(b"@\x01a\x02"), report))
+        self.assertEqual(1, report.failures)
+
+    def test_unimplemented_record(self):
+        report = CorpusReport()
+        self.assertFalse(analyze_message(BytesIO(b"@\x01a\xa8\x01"), report))
+        self.assertEqual(1, report.failures)
+
+    def test_recommendations(self):
+        report = CorpusReport()
+        for i in range(10):
+            analyze_message(BytesIO(encode(message(i))), report)
+        strings = [value for value, _, _ in report.recommendations()]
+        self.assertEqual("organizationalPerson", strings[0])
+        self.assertNotIn("user1", strings)
+
+    def test_bounded_counts(self):
+        counts = StringCounts(capacity=2)
+        for i in range(100):
+            counts.add("common", 20)
+            counts.add(f"rare{i}", 6)
+        self.assertLessEqual(len(counts), 4)
+        self.assertEqual(100, counts.counts["common"][0])
+
+    def test_directory(self):
+        session = Session()
+        envelopes = b"".join(
+            b"\x06" + bytes([len(payload)]) + payload
+            for payload in (session.encode(message(i)) for i in range(3))
+        )
+        preamble = (
+            b"\x00\x01\x00\x01\x02\x02\x0enet.tcp://dc1/\x03"
+            + bytes([BINARY_SESSION_ENCODING])
+            + b"\x0c"
+        )
+        # a StringTable running past its envelope, followed by a valid envelope
+        bad = b"\x06\x04\x01\x01ab" + envelopes
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            (path / "session.bin").write_bytes(preamble + envelopes + b"\x07")
+            (path / "messages").mkdir()
+            (path / "messages" / "a.nbfx").write_bytes(
+                encode(message(1)) + encode(message(2))
+            )
+            (path / "empty.nbfx").write_bytes(b"")
+            report = analyze([path])
+            (path / "session.bin").write_bytes(preamble + bad + b"\x07")
+            failed = analyze([path / "session.bin"])
+
+        self.assertEqual(5, report.messages)
+        self.assertEqual(0, report.failures)
+        self.assertEqual(3, failed.messages)
+        self.assertEqual(1, failed.failures)
+        self.assertGreater(report.sources[NAME, SESSION], 0)
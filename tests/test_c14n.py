@@ -0,0 +1,66 @@
+import hashlib
+from io import BytesIO
+from unittest import TestCase
+
+from pynbfx.c14n import canonicalize, digest_ids
+
+SOAP = b"http://www.w3.org/2003/05/soap-envelope"
+WSU = b"http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-utility-1.0.xsd"
+
+
+class TestExclusiveCanonicalization(TestCase):
+    def setUp(self):
+        self.data = (
+            b"V\x02\x0b\x01s\x04\x09\x01u" + bytes([len(WSU)]) + WSU
+            + b"V\x08A\x01u\x09Timestamp\x05\x01u\x02Id\x98\x02_0"
+            + b"A\x01u\x07Created\x99\x142024-01-01T00:00:00Z\x01\x01"
+            + b"V\x0e\x05\x01u\x02Id\x98\x02_1"
+            + b"@\x04Item\x04\x01b\x98\x02\"\n\x04\x01a\x98\x01<\x99\x05a & b"
+            + b"\x01\x01"
+        )  # fmt: skip
+        self.timestamp = (
+            b'<u:Timestamp xmlns:u="' + WSU + b'" u:Id="_0">'
+            b"<u:Created>2024-01-01T00:00:00Z</u:Created></u:Timestamp>"
+        )
+        self.body = (
+            b'<s:Body xmlns:s="' + SOAP + b'" xmlns:u="' + WSU + b'" u:Id="_1">'
+            b'<Item a="&lt;" b="&quot;&#xA;">a &amp; b</Item></s:Body>'
+        )
+
+    def test_canonicalize(self):
+        # s is already declared by the envelope in the output
+        body = self.body.replace(b' xmlns:s="' + SOAP + b'"', b"")
+        self.assertEqual(
+            b'<s:Envelope xmlns:s="' + SOAP + b'"><s:Header>'
+            + self.timestamp
+            + b"</s:Header>"
+            + body
+            + b"</s:Envelope>",
+            canonicalize(BytesIO(self.data)),
+        )  # fmt: skip
+
+    def test_digest_ids(self):
+        digests = digest_ids(BytesIO(self.data))
+        self.assertEqual(
+            {
+                "_0": hashlib.sha256(self.timestamp).digest(),
+                "_1": hashlib.sha256(self.body).digest(),
+            },
+            digests,
+        )
+
+    def test_selected_ids(self):
+        digests = digest_ids(BytesIO(self.data), ids=["_1"], algorithm="sha1")
+        self.assertEqual({"_1": hashlib.sha1(self.body).digest()}, digests)
+
+    def test_inclusive_prefixes(self):
+        digests = digest_ids(BytesIO(self.data), ids=["_0"], inclusive_prefixes=["s"])
+        expected = self.timestamp.replace(
+            b"<u:Timestamp ",
+            b'<u:Timestamp xmlns:s="' + SOAP + b'" ',
+        )
+        self.assertEqual(hashlib.sha256(expected).digest(), digests["_0"])
+
+    def test_undeclared_prefix(self):
+        with self.assertRaises(ValueError):
+            canonicalize(BytesIO(b"A\x01x\x01a\x01"))
@@ -0,0 +1,55 @@
+import gzip
+import zlib
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.compression import (
+    DEFLATE,
+    inflate_chunks,
+    iterparse_compressed,
+    parse_compressed,
+)
+
+
+class TestCompressedDocuments(TestCase):
+    def setUp(self):
+        self.itemBytes = b"@\x04item\x99\x05value"
+        self.documentBytes = b"@\x05items" + self.itemBytes * 500 + b"\x01"
+
+        self.gzipStream = BytesIO(gzip.compress(self.documentBytes))
+
+        deflate = zlib.compressobj(wbits=DEFLATE)
+        self.deflateStream = BytesIO(
+            deflate.compress(self.documentBytes) + deflate.flush()
+        )
+
+    def elem_to_str(self, root: ET.Element) -> str:
+        return ET.tostring(root, short_empty_elements=False, encoding="unicode")
+
+    def test_inflate_chunks_bounded(self):
+        chunks = list(inflate_chunks([self.gzipStream.getvalue()], chunk_size=64))
+        self.assertTrue(all(len(chunk) <= 64 for chunk in chunks))
+        self.assertEqual(self.documentBytes, b"".join(chunks))
+
+    def test_parse_gzip(self):
+        root = parse_compressed(self.gzipStream, chunk_size=16)
+        self.assertEqual(500, len(root))
+        self.assertEqual(
+            "<items>" + "<item>value</item>" * 500 + "</items>",
+            self.elem_to_str(root),
+        )
+
+    def test_iterparse_deflate(self):
+        ends = [
+            element.tag
+            for _, element in iterparse_compressed(
+                self.deflateStream, wbits=DEFLATE, chunk_size=16
+            )
+        ]
+        self.assertEqual(["item"] * 500 + ["items"], ends)
+
+    def test_truncated(self):
+        stream = BytesIO(self.gzipStream.getvalue()[:-40])
+        with self.assertRaises((ValueError, zlib.error)):
+            parse_compressed(stream)
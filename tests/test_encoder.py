@@ -0,0 +1,168 @@
+import base64
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx import encode_into, encoded_size
+from pynbfx.encoder import Encoder, encode, int31, int31_size
+from pynbfx.reader import build_tree, feed_events, iter_events
+from pynbfx.records import record_parser
+
+
+def decode(data: bytes) -> ET.Element:
+    return build_tree(iter_events(BytesIO(data)))
+
+
+class TestRecords(TestCase):
+    def setUp(self):
+        self.encoder = Encoder(None)
+
+    def test_int31(self):
+        self.assertEqual(b"\x00", int31(0))
+        self.assertEqual(b"\x7f", int31(0x7F))
+        self.assertEqual(b"\x80\x01", int31(0x80))
+        self.assertEqual(b"\xff\xff\xff\xff\x07", int31(0x7FFFFFFF))
+        with self.assertRaises(ValueError):
+            int31(1 << 31)
+
+    def test_element_records(self):
+        self.assertEqual(b"B\x0e", self.encoder.element_record("Body"))
+        self.assertEqual(b"@\x04user", self.encoder.element_record("user"))
+        self.assertEqual(b"V\x0e", self.encoder.element_record("s:Body"))
+        self.assertEqual(b"^\x04user", self.encoder.element_record("a:user"))
+        self.assertEqual(b"C\x01z\x0e", self.encoder.element_record("z:Body"))
+        self.assertEqual(b"A\x02ad\x05value", self.encoder.element_record("ad:value"))
+
+    def test_attribute_records(self):
+        self.assertEqual(
+            b"\x0b\x01s\x04",
+            self.encoder.attribute_record(
+                "xmlns:s", "http://www.w3.org/2003/05/soap-envelope"
+            ),
+        )
+        self.assertEqual(
+            b"\x08\x05urn:x", self.encoder.attribute_record("xmlns", "urn:x")
+        )
+        self.assertEqual(
+            b"\x1e\x00\x82", self.encoder.attribute_record("s:mustUnderstand", "1")
+        )
+        self.assertEqual(
+            b"\x07\x03xsi\xf8\x06\x98\nxsd:string",
+            self.encoder.attribute_record("xsi:type", "xsd:string"),
+        )
+        self.assertEqual(b"\x04\x01n\x98\x00", self.encoder.attribute_record("n", ""))
+
+    def test_text_record(self):
+        self.assertEqual(b"\x87", self.encoder.text_record("true", end=True))
+        self.assertEqual(b"\x88\xf9", self.encoder.text_record("-7"))
+        self.assertEqual(b"\x98\x03128", self.encoder.text_record(128))
+        self.assertEqual(b"\x98\x03007", self.encoder.text_record("007"))
+        self.assertEqual(b"\xab\x0e", self.encoder.text_record("Body", end=True))
+        self.assertEqual(
+            b"\x9f\x02\x01\x02", self.encoder.text_record(b"\x01\x02", end=True)
+        )
+
+    def test_long_text(self):
+        record = self.encoder.text_record("é" * 200, end=True)
+        self.assertEqual(b"\xbb\x90\x03", record[:3])
+        self.assertEqual(403, len(record))
+        record = self.encoder.text_record(b"\x00" * 300)
+        self.assertEqual(b"\xba\xa0\x06" + "A".encode("utf-16-le"), record[:5])
+        for value in ("é" * 200, "\ufeff" * 300, b"\x00" * 300):
+            self.assertEqual(
+                len(self.encoder.text_record(value)),
+                self.encoder.text_record_size(value),
+            )
+
+    def test_int31_size(self):
+        for value in (0, 0x7F, 0x80, 0x3FFF, 0x4000, 0x7FFFFFFF):
+            self.assertEqual(len(int31(value)), int31_size(value))
+
+
+class TestEncode(TestCase):
+    def setUp(self):
+        self.data = (
+            b"V\x02\x0b\x01s\x04\x0b\x01a\x06V\x08D\n\x1e\x00\x82\x99\x06action"
+            b"D\x12\x99\x0burn:uuid:42\x01V\x0e@\x04user@\x05value\x99\x04jdoe"
+            b"@\x05empty\x01\x01\x01\x01"
+        )
+
+    def test_canonical_document(self):
+        self.assertEqual(self.data, encode(decode(self.data)))
+
+    def test_round_trip(self):
+        root = ET.Element("root", {"xmlns": "urn:x", "n": "12345"})
+        child = ET.SubElement(root, "b:child", {"xml:lang": "en"})
+        child.text = "€" * 300
+        child.tail = "tail"
+        ET.SubElement(root, "zz:last").text = "false"
+
+        self.assertEqual(ET.tostring(root), ET.tostring(decode(encode(root))))
+
+    def test_long_values(self):
+        # UnicodeChars32Text and UnicodeChars32TextWithEndElement records
+        root = ET.Element("root", {"long": "x" * 300, "data": b"\x01" * 70000})
+        root.text = "\ufeff" + "€" * 600
+        data = encode(root)
+        for decoded in (record_parser()(BytesIO(data)).unwrap(), decode(data)):
+            self.assertEqual("x" * 300, decoded.get("long"))
+            self.assertEqual(
+                base64.b64encode(b"\x01" * 70000).decode(), decoded.get("data")
+            )
+            self.assertEqual(root.text, decoded.text)
+
+    def test_tail_ends_element(self):
+        root = ET.Element("p")
+        ET.SubElement(root, "q").tail = "x"
+        self.assertEqual(b"@\x01p@\x01q\x01\x99\x01x", encode(root))
+
+    def test_target(self):
+        out = bytearray()
+        feed_events(iter_events(BytesIO(self.data)), Encoder(out.extend))
+        self.assertEqual(self.data, bytes(out))
+
+    def test_comment(self):
+        root = ET.Element("a")
+        root.append(ET.Comment("no"))
+        with self.assertRaises(ValueError):
+            encode(root)
+
+
+class TestEncodedSize(TestCase):
+    def setUp(self):
+        self.root = ET.Element("s:Envelope", {"xmlns:s": "urn:x", "xmlns": "urn:y"})
+        header = ET.SubElement(self.root, "Header", {"b:long": "é" * 300})
+        header.text = "a" * 600
+        ET.SubElement(header, "To", {"s:mustUnderstand": "1", "n": 12345})
+        ET.SubElement(header, "Action").text = "€" * 200
+        body = ET.SubElement(self.root, "zz:Body", {"zz:data": b"\x00" * 70000})
+        body.text = b"\xff" * 600
+        ET.SubElement(body, "Value").text = "-7"
+        ET.SubElement(body, "Flag").tail = "true"
+        ET.SubElement(body, "Empty").text = ""
+        ET.SubElement(body, "Bytes").text = b""
+
+    def test_size(self):
+        self.assertEqual(len(encode(self.root)), encoded_size(self.root))
+        for element in self.root.iter():
+            self.assertEqual(len(encode(element)), encoded_size(element))
+
+    def test_encode_into(self):
+        size = encoded_size(self.root)
+        buffer = bytearray(b"\xee" * (size + 8))
+        self.assertEqual(size, encode_into(self.root, buffer, 4))
+        self.assertEqual(encode(self.root), buffer[4 : 4 + size])
+        self.assertEqual(b"\xee" * 4, buffer[:4])
+        self.assertEqual(b"\xee" * 4, buffer[4 + size :])
+
+    def test_buffer_too_small(self):
+        buffer = bytearray(encoded_size(self.root))
+        with self.assertRaises(ValueError):
+            encode_into(self.root, buffer, 1)
+        self.assertEqual(len(buffer), encode_into(self.root, memoryview(buffer)))
+
+    def test_comment(self):
+        root = ET.Element("a")
+        root.append(ET.Comment("no"))
+        with self.assertRaises(ValueError):
+            encoded_size(root)
@@ -0,0 +1,119 @@
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.framing import (
+    BINARY_SESSION_ENCODING,
+    iter_envelope_elements,
+    iter_envelopes,
+    nmf_record_parser,
+    string_table_parser,
+)
+
+
+class TestNmfRecordParser(TestCase):
+    def setUp(self):
+        self.versionStream = BytesIO(b"\x00\x01\x00")
+        self.viaStream = BytesIO(b"\x02\x0enet.tcp://dc1/")
+        self.sizedEnvelopeStream = BytesIO(b"\x06\x03ABC")
+        self.unsizedEnvelopeStream = BytesIO(b"\x05\x02AB\x01C\x00")
+        self.stringTableStream = BytesIO(b"\x08\x03abc\x03def")
+
+    def test_version_record(self):
+        result = nmf_record_parser()(self.versionStream)
+        self.assertTrue(result.is_ok(), result)
+        self.assertEqual((0x00, [1, 0]), result.unwrap())
+
+    def test_via_record(self):
+        result = nmf_record_parser()(self.viaStream)
+        self.assertTrue(result.is_ok(), result)
+        self.assertEqual((0x02, "net.tcp://dc1/"), result.unwrap())
+
+    def test_sized_envelope_record(self):
+        result = nmf_record_parser()(self.sizedEnvelopeStream)
+        self.assertTrue(result.is_ok(), result)
+        record_type, payload = result.unwrap()
+        self.assertEqual(0x06, record_type)
+        self.assertIsInstance(payload, memoryview)
+        self.assertEqual(b"ABC", payload.tobytes())
+
+    def test_unsized_envelope_record(self):
+        result = nmf_record_parser()(self.unsizedEnvelopeStream)
+        self.assertTrue(result.is_ok(), result)
+        self.assertEqual(b"ABC", result.unwrap()[1].tobytes())
+        self.assertEqual(7, self.unsizedEnvelopeStream.tell())
+
+    def test_truncated_sized_envelope_record(self):
+        result = nmf_record_parser()(BytesIO(b"\x06\x05ABC"))
+        self.assertTrue(result.is_err())
+
+    def test_string_table(self):
+        result = string_table_parser()(self.stringTableStream)
+        self.assertTrue(result.is_ok(), result)
+        self.assertEqual(["abc", "def"], result.unwrap())
+
+
+class TestEnvelopeStream(TestCase):
+    def setUp(self):
+        self.bodyNbfx = b"V\x02\x0b\x01a\x06\x0b\x01s\x04V\x0e@\tInventory\x81\x01\x01"
+        self.bodyString = (
+            '<s:Envelope xmlns:a="http://www.w3.org/2005/08/addressing" '
+            'xmlns:s="http://www.w3.org/2003/05/soap-envelope">'
+            "<s:Body><Inventory>0</Inventory></s:Body></s:Envelope>"
+        )
+        self.preamble = (
+            b"\x00\x01\x00\x01\x02\x02\x0enet.tcp://dc1/\x03"
+            + bytes([BINARY_SESSION_ENCODING])
+            + b"\x0c"
+        )
+
+        payload = b"\x04\x03abc" + self.bodyNbfx
+        self.sessionStream = BytesIO(
+            self.preamble
+            + b"\x06"
+            + bytes([len(payload)])
+            + payload
+            + b"\x06"
+            + bytes([len(payload)])
+            + payload
+            + b"\x07"
+        )
+        self.unsizedSessionStream = BytesIO(
+            self.preamble
+            + b"\x05\x01\x00"
+            + bytes([len(self.bodyNbfx)])
+            + self.bodyNbfx
+            + b"\x00\x07"
+        )
+
+    def elem_to_str(self, root: ET.Element) -> str:
+        return ET.tostring(root, short_empty_elements=False, encoding="unicode")
+
+    def test_envelope_views(self):
+        envelopes = list(iter_envelopes(self.sessionStream))
+        self.assertEqual(2, len(envelopes))
+        for envelope in envelopes:
+            self.assertEqual(BINARY_SESSION_ENCODING, envelope.encoding)
+            self.assertEqual(b"\x04\x03abc" + self.bodyNbfx, envelope.payload.tobytes())
+            self.assertEqual(
+                envelope.payload.tobytes(),
+                self.sessionStream.getvalue()[
+                    envelope.offset : envelope.offset + len(envelope.payload)
+                ],
+            )
+
+    def test_envelope_elements(self):
+        elements = list(iter_envelope_elements(self.sessionStream))
+        self.assertEqual(2, len(elements))
+        for element in elements:
+            self.assertEqual(self.bodyString, self.elem_to_str(element))
+
+    def test_unsized_envelope_elements(self):
+        elements = list(iter_envelope_elements(self.unsizedSessionStream))
+        self.assertEqual(1, len(elements))
+        self.assertEqual(self.bodyString, self.elem_to_str(elements[0]))
+
+    def test_fault(self):
+        stream = BytesIO(self.preamble + b"\x08\x05fault")
+        with self.assertRaises(ValueError):
+            list(iter_envelopes(stream))
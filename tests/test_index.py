@@ -0,0 +1,60 @@
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.index import StructuralIndex, index_parser
+
+
+class TestIndexParser(TestCase):
+    def setUp(self):
+        self.data = (
+            b"V\x02\x0b\x01a\x06\x0b\x01s\x04V\x08D\n\x1e\x00\x82\x99\x06action\x01"
+            b"V\x0eA\x04wsen\x05Items@\x04user@\x05value\x99\x04jdoe\x01"
+            b"@\x04user@\x05value\x99\x06asmith\x01\x01\x01\x01"
+        )
+        self.stream = BytesIO(self.data)
+        self.index = index_parser()(self.stream).unwrap()
+
+    def test_elements(self):
+        self.assertEqual(9, len(self.index))
+        self.assertEqual("s:Envelope", self.index.tag(0))
+        self.assertEqual(0, self.index.starts[0])
+        self.assertEqual(len(self.data), self.index.ends[0])
+        self.assertEqual([0, 1, 2, 1, 2, 3, 4, 3, 4], list(self.index.depths))
+        self.assertEqual(len(self.data), self.stream.tell())
+
+    def test_children(self):
+        items = self.index.find("wsen:Items")
+        self.assertEqual(
+            ["user", "user"], [self.index.tag(i) for i in self.index.children(items)]
+        )
+        self.assertEqual([1, 3], list(self.index.children(0)))
+        with self.assertRaises(IndexError):
+            self.index.child(items, 2)
+
+    def test_decode(self):
+        user = self.index.child(self.index.find("wsen:Items"), 1)
+        element = self.index.decode(self.stream, user)
+        self.assertEqual(
+            "<user><value>asmith</value></user>",
+            ET.tostring(element, encoding="unicode"),
+        )
+
+    def test_find_missing(self):
+        with self.assertRaises(KeyError):
+            self.index.find("missing")
+
+    def test_round_trip(self):
+        loaded = StructuralIndex.from_bytes(self.index.to_bytes())
+        self.assertEqual(list(self.index.starts), list(loaded.starts))
+        self.assertEqual(list(self.index.ends), list(loaded.ends))
+        self.assertEqual(self.index.names, loaded.names)
+        self.assertEqual(8, loaded.find("value", 7))
+
+    def test_truncated(self):
+        result = index_parser()(BytesIO(self.data[:30]))
+        self.assertTrue(result.is_err())
+
+    def test_unclosed_elements(self):
+        index = index_parser()(BytesIO(b"@\x04user@\x05value\x98\x01a")).unwrap()
+        self.assertEqual([16, 16], list(index.ends))
@@ -0,0 +1,64 @@
+from io import BytesIO
+from unittest import TestCase
+
+from pynbfx.lazy import parse_lazy
+from pynbfx.reader import build_tree, iter_events
+
+
+class TestLazyElement(TestCase):
+    def setUp(self):
+        self.data = (
+            b"V\x02\x0b\x01a\x06\x0b\x01s\x04V\x08D\n\x1e\x00\x82\x99\x06action\x01"
+            b"V\x0e@\x04user\x04\x02id\x89\x07@\x05value\x99\x04jdoe\x98\x04tail"
+            b"@\x05value\x98\x02as\x99\x04mith\x01\x01\x01"
+        )
+        self.root = parse_lazy(BytesIO(self.data))
+
+    def test_tag_and_attributes(self):
+        self.assertEqual("s:Envelope", self.root.tag)
+        self.assertEqual(
+            "http://www.w3.org/2003/05/soap-envelope", self.root.get("xmlns:s")
+        )
+        self.assertEqual(["s:Header", "s:Body"], [child.tag for child in self.root])
+
+    def test_find(self):
+        action = self.root.find("s:Header/a:Action")
+        self.assertEqual("action", action.text)
+        self.assertEqual({"s:mustUnderstand": "1"}, action.attrib)
+        self.assertEqual("7", self.root.find("*/user").get("id"))
+        self.assertIsNone(self.root.find("s:Body/missing"))
+
+    def test_findall(self):
+        values = [value.text for value in self.root.findall(".//value")]
+        self.assertEqual(["jdoe", "asmith"], values)
+        self.assertEqual("tail", self.root.find("s:Body/user/value").tail)
+        self.assertEqual("jdoe", self.root.findtext("s:Body/user/value"))
+
+    def test_tail(self):
+        value = self.root.find("s:Body/user/value")
+        self.assertEqual("tail", value.tail)
+        self.assertEqual("asmith", self.root.find("s:Body/user")[1].text)
+        self.assertIsNone(self.root.find("s:Body/user").tail)
+        self.assertIsNone(self.root.tail)
+
+    def test_indexing(self):
+        user = self.root[1][0]
+        self.assertEqual(2, len(user))
+        self.assertEqual("asmith", user[-1].text)
+        with self.assertRaises(IndexError):
+            user[2]
+
+    def test_matches_tree(self):
+        expected = build_tree(iter_events(BytesIO(self.data)))
+        self.assertEqual(
+            [element.tag for element in expected.iter()],
+            [element.tag for element in self.root.iter()],
+        )
+        self.assertEqual(
+            [(element.text, element.tail) for element in expected.iter("value")],
+            [(element.text, element.tail) for element in self.root.iter("value")],
+        )
+
+    def test_no_element(self):
+        with self.assertRaises(ValueError):
+            parse_lazy(BytesIO(b"\x99\x01a"))
@@ -0,0 +1,98 @@
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.encoder import encode
+from pynbfx.framing import BINARY_SESSION_ENCODING, iter_envelopes, string_table_parser
+from pynbfx.minimize import minimize, minimize_bytes, minimize_session
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.session import Session
+
+
+def decode(data: bytes) -> bytes:
+    return ET.tostring(build_tree(iter_events(BytesIO(data))))
+
+
+def decode_session(data: bytes) -> list[bytes]:
+    documents = []
+    for envelope in iter_envelopes(BytesIO(data)):
+        payload = BytesIO(envelope.payload)
+        string_table_parser()(payload)
+        documents.append(decode(payload.read()))
+    return documents
+
+
+class TestMinimize(TestCase):
+    def setUp(self):
+        # inline names and namespaces, Chars32Text and Chars16Text, BoolText,
+        # empty text and text records followed by end records
+        self.data = (
+            b"A\x01s\x08Envelope"
+            b"\x09\x01s\x27http://www.w3.org/2003/05/soap-envelope"
+            b"@\x04Body\x04\x01n\x9c\x04true"
+            b"@\x05value\x9a\x02-7\x01\x98\x00\x01"
+            b"@\x01x\xb4\x00\x01"
+            b"@\x01y\x98\x03abc\x01\x01"
+        )
+
+    def test_shortest_form(self):
+        self.assertEqual(
+            b"V\x02\x0b\x01s\x04B\x0e\x04\x01n\x86"
+            b"@\x05value\x89\xf9\x01@\x01x\x85@\x01y\x99\x03abc\x01",
+            minimize_bytes(self.data),
+        )
+
+    def test_report(self):
+        out = bytearray()
+        report = minimize(BytesIO(self.data), out.extend)
+        self.assertEqual(len(self.data), report.bytes_in)
+        self.assertEqual(len(out), report.bytes_out)
+        self.assertEqual(len(self.data) - len(out), report.saved)
+        self.assertEqual(14, report.records)
+
+    def test_same_document(self):
+        self.assertEqual(decode(self.data), decode(minimize_bytes(self.data)))
+
+    def test_encoded_documents(self):
+        root = ET.Element("root", {"xmlns": "urn:x", "n": "12345"})
+        child = ET.SubElement(root, "b:child", {"xml:lang": "en"})
+        child.text = "€" * 300
+        child.tail = "tail"
+        ET.SubElement(root, "Body").text = b"\x00\x01"
+        data = encode(root) * 2
+        self.assertEqual(data, minimize_bytes(data))
+
+    def test_copied_records(self):
+        # Bytes8Text, UniqueIdText and session strings are kept as they are
+        data = (
+            b"@\x01p\x9f\x02\x00\x01"
+            b"@\x01q\xad" + bytes(range(16)) + b"B\x01\x06\x03\x98\x01x\x99\x01y"
+        )
+        self.assertEqual(data, minimize_bytes(data))
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            minimize_bytes(b"@\x05val")
+        with self.assertRaises(ValueError):
+            minimize_bytes(b"\x05")
+
+    def test_session(self):
+        session = Session()
+        root = ET.Element("root", {"id": "x"})
+        ET.SubElement(root, "child").text = "value"
+        payloads = [b"\x00" + self.data, session.encode(root)]
+        data = (
+            b"\x00\x01\x00\x01\x02\x02\x0enet.tcp://dc1/\x03"
+            + bytes([BINARY_SESSION_ENCODING])
+            + b"\x0c"
+            + b"".join(b"\x06" + bytes([len(p)]) + p for p in payloads)
+            + b"\x07"
+        )
+        out = bytearray()
+        report = minimize_session(BytesIO(data), out.extend)
+
+        self.assertEqual(len(data) - report.saved, len(out))
+        self.assertGreater(report.saved, 0)
+        self.assertEqual(data[:23], out[:23])
+        self.assertEqual(b"\x07", out[-1:])
+        self.assertEqual(decode_session(data), decode_session(bytes(out)))
@@ -0,0 +1,39 @@
+from io import BytesIO
+from unittest import TestCase
+
+from pynbfx.nodes import Node, node_factory
+from pynbfx.records import record_parser
+
+
+class TestNodeFactory(TestCase):
+    def setUp(self):
+        self.data = (
+            b"V\x02\x0b\x01a\x06\x0b\x01s\x04V\x08D\n\x1e\x00\x82\x99\x06action\x01"
+            b"V\x0e@\x04user\x04\x02id\x89\x07@\x05value\x99\x04jdoe\x01"
+            b"@\x04user\x04\x02id\x89\x08@\x05value\x99\x06asmith\x01\x01\x01"
+        )
+
+    def test_same_tree_as_element(self):
+        elements = record_parser()(BytesIO(self.data)).unwrap()
+        nodes = record_parser(node_factory())(BytesIO(self.data)).unwrap()
+        self.assertIsInstance(nodes, Node)
+        self.assertEqual(
+            [(e.tag, e.attrib, e.text) for e in elements.iter()],
+            [(n.tag, n.attrib, n.text) for n in nodes.iter()],
+        )
+
+    def test_shared_names(self):
+        root = record_parser(node_factory())(BytesIO(self.data)).unwrap()
+        first, second = root.find("s:Body").findall("user")
+        self.assertIs(first.names, second.names)
+        self.assertIs(first.tag, second.tag)
+        self.assertEqual([7, 8], [first.get("id"), second.get("id")])
+        self.assertIsNone(first.get("missing"))
+
+    def test_read_api(self):
+        root = record_parser(node_factory())(BytesIO(self.data)).unwrap()
+        self.assertEqual(2, len(root))
+        self.assertEqual("s:Header", root[0].tag)
+        self.assertEqual([("s:mustUnderstand", "1")], root[0][0].items())
+        self.assertEqual("jdoe", root[1][0].findtext("value"))
+        self.assertEqual(0, len(root[1][0][0]))
@@ -0,0 +1,60 @@
+from io import BytesIO
+from unittest import TestCase
+
+from pynbfx import parser
+from pynbfx.combinators import byte_parser
+from pynbfx.profiling import ParserProfiler, profile
+from pynbfx.records import record_parser
+
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        self.data = b"@\x04user@\x05value\x99\x04jdoe\x01"
+
+    def test_calls(self):
+        with profile() as profiler:
+            record_parser()(BytesIO(self.data))
+        self.assertIsNone(parser._profiler)
+
+        stats = profiler.stats["parse_element_fn"]
+        self.assertEqual(2, stats.calls)
+        self.assertGreaterEqual(stats.cumulative_ns, stats.self_ns)
+        # the outermost call holds the time of the recursive ones
+        self.assertGreaterEqual(
+            stats.cumulative_ns, profiler.stats["byte_parser_fn"].cumulative_ns
+        )
+        self.assertEqual(
+            sum(profiler.stacks.values()),
+            sum(stats.self_ns for stats in profiler.stats.values()),
+        )
+
+    def test_batch(self):
+        profiler = ParserProfiler()
+        for _ in range(3):
+            with profile(profiler):
+                byte_parser()(BytesIO(b"\x01"))
+        byte_parser()(BytesIO(b"\x01"))
+        self.assertEqual(3, profiler.stats["byte_parser_fn"].calls)
+
+    def test_exceptions(self):
+        def failing_fn(stream):
+            raise NotImplementedError
+
+        with profile() as profiler:
+            with self.assertRaises(NotImplementedError):
+                parser.Parser(failing_fn)(BytesIO(b""))
+        self.assertEqual(1, profiler.stats["failing_fn"].calls)
+        self.assertEqual([], profiler._calls)
+
+    def test_output(self):
+        with profile() as profiler:
+            record_parser()(BytesIO(self.data))
+        table = profiler.table(limit=3)
+        self.assertEqual(4, len(table.splitlines()))
+
+        lines = profiler.collapsed().splitlines()
+        self.assertEqual("parse_record_fn", lines[0].split()[0])
+        for line in lines:
+            stack, ns = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("parse_record_fn"))
+            int(ns)
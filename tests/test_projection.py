@@ -0,0 +1,114 @@
+from io import BytesIO
+from unittest import TestCase
+
+from pynbfx.projection import Path, projection_parser, skip_to_element
+from pynbfx.records import (
+    skip_element_parser,
+    skip_record_parser,
+    skip_text,
+    text_parser,
+)
+
+
+class TestPath(TestCase):
+    def test_relative_path(self):
+        path = Path("addata:user/ad:value")
+        self.assertTrue(path.matches(["s:Body", "addata:user", "ad:value"]))
+        self.assertFalse(path.matches(["addata:user", "ad:other"]))
+        self.assertTrue(path.may_match_below(["s:Body", "addata:user"]))
+        self.assertFalse(path.may_match_below(["s:Envelope"]))
+        self.assertFalse(path.may_match_below(["addata:user", "ad:other"]))
+        self.assertTrue(Path("*/ad:value").may_match_below(["s:Envelope"]))
+
+    def test_anchored_path(self):
+        path = Path("/s:Envelope/*/a:Action")
+        self.assertTrue(path.matches(["s:Envelope", "s:Header", "a:Action"]))
+        self.assertFalse(path.matches(["x", "s:Envelope", "s:Header", "a:Action"]))
+        self.assertTrue(path.may_match_below(["s:Envelope", "s:Body"]))
+        self.assertFalse(path.may_match_below(["s:Other"]))
+
+
+class TestProjectionParser(TestCase):
+    def setUp(self):
+        self.envelope = (
+            b"V\x02\x0b\x01a\x06\x0b\x01s\x04V\x08D\n\x1e\x00\x82\x99\x06action\x01"
+            b"V\x0e@\x04user@\x05value\x99\x04jdoe@\x05value\x99\x06asmith\x01"
+            b"@\x05value\x81\x01\x01"
+        )
+
+    def test_relative_path(self):
+        result = projection_parser("user/value")(BytesIO(self.envelope))
+        self.assertTrue(result.is_ok(), result)
+        values = [e.text for e in result.unwrap()["user/value"]]
+        self.assertEqual(["jdoe", "asmith"], values)
+
+    def test_anchored_path(self):
+        path = "/s:Envelope/s:Header/a:Action"
+        result = projection_parser(path)(BytesIO(self.envelope))
+        self.assertTrue(result.is_ok(), result)
+        (action,) = result.unwrap()[path]
+        self.assertEqual("action", action.text)
+        self.assertEqual({"s:mustUnderstand": "1"}, action.attrib)
+
+    def test_wildcard_path(self):
+        result = projection_parser("*/value")(BytesIO(self.envelope))
+        self.assertTrue(result.is_ok(), result)
+        values = [e.text for e in result.unwrap()["*/value"]]
+        self.assertEqual(["jdoe", "asmith", "0"], values)
+
+    def test_skipped_subtrees(self):
+        # value elements outside of user, user nested in a skipped element
+        data = (
+            b"@\x04root@\x05value\x99\x01a@\x04item@\x04user@\x05value\x99\x01b"
+            b"\x01@\x05value\x99\x01c\x01\x01"
+        )
+        result = projection_parser("user/value")(BytesIO(data))
+        self.assertTrue(result.is_ok(), result)
+        self.assertEqual(["b"], [e.text for e in result.unwrap()["user/value"]])
+
+    def test_stops_after_root(self):
+        stream = BytesIO(self.envelope + b"@\x05value\x81")
+        projection_parser("value")(stream)
+        self.assertEqual(len(self.envelope), stream.tell())
+
+    def test_truncated(self):
+        result = projection_parser("user/value")(BytesIO(self.envelope[:40]))
+        self.assertTrue(result.is_err())
+
+
+class TestSkipParsers(TestCase):
+    def test_skip_element(self):
+        stream = BytesIO(b"@\x04user\x04\x01a\x98\x01c@\x05value\x99\x04jdoe\x01\x81")
+        result = skip_element_parser()(stream)
+        self.assertTrue(result.is_ok(), result)
+        self.assertEqual(b"\x81", stream.read())
+
+    def test_skip_to_element(self):
+        stream = BytesIO(b"\x98\x01x@\x01a\x01@\x01b@\x04user\x01\x01\x01\x81")
+        self.assertEqual(2, skip_to_element(stream, {"user"}))
+        self.assertEqual(b"@\x04user", stream.read(6))
+        stream.seek(0)
+        self.assertEqual(0, skip_to_element(stream, {"other"}))
+        self.assertEqual(b"\x81", stream.read())
+
+    def test_skip_records(self):
+        stream = BytesIO(b"@\x05value\xa0\x03\x00\x00\x00\x99\x04jdoe")
+        record_types = []
+        while stream.tell() < len(stream.getvalue()):
+            result = skip_record_parser()(stream)
+            self.assertTrue(result.is_ok(), result)
+            record_types.append(result.unwrap())
+        self.assertEqual([0x40, 0xA0, 0x99], record_types)
+
+    def test_skip_matches_decode(self):
+        # keys from 0x80 take two bytes
+        for data in (b"\xbc\x00\x80\x01", b"\xaa\x80\x01", b"\x9a\x01x"):
+            decoded = BytesIO(data)
+            self.assertTrue(text_parser()(decoded).is_ok())
+            skipped = BytesIO(data[1:])
+            self.assertTrue(skip_text(skipped, data[0]))
+            self.assertEqual(decoded.tell(), skipped.tell() + 1)
+
+    def test_skip_truncated_text(self):
+        result = skip_record_parser()(BytesIO(b"\x99\x04jd"))
+        self.assertTrue(result.is_err())
@@ -0,0 +1,162 @@
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.reader import PullParser, iter_events, target_parser
+
+
+class TestIterEvents(TestCase):
+    def setUp(self):
+        self.endElementsStream = BytesIO(
+            b"V\x02\x0b\x01a\x06\x0b\x01s\x04V\x08D\n\x1e\x00\x82\x99\x06action\x01V\x0e@\tInventory\x81\x01\x01"
+        )
+        self.endElementsEvents = [
+            (
+                "start",
+                (
+                    "s:Envelope",
+                    {
+                        "xmlns:a": "http://www.w3.org/2005/08/addressing",
+                        "xmlns:s": "http://www.w3.org/2003/05/soap-envelope",
+                    },
+                ),
+            ),
+            ("start", ("s:Header", {})),
+            ("start", ("a:Action", {"s:mustUnderstand": "1"})),
+            ("data", "action"),
+            ("end", "a:Action"),
+            ("end", "s:Header"),
+            ("start", ("s:Body", {})),
+            ("start", ("Inventory", {})),
+            ("data", "0"),
+            ("end", "Inventory"),
+            ("end", "s:Body"),
+            ("end", "s:Envelope"),
+        ]
+
+        self.intTextStream = BytesIO(b"@\x04test\x89\x05")
+
+    def test_events(self):
+        events = list(iter_events(self.endElementsStream))
+        self.assertEqual(self.endElementsEvents, events)
+        self.assertEqual(
+            len(self.endElementsStream.getvalue()), self.endElementsStream.tell()
+        )
+
+    def test_decoded_text_as_string(self):
+        events = list(iter_events(self.intTextStream))
+        self.assertEqual(("data", "5"), events[1])
+
+    def test_invalid_record(self):
+        with self.assertRaises(ValueError):
+            list(iter_events(BytesIO(b"@\x04test\x7f")))
+
+
+class TestPullParser(TestCase):
+    def setUp(self):
+        self.endElementsBytes = (
+            b"V\x02\x0b\x01a\x06\x0b\x01s\x04V\x08D\n\x1e\x00\x82\x99\x06action"
+            b"\x01V\x0e@\tInventory\x81\x01\x01"
+        )
+        self.endElementsString = (
+            '<s:Envelope xmlns:a="http://www.w3.org/2005/08/addressing"'
+            ' xmlns:s="http://www.w3.org/2003/05/soap-envelope">'
+            '<s:Header><a:Action s:mustUnderstand="1">action</a:Action></s:Header>'
+            "<s:Body><Inventory>0</Inventory></s:Body></s:Envelope>"
+        )
+
+        # a base64 value split over a Bytes8Text and a Bytes8TextWithEndElement
+        self.splitBytesBytes = b"@\x05value\x9e\x03\x01\x02\x03\x9f\x01\x04"
+        self.splitBytesString = "<value>AQIDBA==</value>"
+
+    def elem_to_str(self, root: ET.Element) -> str:
+        return ET.tostring(root, short_empty_elements=False, encoding="unicode")
+
+    def test_whole_document(self):
+        parser = PullParser()
+        parser.feed(self.endElementsBytes)
+        self.assertEqual(self.endElementsString, self.elem_to_str(parser.close()))
+
+    def test_byte_at_a_time(self):
+        parser = PullParser(events=("start", "end"))
+        events = []
+        for i in range(len(self.endElementsBytes)):
+            parser.feed(self.endElementsBytes[i : i + 1])
+            events.extend((event, elem.tag) for event, elem in parser.read_events())
+        root = parser.close()
+        events.extend((event, elem.tag) for event, elem in parser.read_events())
+
+        self.assertEqual(self.endElementsString, self.elem_to_str(root))
+        self.assertEqual(("start", "s:Envelope"), events[0])
+        self.assertEqual(("end", "s:Envelope"), events[-1])
+        self.assertEqual(10, len(events))
+
+    def test_attributes_split_from_element(self):
+        parser = PullParser(events=("start",))
+        parser.feed(b"@\x04test")
+        self.assertEqual([], list(parser.read_events()))
+        parser.feed(b"\x04\x01a\x86\x01")
+        [(_, element)] = parser.read_events()
+        self.assertEqual({"a": "true"}, element.attrib)
+
+    def test_split_text_records(self):
+        parser = PullParser()
+        parser.feed(self.splitBytesBytes)
+        self.assertEqual(self.splitBytesString, self.elem_to_str(parser.close()))
+
+    def test_incomplete_document(self):
+        parser = PullParser()
+        parser.feed(self.endElementsBytes[:-3])
+        with self.assertRaises(ValueError):
+            parser.close()
+
+
+class UserTarget:
+    """Collects the name and id of each user without building a tree."""
+
+    def __init__(self):
+        self.users = []
+        self.tags = []
+
+    def start(self, tag, attrib):
+        self.tags.append(tag)
+        if tag == "user":
+            self.users.append({"id": attrib["id"], "name": ""})
+
+    def data(self, text):
+        if self.tags[-1] == "name":
+            self.users[-1]["name"] += text
+
+    def end(self, tag):
+        self.tags.pop()
+
+    def close(self):
+        return self.users
+
+
+class TestTargetParser(TestCase):
+    def setUp(self):
+        self.usersStream = BytesIO(
+            b"@\x05users@\x04user\x04\x02id\x89\x07@\x04name\x98\x02jd\x99\x02oe\x01"
+            b"@\x04user\x04\x02id\x89\x08@\x04name\x99\x06asmith\x01\x01"
+        )
+
+    def test_target(self):
+        result = target_parser(UserTarget())(self.usersStream)
+        self.assertTrue(result.is_ok(), result)
+        self.assertEqual(
+            [{"id": "7", "name": "jdoe"}, {"id": "8", "name": "asmith"}],
+            result.unwrap(),
+        )
+
+    def test_tree_builder_target(self):
+        result = target_parser(ET.TreeBuilder())(self.usersStream)
+        self.assertEqual(
+            '<users><user id="7"><name>jdoe</name></user>'
+            '<user id="8"><name>asmith</name></user></users>',
+            ET.tostring(result.unwrap(), encoding="unicode"),
+        )
+
+    def test_invalid_record(self):
+        result = target_parser(ET.TreeBuilder())(BytesIO(b"@\x04user\x02"))
+        self.assertTrue(result.is_err())
@@ -0,0 +1,119 @@
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.cli import main
+from pynbfx.encoder import encode
+from pynbfx.framing import BINARY_SESSION_ENCODING
+from pynbfx.records import record_event_parser
+from pynbfx.replay import (
+    TRUNCATED,
+    ReplayStats,
+    bucket_label,
+    percentile,
+    replay,
+    replay_message,
+    size_bucket,
+)
+from pynbfx.session import Session
+
+
+def message(i: int) -> ET.Element:
+    root = ET.Element(
+        "s:Envelope", {"xmlns:s": "http://www.w3.org/2003/05/soap-envelope"}
+    )
+    body = ET.SubElement(root, "s:Body")
+    ET.SubElement(body, "user").text = "x" * i
+    return root
+
+
+class TestReplayStats(TestCase):
+    def test_buckets(self):
+        self.assertEqual(0, size_bucket(100))
+        self.assertEqual(1, size_bucket(1024))
+        self.assertEqual(6, size_bucket(1 << 30))
+        self.assertEqual("< 1K", bucket_label(0))
+        self.assertEqual("1K-4K", bucket_label(1))
+        self.assertEqual(">= 1M", bucket_label(6))
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, percentile(values, 50))
+        self.assertEqual(99, percentile(values, 99))
+        self.assertEqual(7, percentile([7], 90))
+
+    def test_merge(self):
+        stats = ReplayStats()
+        other = ReplayStats(files=1)
+        other.add(100, 2000)
+        other.failures["0x90"] += 1
+        stats.merge(other)
+        stats.merge(other)
+        self.assertEqual(2, stats.files)
+        self.assertEqual(2, stats.messages)
+        self.assertEqual(
+            {"< 1K": {"messages": 2, "p50": 2, "p90": 2, "p99": 2}}, stats.percentiles()
+        )
+        self.assertEqual(2, stats.failures["0x90"])
+
+
+class TestReplay(TestCase):
+    def test_message(self):
+        stats = ReplayStats()
+        data = encode(message(10))
+        self.assertTrue(replay_message(BytesIO(data), stats, record_event_parser()))
+        self.assertEqual(1, stats.messages)
+        self.assertEqual(len(data), stats.bytes)
+
+    def test_failures(self):
+        parser = record_event_parser()
+        stats = ReplayStats()
+        # FloatText is not implemented
+        stream = BytesIO(b"@\x01a\x90\x00\x00\x00\x00\x01")
+        self.assertFalse(replay_message(stream, stats, parser))
+        self.assertEqual(3, stream.tell())
+        self.assertFalse(replay_message(BytesIO(b"@\x01a"), stats, parser))
+        self.assertEqual({"0x90": 1, TRUNCATED: 1}, dict(stats.failures))
+
+    def test_directory(self):
+        session = Session()
+        envelopes = b"".join(
+            b"\x06" + bytes([len(payload)]) + payload
+            for payload in (session.encode(message(i)) for i in range(3))
+        )
+        preamble = (
+            b"\x00\x01\x00\x01\x02\x02\x0enet.tcp://dc1/\x03"
+            + bytes([BINARY_SESSION_ENCODING])
+            + b"\x0c"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            (path / "session.bin").write_bytes(preamble + envelopes + b"\x07")
+            (path / "messages").mkdir()
+            (path / "messages" / "a.nbfx").write_bytes(
+                encode(message(2000)) + encode(message(1)) + b"\x98"
+            )
+            stats, seconds = replay([path], workers=1)
+            parallel, _ = replay([path], workers=2)
+
+        self.assertEqual(2, stats.files)
+        self.assertEqual(5, stats.messages)
+        self.assertEqual({"0x98": 1}, dict(stats.failures))
+        self.assertEqual(
+            {"< 1K": 4, "1K-4K": 1},
+            {
+                label: bucket["messages"]
+                for label, bucket in stats.percentiles().items()
+            },
+        )
+        self.assertEqual(stats.bytes, parallel.bytes)
+        self.assertIn("messages/s", stats.format(seconds))
+
+    def test_cli(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            (path / "a.nbfx").write_bytes(encode(message(1)))
+            main(["bench", str(path), "--output", str(path / "stats.json")])
+            self.assertTrue((path / "stats.json").exists())
@@ -0,0 +1,111 @@
+import re
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.encoder import encode
+from pynbfx.framing import string_table_parser
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.session import Session
+
+PLACEHOLDER = re.compile(r"\[\[VALUE_0x([0-9A-F]+)\]\]")
+
+
+class SessionDecoder:
+    """Decodes payloads, replacing the placeholders of session strings."""
+
+    def __init__(self):
+        self.strings: list[str] = []
+
+    def resolve(self, text: str | None) -> str | None:
+        if text is None:
+            return None
+        return PLACEHOLDER.sub(lambda m: self.strings[int(m[1], 16) // 2], text)
+
+    def decode(self, payload: bytes) -> ET.Element:
+        stream = BytesIO(payload)
+        self.strings += string_table_parser()(stream).unwrap()
+        root = build_tree(iter_events(stream))
+        for element in root.iter():
+            element.tag = self.resolve(element.tag)
+            element.text = self.resolve(element.text)
+            element.tail = self.resolve(element.tail)
+            attrib = {
+                self.resolve(k): self.resolve(v) for k, v in element.attrib.items()
+            }
+            element.attrib.clear()
+            element.attrib.update(attrib)
+        return root
+
+
+def request(message_id: str) -> ET.Element:
+    root = ET.Element(
+        "s:Envelope", {"xmlns:s": "http://www.w3.org/2003/05/soap-envelope"}
+    )
+    body = ET.SubElement(root, "s:Body")
+    get = ET.SubElement(body, "da:BaseObjectSearchRequest", {"xmlns:da": "urn:dirs"})
+    ET.SubElement(get, "da:AttributeType").text = "addata:objectSid"
+    ET.SubElement(get, "da:MessageId").text = message_id
+    return root
+
+
+class TestSession(TestCase):
+    def test_string_table(self):
+        session = Session()
+        payload = session.encode(request("1"))
+        strings = string_table_parser()(BytesIO(payload)).unwrap()
+        self.assertEqual(
+            ["BaseObjectSearchRequest", "urn:dirs", "AttributeType", "MessageId"],
+            strings,
+        )
+        self.assertEqual(7, session.ids["MessageId"])
+
+    def test_later_payloads(self):
+        session = Session()
+        decoder = SessionDecoder()
+        first = session.encode(request("urn:uuid:1"))
+        second = session.encode(request("urn:uuid:2"))
+        third = session.encode(request("urn:uuid:3"))
+
+        # only the repeated value is added to the second StringTable
+        self.assertTrue(second.startswith(b"\x11\x10addata:objectSid"))
+        self.assertTrue(third.startswith(b"\x00"))
+        self.assertLess(len(third), len(encode(request("urn:uuid:3"))))
+        for payload, message_id in [(first, "1"), (second, "2"), (third, "3")]:
+            self.assertEqual(
+                ET.tostring(request(f"urn:uuid:{message_id}")),
+                ET.tostring(decoder.decode(payload)),
+            )
+
+    def test_bounded(self):
+        # "AttributeType" and "MessageId" do not fit after 24 + 9 bytes
+        session = Session(max_bytes=40, value_uses=None)
+        payload = session.encode(request("x"))
+        self.assertEqual(["BaseObjectSearchRequest", "urn:dirs"], list(session.ids))
+        # the StringTable length is the bytes charged to the quota
+        self.assertEqual(bytes((33,)), payload[:1])
+        self.assertEqual(33, session.size)
+        self.assertIn(b"A\x02da\x0dAttributeType", payload)
+        self.assertEqual(
+            ET.tostring(request("x")), ET.tostring(SessionDecoder().decode(payload))
+        )
+
+    def test_quota(self):
+        session = Session(max_bytes=10)
+        self.assertIsNone(session.add("x" * 20))
+        self.assertEqual(1, session.add("abc"))
+        self.assertEqual(3, session.add("abcde"))
+        self.assertIsNone(session.add("ab"))
+        self.assertEqual(10, session.size)
+
+    def test_rollback(self):
+        session = Session(value_uses=None)
+        root = request("x")
+        root.append(ET.Comment("no"))
+        with self.assertRaises(ValueError):
+            session.encode(root)
+        self.assertEqual(0, len(session))
+        self.assertEqual(0, session.size)
+        self.assertEqual(
+            Session(value_uses=None).encode(request("x")), session.encode(request("x"))
+        )
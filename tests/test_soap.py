@@ -0,0 +1,81 @@
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.soap import header_parser
+
+
+class TestHeaderParser(TestCase):
+    def setUp(self):
+        self.header = b"V\x08D\n\x1e\x00\x82\x99\x06actionD\x12\x99\x0burn:uuid:42\x01"
+        self.body = b"V\x0e@\x04user@\x05value\x99\x04jdoe\x01\x01"
+        self.data = (
+            b"V\x02\x0b\x01a\x06\x0b\x01s\x04" + self.header + self.body + b"\x01"
+        )
+
+    def test_header(self):
+        stream = BytesIO(self.data)
+        result = header_parser()(stream)
+        self.assertTrue(result.is_ok(), result)
+        header, body = result.unwrap()
+
+        self.assertEqual("s:Header", header.tag)
+        self.assertEqual(
+            {"a:Action": "action", "a:RelatesTo": "urn:uuid:42"},
+            {child.tag: child.text for child in header},
+        )
+        # nothing after the start of the body is read
+        self.assertEqual(len(self.data) - len(self.body) - 1, stream.tell())
+        self.assertEqual(stream.tell(), body.start)
+
+    def test_body(self):
+        _, body = header_parser()(BytesIO(self.data)).unwrap()
+        self.assertEqual(
+            "<s:Body><user><value>jdoe</value></user></s:Body>",
+            ET.tostring(body.decode(), encoding="unicode"),
+        )
+        self.assertEqual(
+            {
+                "xmlns:a": "http://www.w3.org/2005/08/addressing",
+                "xmlns:s": "http://www.w3.org/2003/05/soap-envelope",
+            },
+            body.namespaces,
+        )
+
+    def test_raw_body(self):
+        _, body = header_parser()(BytesIO(self.data)).unwrap()
+        self.assertEqual(self.body, body.raw().tobytes())
+        self.assertEqual("s:Body", build_tree(iter_events(BytesIO(body.raw()))).tag)
+
+    def test_no_body(self):
+        stream = BytesIO(b"V\x02" + self.header + b"\x01")
+        header, body = header_parser()(stream).unwrap()
+        self.assertEqual("s:Header", header.tag)
+        self.assertIsNone(body)
+        self.assertEqual(len(stream.getvalue()), stream.tell())
+
+    def test_text_before_body(self):
+        whitespace = b"\x98\x02\r\n"
+        data = self.data.replace(self.body, whitespace + self.body)
+        header, body = header_parser()(BytesIO(data)).unwrap()
+        self.assertEqual("s:Header", header.tag)
+        self.assertEqual(self.body, body.raw().tobytes())
+
+        stream = BytesIO(b"V\x02" + self.header + b"\x99\x01\n")
+        header, body = header_parser()(stream).unwrap()
+        self.assertIsNone(body)
+        self.assertEqual(len(stream.getvalue()), stream.tell())
+
+    def test_unexpected_record(self):
+        result = header_parser()(BytesIO(b"V\x02" + self.header + b"\x02"))
+        self.assertTrue(result.is_err())
+
+    def test_no_header(self):
+        header, body = header_parser()(BytesIO(b"V\x02" + self.body)).unwrap()
+        self.assertIsNone(header)
+        self.assertEqual(2, body.start)
+
+    def test_invalid_header(self):
+        result = header_parser()(BytesIO(b"V\x02V\x08D\n\x1e"))
+        self.assertTrue(result.is_err())
@@ -0,0 +1,67 @@
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.encoder import encode
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.splice import SpanElement, parse_spans, splice
+
+
+class TestSplice(TestCase):
+    def setUp(self):
+        self.action = (
+            b"D\n\x1e\x00\x82\xad \xcf\x9a\xba\x9b)\xc0D\xbb\x9c\xc8\x8d\xdcp\xf6\xbb"
+        )
+        self.header = b"V\x08" + self.action + b"D\x1a\x99\x0burn:uuid:42\x01"
+        self.body = b"V\x0e@\x04user\x98\x02jd\x99\x02oe\x01"
+        self.data = (
+            b"V\x02\x0b\x01s\x04\x0b\x01a\x06" + self.header + self.body + b"\x01"
+        )
+
+    def test_spans(self):
+        root = parse_spans(BytesIO(self.data))
+        header, body = root
+        self.assertIsInstance(body, SpanElement)
+        self.assertEqual((0, len(self.data)), root.span)
+        self.assertEqual(self.header, header.source[slice(*header.span)])
+        self.assertEqual(self.body, body.source[slice(*body.span)])
+        self.assertFalse(root.is_modified())
+
+    def test_unmodified(self):
+        # the split text and UniqueIdText are not forms the encoder writes
+        root = parse_spans(BytesIO(self.data))
+        self.assertNotEqual(self.data, encode(root))
+        self.assertEqual(self.data, splice(root))
+
+    def test_modified_text(self):
+        root = parse_spans(BytesIO(self.data))
+        header, body = root
+        header[1].text = "urn:uuid:43"
+
+        data = splice(root)
+        self.assertIn(b"V\x08" + self.action, data)
+        self.assertIn(b"D\x1a\x99\x0burn:uuid:43\x01", data)
+        self.assertTrue(data.endswith(self.body + b"\x01"))
+        self.assertEqual(
+            ET.tostring(root), ET.tostring(build_tree(iter_events(BytesIO(data))))
+        )
+
+    def test_modified_children(self):
+        root = parse_spans(BytesIO(self.data))
+        body = root[1]
+        body.append(ET.Element("added"))
+        body[0].tail = "tail"
+
+        data = splice(root)
+        self.assertTrue(data.startswith(self.data[: -len(self.body) - 1]))
+        self.assertEqual(
+            ET.tostring(root), ET.tostring(build_tree(iter_events(BytesIO(data))))
+        )
+
+    def test_moved_element(self):
+        source = parse_spans(BytesIO(self.data))
+        root = ET.Element("s:Envelope", source.attrib)
+        root.append(source[1])
+        self.assertEqual(
+            b"V\x02\x0b\x01s\x04\x0b\x01a\x06" + self.body + b"\x01", splice(root)
+        )
@@ -0,0 +1,59 @@
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.stats import ParseStats, parse_with_stats
+
+
+class TestParseStats(TestCase):
+    def setUp(self):
+        self.data = (
+            b"V\x02\x0b\x01s\x04\x0b\x01a\x06V\x08D\n\x1e\x00\x82\x99\x06action"
+            b"D\x12\x99\x0burn:uuid:42\x01V\x0e@\x04user@\x05value\x99\x04jdoe"
+            b"@\x05empty\x01\x01\x01\x01"
+        )
+
+    def test_counts(self):
+        root, stats = parse_with_stats(BytesIO(self.data))
+        self.assertEqual(
+            ET.tostring(build_tree(iter_events(BytesIO(self.data)))),
+            ET.tostring(root),
+        )
+        self.assertEqual(1, stats.documents)
+        self.assertEqual(len(self.data), stats.bytes)
+        self.assertEqual(8, stats.elements)
+        self.assertEqual(3, stats.attributes)
+        self.assertEqual(3, stats.texts)
+        self.assertEqual(4, stats.max_depth)
+        # Envelope, xmlns:s, xmlns:a, Header, Action, mustUnderstand,
+        # RelatesTo and Body
+        self.assertEqual(8, stats.dictionary_strings)
+        # user, value, empty and the three Chars8Text
+        self.assertEqual(6, stats.inline_strings)
+        self.assertEqual(12, stats.largest_text)
+        self.assertEqual(2, stats.record_counts[0x0B])
+        self.assertEqual(5, stats.record_counts[0x01])
+        self.assertGreater(stats.wall_ns, 0)
+
+    def test_batch(self):
+        stats = ParseStats()
+        stream = BytesIO(self.data * 2)
+        parse_with_stats(stream, stats)
+        parse_with_stats(stream, stats)
+        self.assertEqual(2, stats.documents)
+        self.assertEqual(2 * len(self.data), stats.bytes)
+        self.assertEqual(16, stats.elements)
+
+    def test_stream_position(self):
+        stream = BytesIO(self.data + b"@\x01x\x01")
+        events = list(iter_events(stream, stats=ParseStats()))
+        self.assertEqual(len(self.data), stream.tell())
+        self.assertEqual(list(iter_events(BytesIO(self.data))), events)
+
+    def test_to_dict(self):
+        _, stats = parse_with_stats(BytesIO(self.data))
+        metrics = stats.to_dict()
+        self.assertEqual(8, metrics["elements"])
+        self.assertEqual(3, metrics["attributes"])
+        self.assertEqual(2, metrics["records"]["0x0B"])
@@ -0,0 +1,88 @@
+from io import BytesIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.encoder import encode
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.records import record_parser
+from pynbfx.template import compile_template
+
+
+def pull_envelope(message_id: str, context: str, max_elements: str) -> ET.Element:
+    envelope = ET.Element(
+        "s:Envelope",
+        {
+            "xmlns:s": "http://www.w3.org/2003/05/soap-envelope",
+            "xmlns:a": "http://www.w3.org/2005/08/addressing",
+            "xmlns:wsen": "http://schemas.xmlsoap.org/ws/2004/09/enumeration",
+        },
+    )
+    header = ET.SubElement(envelope, "s:Header")
+    action = ET.SubElement(header, "a:Action", {"s:mustUnderstand": "1"})
+    action.text = "http://schemas.xmlsoap.org/ws/2004/09/enumeration/Pull"
+    ET.SubElement(header, "a:MessageID").text = message_id
+    ET.SubElement(
+        header, "a:To", {"s:mustUnderstand": "1"}
+    ).text = (
+        "net.tcp://dc.example.com:9389/ActiveDirectoryWebServices/Windows/Enumeration"
+    )
+    body = ET.SubElement(envelope, "s:Body")
+    pull = ET.SubElement(body, "wsen:Pull")
+    ET.SubElement(pull, "wsen:EnumerationContext").text = context
+    ET.SubElement(pull, "wsen:MaxElements", {"count": max_elements})
+    return envelope
+
+
+class TestTemplate(TestCase):
+    def setUp(self):
+        self.template = compile_template(
+            pull_envelope("{MessageID}", "{EnumerationContext}", "{MaxElements}")
+        )
+
+    def test_names(self):
+        self.assertEqual(
+            ["MessageID", "EnumerationContext", "MaxElements"], self.template.names
+        )
+        self.assertEqual(4, len(self.template.segments))
+
+    def test_render_matches_encode(self):
+        values = {
+            "MessageID": "urn:uuid:5cc1d5e3-6d24-4c0e-9f2a-8b0f1c1f2e3d",
+            "EnumerationContext": "6c4b0d4d-a9a6-4d2b-9a58-7e3d6a9e8e51",
+            "MaxElements": 256,
+        }
+        data = self.template.render(**values)
+        self.assertEqual(
+            encode(
+                pull_envelope(values["MessageID"], values["EnumerationContext"], "256")
+            ),
+            data,
+        )
+        root = build_tree(iter_events(BytesIO(data)))
+        self.assertEqual(values["MessageID"], root[0][1].text)
+        self.assertEqual({"count": "256"}, root[1][0][1].attrib)
+
+    def test_empty_value(self):
+        data = self.template.render(
+            MessageID="", EnumerationContext="ctx", MaxElements="1"
+        )
+        self.assertEqual(encode(pull_envelope("", "ctx", "1")), data)
+
+    def test_long_values(self):
+        context = "c" * 300
+        data = self.template.render(
+            MessageID="m" * 600, EnumerationContext=context, MaxElements="x" * 300
+        )
+        self.assertEqual(encode(pull_envelope("m" * 600, context, "x" * 300)), data)
+        root = record_parser()(BytesIO(data)).unwrap()
+        self.assertEqual("m" * 600, root[0][1].text)
+        self.assertEqual(context, root[1][0][0].text)
+        self.assertEqual({"count": "x" * 300}, root[1][0][1].attrib)
+
+    def test_missing_value(self):
+        with self.assertRaises(ValueError):
+            self.template.render(MessageID="urn:uuid:1")
+
+    def test_namespace_placeholder(self):
+        with self.assertRaises(ValueError):
+            compile_template(ET.Element("root", {"xmlns:a": "{uri}"}))
@@ -0,0 +1,58 @@
+from io import BytesIO
+from unittest import TestCase
+
+from pynbfx import parser
+from pynbfx.combinators import byte_parser
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.records import element_parser, record_event_parser
+from pynbfx.trace import Trace, TraceStep, format_trace
+
+
+class TestTrace(TestCase):
+    def setUp(self):
+        # Chars16Text with its length past the end of the stream
+        self.data = b"@\x04user@\x05value\x9a\x10jd"
+
+    def tearDown(self):
+        parser.set_trace(Trace())
+
+    def test_failure(self):
+        parser.set_trace(Trace(size=3))
+        stream = BytesIO(self.data)
+        for _ in range(2):
+            record_event_parser()(stream)
+        result = record_event_parser()(stream)
+
+        self.assertTrue(result.is_err())
+        self.assertEqual(
+            (
+                TraceStep(6, 0x40, "record_event_parser"),
+                TraceStep(13, 0x9A, "record_event_parser"),
+                TraceStep(13, 0x9A, "type_selector"),
+            ),
+            result.trace,
+        )
+        self.assertEqual(3, len(format_trace(result.trace).splitlines()))
+
+    def test_element_parser(self):
+        result = element_parser()(BytesIO(b"@\x04user\x04\x01a\x9a\x10jd"))
+        self.assertTrue(result.is_err())
+        self.assertEqual(
+            [0x40, 0x04, 0x9A], [step.record_type for step in result.trace]
+        )
+
+    def test_success(self):
+        result = byte_parser()(BytesIO(b"\x01"))
+        self.assertTrue(result.is_ok())
+        self.assertIsNone(result.trace)
+
+    def test_expect(self):
+        with self.assertRaises(ValueError) as context:
+            build_tree(iter_events(BytesIO(self.data)))
+        self.assertIn("0x9A type_selector", context.exception.__notes__[0])
+
+    def test_disabled(self):
+        parser.set_trace(None)
+        result = record_event_parser()(BytesIO(self.data[13:]))
+        self.assertTrue(result.is_err())
+        self.assertIsNone(result.trace)
@@ -0,0 +1,97 @@
+import json
+from io import BytesIO, StringIO
+from unittest import TestCase
+from xml.etree import ElementTree as ET
+
+from pynbfx.reader import build_tree, iter_events
+from pynbfx.transcode import to_dict, transcode, transcode_json
+
+
+class TestTranscode(TestCase):
+    def setUp(self):
+        self.data = (
+            b"V\x02\x0b\x01a\x06\x0b\x01s\x04V\x08D\n\x1e\x00\x82\x99\x06action\x01"
+            b'V\x0e@\x04user\x04\x04note\x98\x05a<"b\n@\x05value\x98\x02jd\x99\x03o&e'
+            b"\x01\x01\x01"
+        )
+
+    def test_matches_tostring(self):
+        out = StringIO()
+        transcode(BytesIO(self.data), out)
+        tree = build_tree(iter_events(BytesIO(self.data)))
+        self.assertEqual(
+            ET.tostring(tree, encoding="unicode", short_empty_elements=False),
+            out.getvalue(),
+        )
+
+    def test_binary_output(self):
+        out = BytesIO()
+        transcode(BytesIO(self.data), out)
+        self.assertEqual(
+            "{http://www.w3.org/2003/05/soap-envelope}Envelope",
+            ET.fromstring(out.getvalue()).tag,
+        )
+        self.assertIn(b'note="a&lt;&quot;b&#10;"', out.getvalue())
+
+    def test_indent(self):
+        out = StringIO()
+        transcode(BytesIO(b"@\x01a@\x01b\x99\x01x@\x01c@\x01d\x01\x01\x01"), out, "  ")
+        self.assertEqual(
+            "<a>\n  <b>x</b>\n  <c>\n    <d></d>\n  </c>\n</a>", out.getvalue()
+        )
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            transcode(BytesIO(b"@\x01a\x02"), StringIO())
+
+
+class TestJSON(TestCase):
+    def setUp(self):
+        self.data = (
+            b"@\x05users\x04\x05count\x89\x02"
+            b"@\x04user\x04\x02id\x89\x07@\x04name\x98\x02jd\x99\x02oe@\x05empty\x01\x01"
+            b"@\x04user\x04\x02id\x89\x08@\x04name\x99\x06asmith@\x05empty\x01\x01"
+            b"@\x04more\x99\x03yes\x01"
+        )
+        self.expected = {
+            "users": {
+                "@count": "2",
+                "user": [
+                    {"@id": "7", "name": "jdoe", "empty": None},
+                    {"@id": "8", "name": "asmith", "empty": None},
+                ],
+                "more": "yes",
+            }
+        }
+
+    def test_to_dict(self):
+        self.assertEqual(self.expected, to_dict(BytesIO(self.data)))
+
+    def test_to_dict_options(self):
+        result = to_dict(
+            BytesIO(b"@\x01a\x04\x01b\x98\x01c@\x01d\x99\x01e\x98\x01f\x01"),
+            attr_prefix="_",
+            text_key="value",
+            force_list=["d"],
+        )
+        self.assertEqual({"a": {"_b": "c", "d": ["e"], "value": "f"}}, result)
+
+    def test_json(self):
+        out = StringIO()
+        transcode_json(BytesIO(self.data), out, force_list=["user"])
+        self.assertEqual(self.expected, json.loads(out.getvalue()))
+
+    def test_json_binary_text(self):
+        out = BytesIO()
+        transcode_json(
+            BytesIO(b"@\x01a\x04\x01b\x98\x01c@\x01d\x99\x01e\x98\x01f\x01"),
+            out,
+            force_list=["d"],
+        )
+        self.assertEqual(
+            {"a": {"@b": "c", "d": ["e"], "#text": "f"}}, json.loads(out.getvalue())
+        )
+
+    def test_json_repeated_tag(self):
+        with self.assertRaises(ValueError):
+            transcode_json(BytesIO(self.data), StringIO())